@@ -2,9 +2,11 @@ import importlib.metadata
 
 from .core import Pymonik, Task, task
 from .context import PymonikContext
-from .results import ResultHandle, MultiResultHandle
+from .results import ResultHandle, MultiResultHandle, Shards
 from .worker import run_pymonik_worker
 from .materialize import Materialize, materialize
+from .memo import MemoStore, LocalMemoStore
+from .tracing import Tracer, enable_tracing, disable_tracing
 from armonik.common import TaskOptions
 
 try:
@@ -20,7 +22,13 @@ __all__ = [
     "Task",
     "ResultHandle",
     "MultiResultHandle",
+    "Shards",
     "TaskOptions",
     "Materialize",
-    "materialize"
+    "materialize",
+    "MemoStore",
+    "LocalMemoStore",
+    "Tracer",
+    "enable_tracing",
+    "disable_tracing",
 ]
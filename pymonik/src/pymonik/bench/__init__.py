@@ -0,0 +1,21 @@
+from .common import (
+    BenchmarkComparison,
+    BenchmarkResult,
+    compare_results,
+    load_results,
+    measure,
+    print_comparison,
+    print_results,
+    save_results,
+)
+
+__all__ = [
+    "BenchmarkComparison",
+    "BenchmarkResult",
+    "compare_results",
+    "load_results",
+    "measure",
+    "print_comparison",
+    "print_results",
+    "save_results",
+]
@@ -0,0 +1,103 @@
+"""
+PymoniK's benchmark suite.
+
+    python -m pymonik.bench run --output baseline.json
+    python -m pymonik.bench run --suite micro --suite worker --output current.json
+    python -m pymonik.bench compare baseline.json current.json --threshold 0.1
+
+Results are saved as JSON, compare prints the change of the throughput of every benchmark between two
+runs and exits with status 1 if any throughput dropped by more than the threshold.
+"""
+import argparse
+import dataclasses
+import sys
+
+from typing import Callable, Dict, List, Optional
+
+from .common import BenchmarkResult, compare_results, load_results, print_comparison, print_results, save_results
+
+
+def _run_client(args) -> List[BenchmarkResult]:
+    from .client import run_client_benchmarks
+
+    return run_client_benchmarks(tasks=max(int(1000 * args.scale), 1))
+
+
+def _run_worker(args) -> List[BenchmarkResult]:
+    from .worker import run_worker_benchmarks
+
+    return run_worker_benchmarks(iterations=max(int(200 * args.scale), 1))
+
+
+def _run_workloads(args) -> List[BenchmarkResult]:
+    from .workloads import run_workload_benchmarks
+
+    return run_workload_benchmarks(scale=args.scale, max_workers=args.workers)
+
+
+def _run_micro(args) -> List[BenchmarkResult]:
+    from .micro import run_micro_benchmarks
+
+    return run_micro_benchmarks(scale=args.scale)
+
+
+SUITES: Dict[str, Callable[[argparse.Namespace], List[BenchmarkResult]]] = {
+    "micro": _run_micro,
+    "client": _run_client,
+    "worker": _run_worker,
+    "workloads": _run_workloads,
+}
+
+
+def _run(args) -> int:
+    results = []
+    for suite in args.suite or list(SUITES):
+        print(f"Running the {suite} benchmarks...")
+        results.extend(dataclasses.replace(r, name=f"{suite}/{r.name}") for r in SUITES[suite](args))
+    print_results(results)
+    if args.output:
+        save_results(results, args.output, metadata={"scale": args.scale, "workers": args.workers})
+        print(f"Results saved to {args.output}")
+    return 0
+
+
+def _compare(args) -> int:
+    baseline_metadata, baseline = load_results(args.baseline)
+    current_metadata, current = load_results(args.current)
+    print(
+        f"Baseline: PymoniK {baseline_metadata.get('pymonik_version', '?')} ({baseline_metadata.get('timestamp', '?')}), "
+        f"current: PymoniK {current_metadata.get('pymonik_version', '?')} ({current_metadata.get('timestamp', '?')})"
+    )
+    comparisons = compare_results(baseline, current)
+    if not comparisons:
+        print("No benchmark in common between the two runs")
+        return 0
+    regressions = print_comparison(comparisons, args.threshold)
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pymonik.bench", description="PymoniK's benchmark suite.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks")
+    run_parser.add_argument("--suite", action="append", choices=list(SUITES), help="Only run these suites")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="Scale of the benchmarks")
+    run_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes of the workloads")
+    run_parser.add_argument("--output", "-o", help="Save the results to this JSON file")
+    run_parser.set_defaults(handler=_run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare the results of two runs")
+    compare_parser.add_argument("baseline", help="JSON results of the reference run")
+    compare_parser.add_argument("current", help="JSON results of the run to check")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Relative change flagged as a regression (0.1 = 10%%)"
+    )
+    compare_parser.set_defaults(handler=_compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
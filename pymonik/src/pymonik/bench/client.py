@@ -0,0 +1,118 @@
+"""
+Benchmarks of PymoniK's client side against an in-memory FakeControlPlane.
+
+Tasks aren't executed, so the measurements only include PymoniK's own overhead (pickling, result naming,
+batching, RPC fan-out, waiting and downloading) and the injected network costs.
+
+    python -m pymonik.bench.client --tasks 2000 --latency 0.001
+"""
+import argparse
+
+from typing import List, Optional
+
+from ..core import Pymonik, task
+from ..fake_cluster import FakeControlPlane
+from .common import BenchmarkResult, measure, print_results
+
+
+@task
+def _noop(x):
+    return x
+
+
+def _with_calls(result: BenchmarkResult, control_plane: FakeControlPlane, calls_before: int) -> BenchmarkResult:
+    result.extra["rpc_calls"] = control_plane.metrics.total_calls - calls_before
+    return result
+
+
+def _bench_session(pymonik: Pymonik, control_plane: FakeControlPlane, tasks: int, prefix: str) -> List[BenchmarkResult]:
+    results = []
+    # Registers the function, so that the measurements only cover the invocations
+    _noop.invoke(0, pymonik=pymonik).wait()
+
+    calls = control_plane.metrics.total_calls
+    result, handles = measure(
+        f"{prefix}map_invoke", tasks, lambda: _noop.map_invoke([(i,) for i in range(tasks)], pymonik=pymonik)
+    )
+    results.append(_with_calls(result, control_plane, calls))
+
+    calls = control_plane.metrics.total_calls
+    result, _ = measure(f"{prefix}wait", tasks, handles.wait)
+    results.append(_with_calls(result, control_plane, calls))
+
+    calls = control_plane.metrics.total_calls
+    result, _ = measure(f"{prefix}get", tasks, handles.get)
+    results.append(_with_calls(result, control_plane, calls))
+
+    single_invocations = max(tasks // 10, 1)
+    calls = control_plane.metrics.total_calls
+    result, _ = measure(
+        f"{prefix}invoke",
+        single_invocations,
+        lambda: [_noop.invoke(i, pymonik=pymonik) for i in range(single_invocations)],
+    )
+    results.append(_with_calls(result, control_plane, calls))
+
+    calls = control_plane.metrics.total_calls
+    result, _ = measure(f"{prefix}put_many", tasks, lambda: pymonik.put_many([[i] * 16 for i in range(tasks)]))
+    results.append(_with_calls(result, control_plane, calls))
+    return results
+
+
+def run_client_benchmarks(
+    tasks: int = 1000,
+    latency: float = 0.0,
+    bandwidth: Optional[float] = None,
+    batch_size: int = 32,
+    polling: bool = True,
+) -> List[BenchmarkResult]:
+    """
+    Run the client benchmarks against a FakeControlPlane.
+
+    Args:
+        tasks: Number of tasks (and objects) per benchmark.
+        latency: Latency in seconds injected in every call.
+        bandwidth: Bandwidth in bytes per second injected in data transfers, None for unlimited.
+        batch_size: Batch size of the Pymonik client.
+        polling: Whether to also run the benchmarks with the polling backend, in addition to the events one.
+
+    Returns:
+        List[BenchmarkResult]: One result per benchmark, with the number of RPCs it made.
+    """
+    results = []
+    with FakeControlPlane(latency=latency, bandwidth=bandwidth) as control_plane:
+        with Pymonik(endpoint=control_plane.endpoint, batch_size=batch_size) as pymonik:
+            results.extend(_bench_session(pymonik, control_plane, tasks, prefix="events/"))
+        if polling:
+            with Pymonik(
+                endpoint=control_plane.endpoint,
+                batch_size=batch_size,
+                disable_events_client=True,
+                polling_interval=0.01,
+                max_polling_interval=0.1,
+            ) as pymonik:
+                results.extend(_bench_session(pymonik, control_plane, tasks, prefix="polling/"))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PymoniK's client side against a fake control plane.")
+    parser.add_argument("--tasks", type=int, default=1000, help="Number of tasks per benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency injected in every call, in seconds")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Bandwidth of data transfers, in bytes per second")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size of the client")
+    parser.add_argument("--no-polling", action="store_true", help="Skip the polling backend benchmarks")
+    args = parser.parse_args(argv)
+    print_results(
+        run_client_benchmarks(
+            tasks=args.tasks,
+            latency=args.latency,
+            bandwidth=args.bandwidth,
+            batch_size=args.batch_size,
+            polling=not args.no_polling,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
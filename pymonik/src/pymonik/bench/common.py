@@ -0,0 +1,147 @@
+import json
+import platform
+import time
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurement of a benchmark: how long a number of operations took, with optional extra counters."""
+    name: str
+    operations: int
+    seconds: float
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Operations per second."""
+        return self.operations / self.seconds if self.seconds > 0 else float("inf")
+
+    @property
+    def latency(self) -> float:
+        """Seconds per operation."""
+        return self.seconds / self.operations if self.operations else 0.0
+
+
+def measure(name: str, operations: int, fn: Callable[[], T]) -> Tuple[BenchmarkResult, T]:
+    """Time a single call of fn, counting it as `operations` operations."""
+    start = time.perf_counter()
+    value = fn()
+    return BenchmarkResult(name, operations, time.perf_counter() - start), value
+
+
+def print_results(results: List[BenchmarkResult]) -> None:
+    """Print benchmark results as a table."""
+    name_width = max([len(r.name) for r in results] + [len("benchmark")])
+    print(f"{'benchmark':<{name_width}}  {'ops':>8}  {'total (s)':>10}  {'ops/s':>12}  {'latency (ms)':>12}  extra")
+    for r in results:
+        extra = ", ".join(f"{key}={value:g}" for key, value in r.extra.items())
+        print(
+            f"{r.name:<{name_width}}  {r.operations:>8}  {r.seconds:>10.4f}  {r.throughput:>12.1f}  "
+            f"{r.latency * 1000:>12.4f}  {extra}"
+        )
+
+
+@dataclass
+class BenchmarkComparison:
+    """Change of a metric of a benchmark between a baseline run and a new run."""
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    higher_is_better: bool
+
+    @property
+    def change(self) -> float:
+        """Relative change of the metric, positive when it increased."""
+        if self.baseline == 0:
+            return 0.0 if self.current == 0 else float("inf")
+        return (self.current - self.baseline) / self.baseline
+
+    def is_regression(self, threshold: float) -> bool:
+        """Whether the metric got worse by more than threshold (relative)."""
+        return self.change < -threshold if self.higher_is_better else self.change > threshold
+
+
+def save_results(results: List[BenchmarkResult], path: Union[str, Path], metadata: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Save benchmark results as JSON, with the metadata of the run (PymoniK and Python versions, platform, date).
+
+    Args:
+        results: Results to save.
+        path: Path of the JSON file.
+        metadata: Extra metadata of the run.
+    """
+    from .. import __version__
+
+    report = {
+        "metadata": {
+            "pymonik_version": __version__,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            **(metadata or {}),
+        },
+        "results": [{**asdict(r), "throughput": r.throughput, "latency": r.latency} for r in results],
+    }
+    Path(path).write_text(json.dumps(report, indent=2))
+
+
+def load_results(path: Union[str, Path]) -> Tuple[Dict[str, Any], List[BenchmarkResult]]:
+    """
+    Load benchmark results saved by save_results.
+
+    Returns:
+        Tuple[Dict[str, Any], List[BenchmarkResult]]: The metadata of the run and its results.
+    """
+    report = json.loads(Path(path).read_text())
+    results = [
+        BenchmarkResult(r["name"], r["operations"], r["seconds"], r.get("extra", {})) for r in report["results"]
+    ]
+    return report.get("metadata", {}), results
+
+
+def compare_results(baseline: List[BenchmarkResult], current: List[BenchmarkResult]) -> List[BenchmarkComparison]:
+    """
+    Compare the benchmarks present in both runs.
+
+    Benchmarks are compared on their throughput (ops/s) only: latency and the rates in the extras are
+    derived from the same time, so comparing them as well would report every change several times.
+    The extras (e.g. the per-phase times of the worker benchmarks) are kept in the results to explain
+    a change.
+    """
+    baseline_by_name = {r.name: r for r in baseline}
+    return [
+        BenchmarkComparison(r.name, "throughput", baseline_by_name[r.name].throughput, r.throughput, True)
+        for r in current
+        if r.name in baseline_by_name
+    ]
+
+
+def print_comparison(comparisons: List[BenchmarkComparison], threshold: float) -> int:
+    """
+    Print the comparisons as a table, flagging the regressions larger than threshold.
+
+    Returns:
+        int: Number of regressions.
+    """
+    name_width = max([len(c.name) for c in comparisons] + [len("benchmark")])
+    metric_width = max([len(c.metric) for c in comparisons] + [len("metric")])
+    print(f"{'benchmark':<{name_width}}  {'metric':<{metric_width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    regressions = 0
+    for c in comparisons:
+        flag = ""
+        if c.is_regression(threshold):
+            flag = "  REGRESSION"
+            regressions += 1
+        print(
+            f"{c.name:<{name_width}}  {c.metric:<{metric_width}}  {c.baseline:>12.6g}  {c.current:>12.6g}  "
+            f"{c.change * 100:>+7.1f}%{flag}"
+        )
+    print(f"{regressions} regression(s) above {threshold * 100:g}%")
+    return regressions
@@ -0,0 +1,134 @@
+"""
+Micro-benchmarks of PymoniK's building blocks: serialization, Materialize hashing and handle creation.
+
+    python -m pymonik.bench.micro --scale 2
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+import cloudpickle as pickle
+
+from pathlib import Path
+from typing import List, Optional
+
+from ..core import Pymonik
+from ..hash_index import FileHashIndex
+from ..materialize import _calculate_directory_hash
+from ..results import MultiResultHandle, ResultHandle
+from ..utils import hash_pickle, stream_pickle
+from .common import BenchmarkResult, measure, print_results
+
+
+def _serialization_benchmarks(scale: float) -> List[BenchmarkResult]:
+    results = []
+    small_objects = max(int(10_000 * scale), 1)
+    small = {"args": (1, 2.0, "three"), "kwargs": {"flag": True}}
+    result, pickled = measure(
+        "serialization/dumps_small", small_objects, lambda: [pickle.dumps(small) for _ in range(small_objects)]
+    )
+    results.append(result)
+    result, _ = measure(
+        "serialization/loads_small", small_objects, lambda: [pickle.loads(p) for p in pickled]
+    )
+    results.append(result)
+
+    large = os.urandom(max(int(64 * 1024 * 1024 * scale), 1024))
+    megabytes = len(large) / (1024 * 1024)
+    repeats = 5
+    for name, fn in [
+        ("dumps_large", lambda: pickle.dumps(large, protocol=5)),
+        ("stream_pickle_large", lambda: sum(len(chunk) for chunk in stream_pickle(large, chunk_size=84 * 1024))),
+        ("hash_pickle_large", lambda: hash_pickle(large)),
+    ]:
+        result, _ = measure(f"serialization/{name}", repeats, lambda: [fn() for _ in range(repeats)])
+        result.extra["MiB_per_s"] = round(megabytes * repeats / result.seconds, 1)
+        results.append(result)
+    return results
+
+
+def _materialize_benchmarks(scale: float) -> List[BenchmarkResult]:
+    results = []
+    num_files = max(int(500 * scale), 1)
+    with tempfile.TemporaryDirectory(prefix="pymonik-bench-micro-") as tmp:
+        source = Path(tmp) / "source"
+        for i in range(num_files):
+            file_path = source / f"dir_{i % 16}" / f"file_{i}.bin"
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_bytes(os.urandom(16 * 1024))
+            # Older than the racy window of the index, so that the warm run hits it
+            os.utime(file_path, (time.time() - 60, time.time() - 60))
+
+        result, _ = measure("materialize/hash_directory", num_files, lambda: _calculate_directory_hash(source))
+        results.append(result)
+
+        hash_index = FileHashIndex(Path(tmp) / "file_hashes.sqlite")
+        try:
+            result, _ = measure(
+                "materialize/hash_directory_index_cold",
+                num_files,
+                lambda: _calculate_directory_hash(source, hash_index=hash_index),
+            )
+            results.append(result)
+            result, _ = measure(
+                "materialize/hash_directory_index_warm",
+                num_files,
+                lambda: _calculate_directory_hash(source, hash_index=hash_index),
+            )
+            results.append(result)
+        finally:
+            hash_index.close()
+    return results
+
+
+def _handle_benchmarks(scale: float) -> List[BenchmarkResult]:
+    results = []
+    num_handles = max(int(200_000 * scale), 1)
+    # Handles only keep a reference to their Pymonik instance, which doesn't need to be connected
+    pymonik = Pymonik()
+    session_id = str(uuid.uuid4())
+    result_ids = [str(uuid.uuid4()) for _ in range(num_handles)]
+
+    result, handles = measure(
+        "handles/result_handle",
+        num_handles,
+        lambda: [ResultHandle(result_id, session_id, pymonik) for result_id in result_ids],
+    )
+    results.append(result)
+    result, _ = measure("handles/multi_result_handle", num_handles, lambda: MultiResultHandle(handles))
+    results.append(result)
+    result, multi_handle = measure(
+        "handles/multi_result_handle_from_ids",
+        num_handles,
+        lambda: MultiResultHandle.from_result_ids(result_ids, session_id, pymonik),
+    )
+    results.append(result)
+    result, _ = measure("handles/iterate", num_handles, lambda: sum(1 for _ in multi_handle))
+    results.append(result)
+    return results
+
+
+def run_micro_benchmarks(scale: float = 1.0) -> List[BenchmarkResult]:
+    """
+    Run the serialization, Materialize hashing and handle creation micro-benchmarks.
+
+    Args:
+        scale: Scale of the benchmarks (number of objects, files and handles, size of the large object).
+
+    Returns:
+        List[BenchmarkResult]: One result per benchmark.
+    """
+    return _serialization_benchmarks(scale) + _materialize_benchmarks(scale) + _handle_benchmarks(scale)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run PymoniK's micro-benchmarks.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale of the benchmarks")
+    args = parser.parse_args(argv)
+    print_results(run_micro_benchmarks(scale=args.scale))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmarks of PymoniK's worker side, running tasks through the worker's task processing code on a FakeAgent.
+
+Every benchmark runs a representative task shape repeatedly and reports the tasks per second and the
+average time spent in each phase (payload, dependencies, function, materialize, execute, send).
+
+    python -m pymonik.bench.worker --iterations 500
+"""
+import argparse
+import contextlib
+import logging
+import os
+import tempfile
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ..core import task
+from ..fake_agent import FakeAgent
+from ..materialize import materialize
+from ..results import MultiResultHandle, Shards
+from .common import BenchmarkResult, measure, print_results
+
+
+@task
+def _add(a, b):
+    return a + b
+
+
+@task
+def _length(data):
+    return len(data)
+
+
+@task
+def _total_length(items):
+    return sum(len(item) for item in items)
+
+
+@task
+def _count_files(mat):
+    return sum(1 for _ in Path(mat.worker_path).rglob("*"))
+
+
+@task
+def _split(data):
+    return Shards([data[i::8] for i in range(8)])
+
+
+def _prepare_materialize(agent: FakeAgent, work_dir: Path):
+    source = work_dir / "source"
+    source.mkdir()
+    for i in range(32):
+        (source / f"file_{i}.txt").write_bytes(os.urandom(4096))
+    # Materialized on the first run, later runs find the content in place
+    return agent.prepare(_count_files, agent.materialize(materialize(source, work_dir / "materialized")))
+
+
+# Shape name -> function preparing the task to run on a FakeAgent
+WORKER_SHAPES: Dict[str, Callable[[FakeAgent, Path], object]] = {
+    "scalar_args": lambda agent, _: agent.prepare(_add, 1, 2),
+    "inline_512KiB": lambda agent, _: agent.prepare(_length, b"x" * 512 * 1024),
+    "dependency_16MiB": lambda agent, _: agent.prepare(_length, agent.put(bytes(16 * 1024 * 1024))),
+    "dependencies_100x1KiB": lambda agent, _: agent.prepare(
+        _total_length, MultiResultHandle([agent.put(bytes(1024)) for _ in range(100)])
+    ),
+    "materialize_32_files": _prepare_materialize,
+    "shards_output": lambda agent, _: agent.prepare(_split, list(range(100_000))),
+}
+
+
+def run_worker_benchmarks(iterations: int = 200, shapes: Optional[List[str]] = None) -> List[BenchmarkResult]:
+    """
+    Run every task shape `iterations` times on a FakeAgent.
+
+    Objects fetched through GetResourceData and the worker object cache go to a temporary directory
+    (PYMONIK_WORKER_CACHE_DIR is set for the duration of the benchmarks).
+
+    Returns:
+        List[BenchmarkResult]: One result per shape, with the average time per phase in milliseconds as extras.
+    """
+    results = []
+    logger = logging.getLogger("PymonikBenchWorker")
+    previous_cache_dir = os.environ.get("PYMONIK_WORKER_CACHE_DIR")
+    with tempfile.TemporaryDirectory(prefix="pymonik-bench-worker-") as tmp:
+        os.environ["PYMONIK_WORKER_CACHE_DIR"] = str(Path(tmp) / "cache")
+        try:
+            for name in shapes or list(WORKER_SHAPES):
+                agent = FakeAgent()
+                work_dir = Path(tmp) / name
+                work_dir.mkdir()
+                task_definition = WORKER_SHAPES[name](agent, work_dir)
+                phase_times: Dict[str, float] = {}
+
+                def _run_all():
+                    # The worker prints while loading the arguments
+                    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                        for _ in range(iterations):
+                            output, _ = agent.run(task_definition, logger=logger, phase_times=phase_times)
+                            if not output.success:
+                                raise RuntimeError(f"Benchmark task {name} failed: {output.error}")
+
+                result, _ = measure(name, iterations, _run_all)
+                for phase, seconds in phase_times.items():
+                    result.extra[f"{phase}_ms"] = round(seconds / iterations * 1000, 4)
+                results.append(result)
+        finally:
+            if previous_cache_dir is None:
+                os.environ.pop("PYMONIK_WORKER_CACHE_DIR", None)
+            else:
+                os.environ["PYMONIK_WORKER_CACHE_DIR"] = previous_cache_dir
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PymoniK's worker side with a fake agent.")
+    parser.add_argument("--iterations", type=int, default=200, help="Number of runs per task shape")
+    parser.add_argument("--shape", action="append", choices=list(WORKER_SHAPES), help="Only run these shapes")
+    args = parser.parse_args(argv)
+    print_results(run_worker_benchmarks(iterations=args.iterations, shapes=args.shape))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+End-to-end benchmarks of scaled-down versions of the example workloads, run on a local session.
+
+Local sessions run the tasks on a process pool through the same client and worker code as a cluster, so
+these benchmarks cover a whole PymoniK round trip (invoke, upload, execution, subtasks, wait, download):
+
+- estimate_pi: map_invoke of Monte-Carlo tasks, reduced by a task taking their handles.
+- adaptive_vector_addition: recursive splitting into subtasks with delegated aggregation (needs numpy).
+- raytracing: tiles of an image rendered by tasks taking the scene as argument.
+
+    python -m pymonik.bench.workloads --scale 2 --workers 8
+"""
+import argparse
+import math
+import random
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..core import Pymonik, task
+from .common import BenchmarkResult, measure, print_results
+
+VECTOR_SIZE_THRESHOLD = 512
+
+
+@task
+def _estimate_pi_partial(num_samples: int) -> Tuple[int, int]:
+    points_in_circle = 0
+    for _ in range(num_samples):
+        x, y = random.random(), random.random()
+        if x * x + y * y <= 1.0:
+            points_in_circle += 1
+    return points_in_circle, num_samples
+
+
+@task
+def _sum_pi_results(results) -> float:
+    return 4.0 * sum(r[0] for r in results) / sum(r[1] for r in results)
+
+
+@task
+def _aggregate_vectors(result_1, result_2):
+    import numpy as np
+
+    return np.concatenate([result_1, result_2])
+
+
+@task
+def _vec_add(a, b):
+    import numpy as np
+
+    if a.size > VECTOR_SIZE_THRESHOLD:
+        mid_point = a.size // 2
+        a1, a2 = np.split(a, [mid_point])
+        b1, b2 = np.split(b, [mid_point])
+        return _aggregate_vectors.invoke(_vec_add.invoke(a1, b1), _vec_add.invoke(a2, b2), delegate=True)
+    return a + b
+
+
+def _sub(u, v):
+    return (u[0] - v[0], u[1] - v[1], u[2] - v[2])
+
+
+def _dot(u, v):
+    return u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
+
+
+def _normalize(u):
+    length = math.sqrt(_dot(u, u)) or 1.0
+    return (u[0] / length, u[1] / length, u[2] / length)
+
+
+def _trace(origin, direction, scene) -> Tuple[int, int, int]:
+    spheres, lights, background = scene
+    closest, hit = float("inf"), None
+    for center, radius, color in spheres:
+        oc = _sub(origin, center)
+        b = 2.0 * _dot(oc, direction)
+        discriminant = b * b - 4.0 * (_dot(oc, oc) - radius * radius)
+        if discriminant < 0:
+            continue
+        t = (-b - math.sqrt(discriminant)) / 2.0
+        if 0.001 < t < closest:
+            closest, hit = t, (center, color)
+    if hit is None:
+        pixel = background
+    else:
+        point = tuple(o + d * closest for o, d in zip(origin, direction))
+        normal = _normalize(_sub(point, hit[0]))
+        intensity = 0.1 + sum(
+            max(0.0, _dot(normal, _normalize(_sub(position, point)))) * strength for position, strength in lights
+        )
+        pixel = tuple(min(1.0, c * intensity) for c in hit[1])
+    return tuple(int(c * 255.999) for c in pixel)
+
+
+@task
+def _render_tile(y_start: int, y_end: int, width: int, height: int, scene) -> Tuple[int, List[Tuple[int, int, int]]]:
+    origin = (0.0, 0.5, 1.5)
+    pixels = []
+    for y in range(y_start, y_end):
+        for x in range(width):
+            u = (x + 0.5) / width - 0.5
+            v = (height - 1 - y + 0.5) / height - 0.5
+            pixels.append(_trace(origin, _normalize((u * 1.15, v * 1.15 - 0.3, -1.0)), scene))
+    return y_start, pixels
+
+
+_RAYTRACING_SCENE = (
+    [
+        ((0.0, 0.0, -1.0), 0.5, (1.0, 0.2, 0.2)),
+        ((1.0, 0.2, -1.5), 0.7, (0.2, 1.0, 0.2)),
+        ((-1.2, -0.1, -2.0), 0.4, (0.2, 0.2, 1.0)),
+        ((0.0, -100.5, -1.0), 100.0, (0.5, 0.5, 0.5)),
+    ],
+    [((-2.0, 2.0, 1.0), 0.8), ((2.0, 1.0, 0.0), 0.6)],
+    (0.7, 0.8, 1.0),
+)
+
+
+def _run_estimate_pi(pymonik: Pymonik, scale: float) -> Tuple[int, Callable[[], None]]:
+    num_tasks = max(int(100 * scale), 1)
+
+    def _run():
+        partials = _estimate_pi_partial.map_invoke([(2000,) for _ in range(num_tasks)], pymonik=pymonik)
+        estimate = _sum_pi_results.invoke(partials, pymonik=pymonik).wait().get()
+        if not 2.5 < estimate < 3.8:
+            raise RuntimeError(f"estimate_pi returned {estimate}")
+
+    return num_tasks + 1, _run
+
+
+def _run_vector_addition(pymonik: Pymonik, scale: float) -> Tuple[int, Callable[[], None]]:
+    import numpy as np
+
+    vector_size = VECTOR_SIZE_THRESHOLD * 2 ** max(round(math.log2(8 * scale)), 1)
+    vec_a = np.arange(vector_size)
+    vec_b = np.arange(vector_size) * 2
+    # Every split runs two vec_add and one aggregation
+    leaves = vector_size // VECTOR_SIZE_THRESHOLD
+
+    def _run():
+        result = _vec_add.invoke(vec_a, vec_b, pymonik=pymonik).wait().get()
+        if not np.array_equal(result, vec_a + vec_b):
+            raise RuntimeError("adaptive_vector_addition returned a wrong result")
+
+    return 3 * leaves - 2, _run
+
+
+def _run_raytracing(pymonik: Pymonik, scale: float) -> Tuple[int, Callable[[], None]]:
+    size = max(int(128 * math.sqrt(scale)), 8)
+    num_tasks = min(max(int(32 * scale), 1), size)
+    rows_per_task = math.ceil(size / num_tasks)
+    tiles = [
+        (y, min(y + rows_per_task, size), size, size, _RAYTRACING_SCENE) for y in range(0, size, rows_per_task)
+    ]
+
+    def _run():
+        rendered = _render_tile.map_invoke(tiles, pymonik=pymonik).wait().get()
+        if sum(len(pixels) for _, pixels in rendered) != size * size:
+            raise RuntimeError("raytracing returned an incomplete image")
+
+    return len(tiles), _run
+
+
+# Workload name -> function returning the number of tasks of the workload and a function running it
+WORKLOADS: Dict[str, Callable[[Pymonik, float], Tuple[int, Callable[[], None]]]] = {
+    "estimate_pi": _run_estimate_pi,
+    "adaptive_vector_addition": _run_vector_addition,
+    "raytracing": _run_raytracing,
+}
+
+
+def run_workload_benchmarks(
+    scale: float = 1.0,
+    max_workers: Optional[int] = None,
+    workloads: Optional[List[str]] = None,
+) -> List[BenchmarkResult]:
+    """
+    Run the example workloads on a local session.
+
+    Args:
+        scale: Scale of the workloads, 1 is a few hundred tasks in total.
+        max_workers: Number of worker processes of the local session, defaults to the number of CPUs.
+        workloads: Names of the workloads to run, defaults to all of them. Workloads whose dependencies
+            aren't installed are skipped.
+
+    Returns:
+        List[BenchmarkResult]: One result per workload, counting tasks as operations.
+    """
+    results = []
+    with Pymonik(local_session=True, local_max_workers=max_workers) as pymonik:
+        for name in workloads or list(WORKLOADS):
+            try:
+                num_tasks, run = WORKLOADS[name](pymonik, scale)
+            except ImportError as e:
+                print(f"Skipping workload {name}: {e}")
+                continue
+            result, _ = measure(name, num_tasks, run)
+            results.append(result)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the example workloads on a local session.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale of the workloads")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--workload", action="append", choices=list(WORKLOADS), help="Only run these workloads")
+    args = parser.parse_args(argv)
+    print_results(run_workload_benchmarks(scale=args.scale, max_workers=args.workers, workloads=args.workload))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import hashlib
+import pickle
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, chunk boundaries are then found with the (slower) pure Python scan
+    np = None
+
+# Results holding a chunked object start with this marker, pickled data always starts with the PROTO opcode
+_CHUNKED_MAGIC = b"PMKCHUNKED1\n"
+
+# Polynomial rolling hash over a sliding window: H_i = sum(b[i - k] * P^k, k < WINDOW) mod 2^64.
+# A chunk ends after byte i when the top avg_bits bits of H_i are zero, so boundaries only depend on the
+# surrounding bytes and an insertion or deletion only changes the chunks around it.
+_WINDOW = 48
+_PRIME = 0x100000001B3
+_MASK64 = (1 << 64) - 1
+_PRIME_POW_WINDOW = pow(_PRIME, _WINDOW, 1 << 64)
+_SCAN_BLOCK = 256 * 1024
+
+DEFAULT_MIN_CHUNK_SIZE = 256 * 1024
+DEFAULT_AVG_CHUNK_BITS = 20
+DEFAULT_MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+_powers_cache = {}
+
+
+def _powers(length: int):
+    """P^k and P^-k (mod 2^64) for k < length, as uint64 arrays."""
+    if length not in _powers_cache:
+        inverse = pow(_PRIME, -1, 1 << 64)
+        prime_powers = np.empty(length, dtype=np.uint64)
+        inverse_powers = np.empty(length, dtype=np.uint64)
+        prime_powers[0] = inverse_powers[0] = 1
+        prime_powers[1:] = _PRIME
+        inverse_powers[1:] = inverse
+        # Integer cumprod wraps around, which is the modulo 2^64 we want
+        np.cumprod(prime_powers, out=prime_powers)
+        np.cumprod(inverse_powers, out=inverse_powers)
+        _powers_cache[length] = (prime_powers, inverse_powers)
+    return _powers_cache[length]
+
+
+def _find_cut_numpy(data, start: int, end: int, shift: int) -> Optional[int]:
+    """Vectorized scan: H_i = P^i * (T_i - T_{i - WINDOW}) with T the prefix sums of b_j * P^-j."""
+    values = np.frombuffer(data, dtype=np.uint8, count=end)
+    prime_powers, inverse_powers = _powers(_SCAN_BLOCK + _WINDOW)
+    # Scan blocks of about the expected distance to the next boundary, a boundary is usually found in the first one
+    block_size = min(max(1 << (64 - shift), 4096), _SCAN_BLOCK)
+    for block_start in range(start, end, block_size):
+        block_end = min(block_start + block_size, end)
+        low = block_start - (_WINDOW - 1)
+        segment = values[low:block_end].astype(np.uint64)
+        prefix_sums = np.zeros(len(segment) + 1, dtype=np.uint64)
+        np.cumsum(segment * inverse_powers[: len(segment)], out=prefix_sums[1:])
+        window_sums = prefix_sums[_WINDOW:] - prefix_sums[:-_WINDOW]
+        hashes = prime_powers[_WINDOW - 1 : len(segment)] * window_sums
+        hits = np.flatnonzero((hashes >> np.uint64(shift)) == 0)
+        if len(hits):
+            return block_start + int(hits[0]) + 1
+    return None
+
+
+def _find_cut_python(data, start: int, end: int, shift: int) -> Optional[int]:
+    rolling_hash = 0
+    for i in range(start - _WINDOW, start):
+        rolling_hash = (rolling_hash * _PRIME + data[i]) & _MASK64
+    for i in range(start, end):
+        rolling_hash = (rolling_hash * _PRIME + data[i] - data[i - _WINDOW] * _PRIME_POW_WINDOW) & _MASK64
+        if rolling_hash >> shift == 0:
+            return i + 1
+    return None
+
+
+def _find_cut(data, min_size: int, avg_bits: int, max_size: int) -> int:
+    """Length of the first chunk of data."""
+    end = min(len(data), max_size)
+    if end <= min_size:
+        return end
+    find_cut = _find_cut_numpy if np is not None else _find_cut_python
+    cut = find_cut(data, min_size - 1, end - 1, 64 - avg_bits)
+    return cut if cut is not None else end
+
+
+def content_defined_chunks(
+    stream: Iterable[bytes],
+    min_size: int = DEFAULT_MIN_CHUNK_SIZE,
+    avg_bits: int = DEFAULT_AVG_CHUNK_BITS,
+    max_size: int = DEFAULT_MAX_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Split a stream of bytes into content-defined chunks.
+
+    Chunk boundaries are placed where a rolling hash of the last bytes matches a pattern, so that data
+    changed in one place only changes the chunks around it: unchanged parts of an updated object produce
+    the same chunks as before. Chunks are between min_size and max_size bytes, min_size + 2^avg_bits on average.
+    """
+    if min_size <= _WINDOW:
+        raise ValueError(f"min_size must be larger than {_WINDOW} bytes")
+    buffer = bytearray()
+    for piece in stream:
+        buffer += piece
+        while len(buffer) >= max_size:
+            cut = _find_cut(buffer, min_size, avg_bits, max_size)
+            with memoryview(buffer) as view:
+                chunk = bytes(view[:cut])
+            yield chunk
+            del buffer[:cut]
+    while buffer:
+        cut = _find_cut(buffer, min_size, avg_bits, max_size)
+        with memoryview(buffer) as view:
+            chunk = bytes(view[:cut])
+        yield chunk
+        del buffer[:cut]
+
+
+def chunk_result_name(chunk: bytes) -> str:
+    """Content-addressed result name of a chunk."""
+    return f"pymonik_chunk__{hashlib.sha256(chunk).hexdigest()}"
+
+
+def encode_chunk_manifest(chunk_result_ids: List[str]) -> bytes:
+    return _CHUNKED_MAGIC + pickle.dumps(chunk_result_ids)
+
+
+def resolve_chunked(data: bytes, fetch_chunk: Callable[[str], bytes], max_workers: int = 8) -> bytes:
+    """
+    Reassemble the data of a chunked object, fetching its chunks concurrently.
+
+    Args:
+        data: Content of a result, returned as is if it isn't a chunk manifest.
+        fetch_chunk: Function returning the content of a chunk result from its ID.
+        max_workers: Number of chunks fetched concurrently.
+    """
+    if not data[: len(_CHUNKED_MAGIC)] == _CHUNKED_MAGIC:
+        return data
+    chunk_result_ids = pickle.loads(data[len(_CHUNKED_MAGIC) :])
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pymonik-chunks") as executor:
+        return b"".join(executor.map(fetch_chunk, chunk_result_ids))
@@ -1,14 +1,28 @@
-import io
+import os
+import shutil
+import uuid
 import zipfile
 import cloudpickle as pickle
 
 from logging import Logger
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
 
 
-from .materialize import Materialize, _calculate_directory_hash, _calculate_file_hash
+from .materialize import (
+    Materialize,
+    _calculate_directory_manifest,
+    _calculate_file_hash,
+    _calculate_manifest_hash,
+    _check_materialize_marker,
+    _get_intact_file_hashes,
+    _link_or_copy,
+    _remove_path,
+    _replace_path,
+    _write_materialize_marker,
+)
 from .environment import RuntimeEnvironment
+from .worker_cache import _DEFAULT_CACHE_ROOT, CacheMetrics, get_worker_cache
 from armonik.worker import TaskHandler
 from armonik.protogen.common.agent_common_pb2 import (DataRequest, DataResponse)
 
@@ -64,30 +78,62 @@ class PymonikContext:
         if self.is_local:
             raise RuntimeError("retrieve_object can only be called in worker context")
             
+        fh = self._open_object(result_id, check_exists=check_exists and not force_retrieve)
+        if fh is None:
+            return None
+
+        with fh:
+            if auto_unpickle:
+                try:
+                    unpickled_obj = pickle.load(fh)
+                    self.logger.debug(f"Successfully unpickled object {result_id}")
+                    return unpickled_obj
+                except Exception as e:
+                    self.logger.error(f"Failed to unpickle object {result_id}: {e}")
+                    return None
+            else:
+                # Return the raw bytes from the local file
+                try:
+                    return fh.read()
+                except Exception as e:
+                    self.logger.error(f"Failed to read object file {fh.name}: {e}")
+                    return None
+
+    def retrieve_object_path(self, result_id: str, check_exists: bool = True) -> Optional[Path]:
+        """
+        Retrieves an object from ArmoniK storage to the local worker cache, without reading it.
+
+        Retrieved objects are kept in the node's shared object cache (see WorkerObjectCache), so that
+        later tasks reuse them until they get evicted.
+
+        Args:
+            result_id (str): The ID of the result/object to retrieve
+            check_exists (bool): If True, reuse the object if it already exists locally. Defaults to True.
+
+        Returns:
+            Optional[Path]: The local path of the object, None if the retrieval failed. An object of the
+                worker object cache may be evicted by another task before the path is opened: treat a
+                FileNotFoundError as a miss and retrieve it again with check_exists=False.
+
+        Raises:
+            RuntimeError: If called in local context (no task handler available)
+        """
+        if self.is_local:
+            raise RuntimeError("retrieve_object_path can only be called in worker context")
+
         object_path = self.get_object_path(result_id)
-        
+
         # Check if object already exists locally
         if check_exists and object_path.exists():
             self.logger.info(f"=== DEBUG RETRIEVE: Object {result_id} already exists locally at {object_path} ===")
-            
-            if not force_retrieve:
-                if auto_unpickle:
-                    try:
-                        with open(object_path, "rb") as fh:
-                            return pickle.load(fh)
-                    except Exception as e:
-                        self.logger.error(f"Failed to unpickle existing object {result_id}: {e}")
-                        return None
-                else:
-                    # Return the bytes from the existing file
-                    try:
-                        with open(object_path, "rb") as fh:
-                            return fh.read()
-                    except Exception as e:
-                        self.logger.error(f"Failed to read existing object {result_id}: {e}")
-                        return None
-            else:
-                self.logger.info(f"force_retrieve=True, retrieving {result_id} anyway")
+            return object_path
+
+        object_cache = get_worker_cache(self.logger)
+        if check_exists and object_cache is not None:
+            cached_path = object_cache.get(result_id)
+            if cached_path is not None:
+                self.logger.info(f"Object {result_id} found in the worker object cache at {cached_path}")
+                return cached_path
 
         self.logger.info(f"=== DEBUG RETRIEVE: {result_id} not in data_dependencies, trying GetResourceData ===")
         try:
@@ -112,24 +158,12 @@ class PymonikContext:
                 return None
                 
             self.logger.info(f"Successfully retrieved object {result_id} via GetResourceData to {object_path}")
-            
-            if auto_unpickle:
+            if object_cache is not None:
                 try:
-                    with open(object_path, "rb") as fh:
-                        unpickled_obj = pickle.load(fh)
-                        self.logger.debug(f"Successfully unpickled object {result_id}")
-                        return unpickled_obj
-                except Exception as e:
-                    self.logger.error(f"Failed to unpickle object {result_id}: {e}")
-                    return None
-            else:
-                # Return the raw bytes from the downloaded file
-                try:
-                    with open(object_path, "rb") as fh:
-                        return fh.read()
-                except Exception as e:
-                    self.logger.error(f"Failed to read downloaded file {object_path}: {e}")
-                    return None
+                    object_path = object_cache.adopt(result_id, object_path)
+                except OSError as e:
+                    self.logger.warning(f"Could not store object {result_id} in the worker object cache: {e}")
+            return object_path
                 
         except Exception as e:
             self.logger.error(f"Failed to retrieve object {result_id} via GetResourceData: {e}")
@@ -137,6 +171,25 @@ class PymonikContext:
             self.logger.error(f"=== DEBUG RETRIEVE: Traceback: {traceback.format_exc()} ===")
             return None
 
+    def _open_object(self, result_id: str, check_exists: bool = True) -> Optional[BinaryIO]:
+        """
+        Retrieve an object and open it for reading, None if the retrieval failed.
+
+        Objects of the worker object cache can be evicted by another task between their retrieval and
+        their opening, they are then retrieved again. Once opened, they stay readable.
+        """
+        for _ in range(2):
+            object_path = self.retrieve_object_path(result_id, check_exists=check_exists)
+            if object_path is None:
+                return None
+            try:
+                return open(object_path, "rb")
+            except FileNotFoundError:
+                self.logger.warning(f"Object {result_id} was evicted from the worker object cache, retrieving it again")
+                check_exists = False
+        self.logger.error(f"Object {result_id} was evicted from the worker object cache after every retrieval")
+        return None
+
     def get_object_path(self, result_id: str) -> Path:
         """
         Get the local file path where an object would be stored.
@@ -147,7 +200,8 @@ class PymonikContext:
         Returns:
             Path: The local path where the object is/would be stored
         """
-        return Path("/cache/shared/") / Path(self.task_handler.token) / Path(result_id)
+        cache_root = os.getenv("PYMONIK_WORKER_CACHE_DIR", _DEFAULT_CACHE_ROOT)
+        return Path(cache_root) / Path(self.task_handler.token) / Path(result_id)
 
     def object_exists_locally(self, result_id: str) -> bool:
         """
@@ -159,7 +213,16 @@ class PymonikContext:
         Returns:
             bool: True if the object exists locally, False otherwise
         """
-        return self.get_object_path(result_id).exists()
+        if self.get_object_path(result_id).exists():
+            return True
+        object_cache = get_worker_cache(self.logger)
+        return object_cache is not None and object_cache.contains(result_id)
+
+    @property
+    def cache_metrics(self) -> Optional[CacheMetrics]:
+        """Hit/miss/eviction counters of the worker object cache, None if the cache is unavailable."""
+        object_cache = get_worker_cache(self.logger)
+        return object_cache.metrics if object_cache is not None else None
 
     def materialize_file(self, mat: Materialize) -> bool:
         """
@@ -177,11 +240,18 @@ class PymonikContext:
         
         worker_path = Path(mat.worker_path)
         
-        # Check if file/directory already exists and has correct hash
+        # Check the existing content against its manifest marker, which only costs stat calls
+        if _check_materialize_marker(worker_path, mat.content_hash, mat.is_directory):
+            self.logger.info(f"Materialize content already exists with correct hash: {worker_path}")
+            return True
+
+        # Content without a (valid) marker, e.g. materialized by an older worker, is hashed once
         if worker_path.exists():
             try:
+                existing_file_hashes = None
                 if mat.is_directory and worker_path.is_dir():
-                    existing_hash = _calculate_directory_hash(worker_path)
+                    existing_file_hashes = _calculate_directory_manifest(worker_path)
+                    existing_hash = _calculate_manifest_hash(existing_file_hashes)
                 elif not mat.is_directory and worker_path.is_file():
                     existing_hash = _calculate_file_hash(worker_path)
                 else:
@@ -190,6 +260,9 @@ class PymonikContext:
                 
                 if existing_hash == mat.content_hash:
                     self.logger.info(f"Materialize content already exists with correct hash: {worker_path}")
+                    _write_materialize_marker(
+                        worker_path, mat.content_hash, mat.is_directory, file_hashes=existing_file_hashes
+                    )
                     return True
                 else:
                     self.logger.info(f"Materialize content exists but hash mismatch, re-materializing: {worker_path}")
@@ -200,37 +273,55 @@ class PymonikContext:
         if not mat.result_id:
             self.logger.error(f"Materialize object has no result_id: {mat}")
             return False
+
+        if mat.per_file_sync:
+            return self._materialize_files(mat, worker_path)
         
+        # New content is written to a staging path next to the target, then renamed into place
+        staging_path = worker_path.with_name(f".{worker_path.name}.pymonik-tmp-{uuid.uuid4().hex}")
         try:
-            # Retrieve the content
-            content_bytes = self.retrieve_object(mat.result_id, auto_unpickle=False, check_exists=False)
-            if not content_bytes:
+            # Retrieve the content to the local cache, it is streamed from there without loading it in memory
+            object_file = self._open_object(mat.result_id)
+            if object_file is None:
                 self.logger.error(f"Failed to retrieve materialize content: {mat.result_id}")
                 return False
             
             # Create parent directories
             worker_path.parent.mkdir(parents=True, exist_ok=True)
             
-            if mat.is_directory:
-                # Extract zip to target directory
-                with zipfile.ZipFile(io.BytesIO(content_bytes), 'r') as zipf:
-                    zipf.extractall(worker_path)
-                self.logger.info(f"Extracted directory to: {worker_path}")
-            else:
-                # Write file directly
-                with open(worker_path, 'wb') as f:
-                    f.write(content_bytes)
-                self.logger.info(f"Wrote file to: {worker_path}")
+            with object_file:
+                if mat.is_directory:
+                    # Extract zip to the staging directory
+                    with zipfile.ZipFile(object_file, 'r') as zipf:
+                        zipf.extractall(staging_path)
+                else:
+                    # Copy the file (not linked, the cached object must not change if the task edits the file)
+                    with open(staging_path, "wb") as staging_file:
+                        shutil.copyfileobj(object_file, staging_file)
             
-            # Verify hash after materialization
+            # Verify hash before moving the content into place
+            staged_file_hashes = None
             if mat.is_directory:
-                final_hash = _calculate_directory_hash(worker_path)
+                staged_file_hashes = _calculate_directory_manifest(staging_path)
+                final_hash = _calculate_manifest_hash(staged_file_hashes)
             else:
-                final_hash = _calculate_file_hash(worker_path)
+                final_hash = _calculate_file_hash(staging_path)
             
             if final_hash != mat.content_hash:
                 self.logger.error(f"Hash mismatch after materialization: expected {mat.content_hash}, got {final_hash}")
                 return False
+
+            try:
+                _replace_path(staging_path, worker_path)
+            except OSError:
+                # Another task on this node may have materialized the same content concurrently
+                if _check_materialize_marker(worker_path, mat.content_hash, mat.is_directory):
+                    self.logger.info(f"Materialize content was concurrently materialized: {worker_path}")
+                    return True
+                raise
+            _write_materialize_marker(
+                worker_path, mat.content_hash, mat.is_directory, file_hashes=staged_file_hashes
+            )
             
             self.logger.info(f"Successfully materialized: {mat.source_path} -> {worker_path}")
             return True
@@ -238,3 +329,77 @@ class PymonikContext:
         except Exception as e:
             self.logger.error(f"Error materializing content: {e}")
             return False
+        finally:
+            _remove_path(staging_path)
+
+    def _materialize_files(self, mat: Materialize, worker_path: Path) -> bool:
+        """
+        Materialize a per-file synced directory, only fetching the files that differ from the local copy.
+
+        Files are assembled in a staging directory (local files that are still valid are hard linked
+        into it) which is then renamed into place.
+        """
+        staging_path = worker_path.with_name(f".{worker_path.name}.pymonik-tmp-{uuid.uuid4().hex}")
+        try:
+            manifest_bytes = self.retrieve_object(mat.result_id, auto_unpickle=False)
+            if not manifest_bytes:
+                self.logger.error(f"Failed to retrieve materialize manifest: {mat.result_id}")
+                return False
+            files: Dict[str, Tuple[str, str]] = pickle.loads(manifest_bytes)
+            file_hashes = {relative_path: file_hash for relative_path, (file_hash, _) in files.items()}
+            if _calculate_manifest_hash(file_hashes) != mat.content_hash:
+                self.logger.error(f"Materialize manifest {mat.result_id} doesn't match hash {mat.content_hash}")
+                return False
+
+            # Local files still matching the marker are reused, without a marker files at the same path are hashed
+            local_hashes = _get_intact_file_hashes(worker_path)
+            if not local_hashes and worker_path.is_dir():
+                for relative_path in files:
+                    local_file = worker_path / relative_path
+                    if local_file.is_file():
+                        local_hashes[relative_path] = _calculate_file_hash(local_file)
+            local_paths = {file_hash: worker_path / relative_path for relative_path, file_hash in local_hashes.items()}
+
+            worker_path.parent.mkdir(parents=True, exist_ok=True)
+            staging_path.mkdir()
+            fetched_count = 0
+            for relative_path, (file_hash, file_result_id) in files.items():
+                destination = staging_path / relative_path
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                if file_hash in local_paths:
+                    _link_or_copy(local_paths[file_hash], destination)
+                    continue
+                object_file = self._open_object(file_result_id)
+                if object_file is None:
+                    self.logger.error(f"Failed to retrieve materialize file {relative_path}: {file_result_id}")
+                    return False
+                # Copied rather than linked, the cached object must not change if the task edits the file
+                with object_file, open(destination, "wb") as destination_file:
+                    shutil.copyfileobj(object_file, destination_file)
+                if _calculate_file_hash(destination) != file_hash:
+                    self.logger.error(f"Hash mismatch after retrieving materialize file {relative_path}")
+                    return False
+                local_paths[file_hash] = destination
+                fetched_count += 1
+
+            try:
+                _replace_path(staging_path, worker_path)
+            except OSError:
+                # Another task on this node may have materialized the same content concurrently
+                if _check_materialize_marker(worker_path, mat.content_hash, mat.is_directory):
+                    self.logger.info(f"Materialize content was concurrently materialized: {worker_path}")
+                    return True
+                raise
+            _write_materialize_marker(worker_path, mat.content_hash, mat.is_directory, file_hashes=file_hashes)
+
+            self.logger.info(
+                f"Successfully materialized: {mat.source_path} -> {worker_path} "
+                f"({fetched_count} of {len(files)} files fetched)"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error materializing content: {e}")
+            return False
+        finally:
+            _remove_path(staging_path)
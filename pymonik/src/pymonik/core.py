@@ -1,7 +1,12 @@
+import collections
 import contextvars
+import hashlib
 import io
+import itertools
+import threading
 import os
 import sys
+import tempfile
 import zipfile
 import signal
 
@@ -9,14 +14,28 @@ import uuid
 import yaml
 import cloudpickle as pickle
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from typing import Any, Callable, Dict, Generic, List, Optional, ParamSpec, Tuple, TypeVar, Union
-from .utils import LazyArgs, _poll_batch_for_results, create_grpc_channel
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, ParamSpec, Tuple, TypeVar, Union
+from .utils import LazyArgs, PickledObject, create_grpc_channel, hash_canonical, hash_pickle, stream_pickle, upload_result_stream
+from .polling import ResultPoller
+from .tracking import StatusTracker
 from .results import ResultHandle, MultiResultHandle
-from .materialize import Materialize, _create_zip_from_directory
+from .materialize import (
+    Materialize,
+    _calculate_directory_manifest,
+    _calculate_manifest_hash,
+    _create_zip_from_directory,
+    _list_directory_files,
+)
+from .hash_index import get_default_hash_index
+from .chunking import chunk_result_name, content_defined_chunks, encode_chunk_manifest
+from .memo import MemoStore, get_default_memo_store
+from .local import LocalBackend
+from .tracing import get_default_tracer
 
 from armonik.client import ArmoniKTasks, ArmoniKResults, ArmoniKSessions, ArmoniKEvents
-from armonik.common import TaskOptions, TaskDefinition, Result, batched
+from armonik.common import TaskOptions, TaskDefinition, Result, ResultStatus, batched
 from armonik.worker import TaskHandler 
 
 _CURRENT_PYMONIK: contextvars.ContextVar[Optional["Pymonik"]] = contextvars.ContextVar(
@@ -29,17 +48,94 @@ R_Type = TypeVar("R_Type")
 U_Obj = TypeVar("U_Obj") # For single object in put
 V_Obj = TypeVar("V_Obj") # For type of objects in a list for put_many
 
+# Archives up to this size are built in memory, larger ones spill to a temporary file
+_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+# Maximum amount of data (in bytes) read in memory for a single batched upload
+_MAX_UPLOAD_BATCH_BYTES = 64 * 1024 * 1024
+
+# Result IDs of memoized invocations, keyed by (session ID, invocation key) and shared by the Pymonik
+# instances of the process (a worker process runs many tasks of the same session). The entries of a
+# session are dropped when the client closes it.
+_INVOCATION_MEMO: "collections.OrderedDict[Tuple[str, str], List[str]]" = collections.OrderedDict()
+_INVOCATION_MEMO_MAX_SIZE = 100_000
+_invocation_memo_lock = threading.Lock()
+
+
+def _forget_invocations(session_id: str) -> None:
+    """Drop the memoized invocations of a session."""
+    with _invocation_memo_lock:
+        for memo_key in [memo_key for memo_key in _INVOCATION_MEMO if memo_key[0] == session_id]:
+            del _INVOCATION_MEMO[memo_key]
+
+
+def _known_size(arg: Any) -> Optional[int]:
+    """Size of the data of bytes-like objects and arrays, known without pickling them. None for other objects."""
+    if isinstance(arg, (bytes, bytearray)):
+        return len(arg)
+    nbytes = getattr(arg, "nbytes", None)
+    # Arrays of Python objects only count their pointers
+    if isinstance(nbytes, int) and not getattr(getattr(arg, "dtype", None), "hasobject", False):
+        return nbytes
+    return None
+
+
+def _spill_large_argument(
+    arg: Any, pymonik_instance: "Pymonik", spilled_args: Dict[int, Tuple[Any, Optional[str]]]
+) -> Tuple[Any, Optional[str]]:
+    """Upload an argument as its own result if its pickled size exceeds the spill threshold.
+
+    Arguments are pickled at most once: bytes-like objects and arrays are sized without pickling them
+    (and pickled while they are uploaded when spilled), other objects are pickled to be sized and, if
+    they stay in the payload, embedded in their pickled form.
+
+    Returns:
+        Tuple[Any, Optional[str]]: The value to put in the payload, and the ID of the result holding the
+            argument if it was spilled (None if it stays in the payload).
+    """
+    threshold = pymonik_instance.arg_spill_threshold
+    if threshold is None or arg is None or isinstance(arg, (bool, int, float, complex)):
+        return arg, None
+    if isinstance(arg, str) and len(arg) * 4 < threshold:
+        return arg, None
+    if id(arg) in spilled_args:
+        return spilled_args[id(arg)]
+    name = f"{pymonik_instance._session_id}__spilled_arg__{uuid.uuid4()}"
+    size = _known_size(arg)
+    spilled_result_id = None
+    if size is not None:
+        value = arg
+        if size > threshold:
+            spilled_result_id = pymonik_instance._upload_object(name, arg)
+    else:
+        arg_bytes = pickle.dumps(arg)
+        value = PickledObject(arg_bytes)
+        if len(arg_bytes) > threshold:
+            spilled_result_id = pymonik_instance._upload_bytes(name, arg_bytes)
+    if spilled_result_id is not None:
+        # Passed like a ResultHandle, keeping the payload small and letting workers cache it
+        value = f"__result_handle__{spilled_result_id}"
+    spilled_args[id(arg)] = value, spilled_result_id
+    return value, spilled_result_id
+
+
 class Task(Generic[P_Args, R_Type]):
     """A wrapper for a function that can be executed as an ArmoniK task."""
 
     def __init__(
-        self, func: Callable, require_context: bool = False, func_name: str = None,        task_options: Optional[TaskOptions] = None
-
+        self, func: Callable, require_context: bool = False, func_name: str = None,        task_options: Optional[TaskOptions] = None,
+        num_returns: int = 1, shared_memory: bool = False, memoize: bool = False, cache: bool = False
     ):
+        if num_returns < 1:
+            raise ValueError(f"num_returns must be at least 1, got {num_returns}")
         self.func: Callable[P_Args, R_Type] = func
         self.func_name = func_name or func.__name__
         self.require_context = require_context
         self.task_options = task_options
+        self.num_returns = num_returns
+        self.shared_memory = shared_memory
+        self.memoize = memoize
+        self.cache = cache
+        self._func_digest: Optional[str] = None
 
 
     def _merge_task_options(
@@ -112,8 +208,11 @@ class Task(Generic[P_Args, R_Type]):
     # TODO: repeat invocations for parameter-less functions my_function.invoke(repeat=5)
     def invoke(
         self, *args, pymonik: Optional["Pymonik"] = None, delegate=False, task_options: Optional[TaskOptions] = None, **kwargs
-    ) -> ResultHandle[R_Type]:
-        """Invoke the task with the given arguments."""
+    ) -> Union[ResultHandle[R_Type], MultiResultHandle]:
+        """Invoke the task with the given arguments.
+
+        Returns a ResultHandle, or a MultiResultHandle with one handle per output if the task has num_returns > 1.
+        """
 
         pmk_kwargs = {k: v for k, v in kwargs.items() if k.startswith('pmk_')}
         regular_kwargs = {k: v for k, v in kwargs.items() if not k.startswith('pmk_')}
@@ -132,8 +231,10 @@ class Task(Generic[P_Args, R_Type]):
         
         if len(args) == 0:
             results = self._invoke_multiple([(Pymonik.NoInput,)], pymonik, delegate, merged_task_options)
-            return results[0]
-        results: List[ResultHandle[R_Type]] = self._invoke_multiple([args], pymonik, delegate, merged_task_options, additional_kwargs=regular_kwargs if regular_kwargs != {} else None)
+        else:
+            results = self._invoke_multiple([args], pymonik, delegate, merged_task_options, additional_kwargs=regular_kwargs if regular_kwargs != {} else None)
+        if self.num_returns > 1:
+            return results
         return results[0]
 
     def map_invoke(
@@ -143,8 +244,11 @@ class Task(Generic[P_Args, R_Type]):
         delegate=False,
         task_options: Optional[TaskOptions] = None,
         **kwargs
-    ) -> MultiResultHandle:
-        """Invoke the task with the given arguments and return a MultiResultHandle."""
+    ) -> Union[MultiResultHandle, List[MultiResultHandle]]:
+        """Invoke the task with the given arguments and return a MultiResultHandle.
+
+        If the task has num_returns > 1, a list with one MultiResultHandle (over the task's outputs) per invocation is returned instead.
+        """
         
         pmk_kwargs = {k: v for k, v in kwargs.items() if k.startswith('pmk_')}
         
@@ -158,16 +262,161 @@ class Task(Generic[P_Args, R_Type]):
         merged_task_options = self._merge_task_options(pymonik, task_options, pmk_kwargs)
                 
         # Handle the case of multiple tasks
-        result_handles: List[ResultHandle[R_Type]] = self._invoke_multiple(args_list, pymonik, delegate, merged_task_options)
-        return MultiResultHandle(result_handles)
+        result_handles = self._invoke_multiple(args_list, pymonik, delegate, merged_task_options)
+        if self.num_returns > 1:
+            return [
+                result_handles[i : i + self.num_returns]
+                for i in range(0, len(result_handles), self.num_returns)
+            ]
+        return result_handles
 
     def __call__(self, *args, **kwds):
         return self.func(*args, **kwds)
 
+    def _invocation_key(self, args: Tuple, pymonik_instance: "Pymonik", persistent: bool = False) -> Optional[str]:
+        """Hash identifying an invocation: the pickled function, plain arguments and the IDs of result arguments.
+
+        Persistent keys, valid across sessions, identify result arguments by the cache keys of the invocations
+        that produced them instead of their IDs. None is returned if a result argument has no cache key.
+        """
+        if self._func_digest is None:
+            self._func_digest = hash_canonical(self.func)
+        invocation_hash = hashlib.sha256(self._func_digest.encode())
+
+        def _result_token(result_id: str) -> Optional[str]:
+            return pymonik_instance._result_cache_keys.get(result_id) if persistent else result_id
+
+        for arg in args:
+            if arg is pymonik_instance.NoInput:
+                invocation_hash.update(b"noinput")
+            elif isinstance(arg, ResultHandle):
+                token = _result_token(arg.result_id)
+                if token is None:
+                    return None
+                invocation_hash.update(f"handle:{token}".encode())
+            elif isinstance(arg, MultiResultHandle):
+                tokens = [_result_token(result_id) for result_id in arg.result_ids]
+                if None in tokens:
+                    return None
+                invocation_hash.update(f"handles:{','.join(tokens)}".encode())
+            elif isinstance(arg, Materialize):
+                invocation_hash.update(f"materialize:{arg.content_hash}:{arg.worker_path}".encode())
+            else:
+                # Canonical, so that keys of arguments holding sets are the same in every process
+                invocation_hash.update(f"value:{hash_canonical(arg)}".encode())
+        return invocation_hash.hexdigest()
+
+    def _invoke_memoized(
+        self, args_list: List[Tuple], pymonik_instance: "Pymonik", task_options: TaskOptions
+    ) -> MultiResultHandle:
+        """Invoke the task, reusing the results of identical invocations already submitted in the session."""
+        if not pymonik_instance._connected:
+            pymonik_instance.create()
+        session_id = pymonik_instance._session_id
+        keys = [self._invocation_key(args, pymonik_instance) for args in args_list]
+        with _invocation_memo_lock:
+            memoized = {key: _INVOCATION_MEMO[(session_id, key)] for key in keys if (session_id, key) in _INVOCATION_MEMO}
+        # Identical invocations within the same call are submitted once as well
+        missing = {}
+        for key, args in zip(keys, args_list):
+            if key not in memoized:
+                missing.setdefault(key, args)
+        if missing:
+            submitted = self._invoke_multiple(
+                list(missing.values()), pymonik_instance, False, task_options, use_memo=False
+            ).result_ids
+            with _invocation_memo_lock:
+                for i, key in enumerate(missing):
+                    memoized[key] = submitted[i * self.num_returns : (i + 1) * self.num_returns]
+                    _INVOCATION_MEMO[(session_id, key)] = memoized[key]
+                while len(_INVOCATION_MEMO) > _INVOCATION_MEMO_MAX_SIZE:
+                    _INVOCATION_MEMO.popitem(last=False)
+        return MultiResultHandle.from_result_ids(
+            (result_id for key in keys for result_id in memoized[key]), session_id, pymonik_instance
+        )
+
+    def _invoke_cached(
+        self, args_list: List[Tuple], pymonik_instance: "Pymonik", task_options: TaskOptions
+    ) -> MultiResultHandle:
+        """Invoke the task, taking the outputs of invocations computed in previous runs from the persistent cache."""
+        if not pymonik_instance._connected:
+            pymonik_instance.create()
+        session_id = pymonik_instance._session_id
+        memo_store = pymonik_instance._get_memo_store()
+        output_keys = []
+        cached_values: Dict[str, bytes] = {}
+        missing_args = []
+        for args in args_list:
+            key = self._invocation_key(args, pymonik_instance, persistent=True)
+            keys = [f"{key}:{i}" for i in range(self.num_returns)] if key is not None else None
+            if keys is not None and memo_store is not None:
+                values = [cached_values.get(k) or memo_store.get(k) for k in keys]
+                if all(value is not None for value in values):
+                    cached_values.update(zip(keys, values))
+                    output_keys.append(keys)
+                    continue
+            missing_args.append((args, keys))
+            output_keys.append(None)
+
+        # Cached values are uploaded as completed results, so that they can be used like any task output
+        cached_names = {k: f"{session_id}__cached__{self.func_name}__{k.replace(':', '_')}" for k in cached_values}
+        uploaded = pymonik_instance._dispatch_create_payloads(
+            {cached_names[k]: value for k, value in cached_values.items()}
+        ) if cached_values else {}
+        submitted_ids = []
+        if missing_args:
+            missing_list = [args for args, _ in missing_args]
+            if self.memoize:
+                submitted_ids = self._invoke_memoized(missing_list, pymonik_instance, task_options).result_ids
+            else:
+                submitted_ids = self._invoke_multiple(
+                    missing_list, pymonik_instance, False, task_options, use_memo=False
+                ).result_ids
+
+        result_ids = []
+        submitted = iter(submitted_ids)
+        missing_keys = iter(keys for _, keys in missing_args)
+        for keys in output_keys:
+            if keys is not None:
+                invocation_ids = [uploaded[cached_names[k]].result_id for k in keys]
+            else:
+                invocation_ids = [next(submitted) for _ in range(self.num_returns)]
+                keys = next(missing_keys)
+                if keys is not None:
+                    # Stored in the cache when the value is downloaded
+                    pymonik_instance._pending_cache_writes.update(zip(invocation_ids, keys))
+            if keys is not None:
+                pymonik_instance._result_cache_keys.update(zip(invocation_ids, keys))
+            result_ids.extend(invocation_ids)
+        if cached_values:
+            print(f"Task {self.func_name}: {len(args_list) - len(missing_args)} invocations taken from the cache, submitted {len(missing_args)}")
+        return MultiResultHandle.from_result_ids(result_ids, session_id, pymonik_instance)
+
     def _invoke_multiple(
-        self, args_list: List[Tuple], pymonik_instance: "Pymonik", delegate: bool, task_options: TaskOptions, additional_kwargs: Optional[Dict[str, Any]] = None
-    ) -> List[ResultHandle]:
-        """Invoke a multiple tasks with the given arguments."""
+        self, args_list: List[Tuple], pymonik_instance: "Pymonik", delegate: bool, task_options: TaskOptions, additional_kwargs: Optional[Dict[str, Any]] = None,
+        use_memo: bool = True
+    ) -> MultiResultHandle:
+        """Invoke a multiple tasks with the given arguments.
+
+        Returns the handles of all the outputs, num_returns consecutive handles per invocation.
+        """
+        # Delegated invocations write to the parent's results, they can't be shared with other invocations
+        if self.cache and use_memo and not delegate and not pymonik_instance.is_worker():
+            return self._invoke_cached(args_list, pymonik_instance, task_options)
+        if self.memoize and use_memo and not delegate:
+            return self._invoke_memoized(args_list, pymonik_instance, task_options)
+
+        tracer = get_default_tracer()
+        with tracer.span(
+            "pymonik.invoke",
+            attributes={"pymonik.function": self.func_name, "pymonik.invocations": len(args_list)},
+        ):
+            return self._submit_invocations(args_list, pymonik_instance, delegate, task_options, tracer)
+
+    def _submit_invocations(
+        self, args_list: List[Tuple], pymonik_instance: "Pymonik", delegate: bool, task_options: TaskOptions, tracer
+    ) -> MultiResultHandle:
+        """Create the payloads and outputs of invocations and submit their tasks, one phase (span) at a time."""
         # Ensure we have an active connection and session
 
         if delegate and not pymonik_instance.is_worker():
@@ -204,70 +453,92 @@ class Task(Generic[P_Args, R_Type]):
         all_function_invocation_info = []
         all_result_names = []
         all_payloads = {}
-        for args in args_list:
-            payload_name = f"{pymonik_instance._session_id}__payload__{self.func_name}__{uuid.uuid4()}"
-            result_name = f"{pymonik_instance._session_id}__output__{self.func_name}__{uuid.uuid4()}"
-            function_invocation_info = {
-                "data_dependencies": [function_id],
-                "payload_name": payload_name,
-                "result_name": result_name,
-            }
-            processed_args = []
-            # Prepare function call args description
-            for arg in args:
-                if arg is pymonik_instance.NoInput:
-                    processed_args.append("__no_input__")
-                elif isinstance(arg, ResultHandle):
-                    function_invocation_info["data_dependencies"].append(arg.result_id)
-                    processed_args.append(f"__result_handle__{arg.result_id}")
-                elif isinstance(arg, MultiResultHandle):
-                    # If it's a MultiResultHandle, add all result IDs as dependencies
-                    for handle in arg.result_handles:
-                        function_invocation_info["data_dependencies"].append(
-                            handle.result_id
-                        )
-                    processed_args.append(
-                        f"__multi_result_handle__"
-                        + ",".join([handle.result_id for handle in arg.result_handles])
-                    )
-                elif isinstance(arg, Materialize):
-                    if not arg.result_id:
-                        raise ValueError(f"Materialize object must be uploaded first: {arg}")
-                    # Add the materialized content as a dependency
-                    function_invocation_info["data_dependencies"].append(arg.result_id)
-                    # Pass the Materialize object directly (it will be pickled)
-                    processed_args.append(arg)
-                else:
-                    processed_args.append(arg)
-
-            # Serialize the function call information
-            payload = pickle.dumps(
-                {
-                    "func_name": self.func_name,
-                    "func_id": function_id,
-                    "require_context": self.require_context,
-                    "environment": pymonik_instance.environment,
-                    "args": LazyArgs(processed_args),
+        # Large arguments shared by several invocations (e.g. with map_invoke) are only spilled once
+        spilled_args: Dict[int, Tuple[Any, Optional[str]]] = {}
+        # The tasks' spans on the workers are children of the invocation's span
+        trace_context = tracer.current_traceparent()
+        with tracer.span("pymonik.serialize"):
+            for args in args_list:
+                payload_name = f"{pymonik_instance._session_id}__payload__{self.func_name}__{uuid.uuid4()}"
+                result_names = [
+                    f"{pymonik_instance._session_id}__output__{self.func_name}__{uuid.uuid4()}"
+                    for _ in range(self.num_returns)
+                ]
+                function_invocation_info = {
+                    "data_dependencies": [function_id],
+                    "payload_name": payload_name,
+                    "result_names": result_names,
                 }
-            )
+                processed_args = []
+                # Prepare function call args description
+                for arg in args:
+                    if arg is pymonik_instance.NoInput:
+                        processed_args.append("__no_input__")
+                    elif isinstance(arg, ResultHandle):
+                        function_invocation_info["data_dependencies"].append(arg.result_id)
+                        processed_args.append(f"__result_handle__{arg.result_id}")
+                    elif isinstance(arg, MultiResultHandle):
+                        # If it's a MultiResultHandle, add all result IDs as dependencies
+                        multi_result_ids = arg.result_ids
+                        function_invocation_info["data_dependencies"].extend(multi_result_ids)
+                        processed_args.append(
+                            f"__multi_result_handle__" + ",".join(multi_result_ids)
+                        )
+                    elif isinstance(arg, Materialize):
+                        if not arg.result_id:
+                            raise ValueError(f"Materialize object must be uploaded first: {arg}")
+                        # Add the materialized content as a dependency
+                        function_invocation_info["data_dependencies"].append(arg.result_id)
+                        # Pass the Materialize object directly (it will be pickled)
+                        processed_args.append(arg)
+                    else:
+                        value, spilled_result_id = _spill_large_argument(arg, pymonik_instance, spilled_args)
+                        if (
+                            spilled_result_id is not None
+                            and spilled_result_id not in function_invocation_info["data_dependencies"]
+                        ):
+                            function_invocation_info["data_dependencies"].append(spilled_result_id)
+                        processed_args.append(value)
+
+                # Serialize the function call information
+                payload = pickle.dumps(
+                    {
+                        "func_name": self.func_name,
+                        "func_id": function_id,
+                        "require_context": self.require_context,
+                        "num_returns": self.num_returns,
+                        "shared_memory": self.shared_memory,
+                        "environment": pymonik_instance.environment,
+                        "args": LazyArgs(processed_args),
+                        "trace_context": trace_context,
+                    }
+                )
 
-            all_payloads[payload_name] = payload
-            all_result_names.append(result_name)
-            all_function_invocation_info.append(function_invocation_info)
+                all_payloads[payload_name] = payload
+                all_result_names.extend(result_names)
+                all_function_invocation_info.append(function_invocation_info)
         # Create result metadata for output
 
         if delegate:
+            parent_result_ids = pymonik_instance.parent_task_result_ids
+            if len(parent_result_ids) != self.num_returns:
+                raise RuntimeError(
+                    f"Cannot delegate to {self.func_name}: it has {self.num_returns} outputs but the parent task expects {len(parent_result_ids)}."
+                )
             results_created = {
-                all_function_invocation_info[0]["result_name"]: Result(
-                    result_id=pymonik_instance.parent_task_result_id
+                result_name: Result(result_id=parent_result_id)
+                for result_name, parent_result_id in zip(
+                    all_function_invocation_info[0]["result_names"], parent_result_ids
                 )
             }
         else:
-            results_created = pymonik_instance._dispatch_create_metadata(
-                all_result_names,
-            )
+            with tracer.span("pymonik.create_metadata", attributes={"pymonik.results": len(all_result_names)}):
+                results_created = pymonik_instance._dispatch_create_metadata(
+                    all_result_names,
+                )
         # Create the payloads for all the tasks to submit
-        payload_results = pymonik_instance._dispatch_create_payloads(all_payloads)
+        with tracer.span("pymonik.upload_payloads", attributes={"pymonik.payloads": len(all_payloads)}):
+            payload_results = pymonik_instance._dispatch_create_payloads(all_payloads)
 
         # Submit all the tasks:
         task_definitions = []
@@ -280,26 +551,26 @@ class Task(Generic[P_Args, R_Type]):
                         invocation_info["payload_name"]
                     ].result_id,
                     expected_output_ids=[
-                        results_created[invocation_info["result_name"]].result_id
+                        results_created[result_name].result_id
+                        for result_name in invocation_info["result_names"]
                     ],
                     data_dependencies=invocation_info["data_dependencies"],
                 )
             )
 
         # Submit the task
-        pymonik_instance._dispatch_submit_tasks(
-            task_definitions,  # TODO: use different batch size for tasks/results
-            task_options
-        )
-
-        # Return a handle to the result
-        result_handles = [
-            ResultHandle(
-                result.result_id, pymonik_instance._session_id, pymonik_instance
+        with tracer.span("pymonik.submit", attributes={"pymonik.tasks": len(task_definitions)}):
+            pymonik_instance._dispatch_submit_tasks(
+                task_definitions,  # TODO: use different batch size for tasks/results
+                task_options
             )
-            for result in results_created.values()
-        ]
-        return result_handles
+
+        # Return a handle to the results, without creating a ResultHandle per result
+        return MultiResultHandle.from_result_ids(
+            (results_created[result_name].result_id for result_name in all_result_names),
+            pymonik_instance._session_id,
+            pymonik_instance,
+        )
 
 class Pymonik:
     """A wrapper around ArmoniK for task-based distributed computing."""
@@ -318,7 +589,13 @@ class Pymonik:
         disable_events_client: bool = False,
         polling_interval: int = 1,
         polling_batch_size: int = 10,
-        local_session: bool = False
+        max_polling_interval: float = 10,
+        polling_parallelism: int = 8,
+        arg_spill_threshold: Optional[int] = 1024 * 1024,
+        content_addressed_puts: bool = False,
+        memo_store: Optional[MemoStore] = None,
+        local_session: bool = False,
+        local_max_workers: Optional[int] = None,
     ):
         """Initializes a PymoniK client instance.
 
@@ -352,12 +629,23 @@ class Pymonik:
             disable_events_client: A flag to disable the use of the events client. This switches 
                 to a polling based approach for waiting for results.
             polling_interval: When using the polling based approach, polling interval in seconds.
+                The interval backs off up to `max_polling_interval` while no result changes status.
             polling_batch_size: Batch size to use when polling for results.
-            local_session: A flag intended to control session behavior,
-                for local testing, it makes it so your function invokes execute locally.
-                Note: This parameter is not actively used in the current
-                `__init__` body's logic but is stored for potential future use.
+            max_polling_interval: Upper bound of the polling interval in seconds when backing off.
+            polling_parallelism: Number of concurrent list requests used by a polling round.
+            arg_spill_threshold: Size in bytes above which a (pickled) task argument is uploaded as its
+                own result and passed as a data dependency instead of being embedded in the task payload.
+                Spilled arguments are cached by the workers. None disables spilling. Defaults to 1 MiB.
+            content_addressed_puts: Default for the content_addressed parameter of `put` and `put_many`.
                 Defaults to False.
+            memo_store: Backend of the persistent result cache of tasks declared with `@task(cache=True)`.
+                Defaults to a LocalMemoStore in the local cache directory.
+            local_session: If True, the session runs on a local backend instead of an ArmoniK cluster
+                (no endpoint needed): tasks run on a pool of local processes in dependency order, through
+                the same code path as on the workers, which makes it possible to develop and test workflows
+                without a cluster. The environment requested by tasks isn't installed. Defaults to False.
+            local_max_workers: Number of processes running the tasks of a local session.
+                Defaults to the number of CPUs.
         """
         self._endpoint = endpoint
         self._partition = partition
@@ -376,8 +664,22 @@ class Pymonik:
         self.disable_events_client = disable_events_client
         self.polling_interval = polling_interval
         self.polling_batch_size = polling_batch_size
+        self.max_polling_interval = max_polling_interval
+        self.polling_parallelism = polling_parallelism
+        self.arg_spill_threshold = arg_spill_threshold
+        self.content_addressed_puts = content_addressed_puts
+        self._memo_store = memo_store
+        self._local_session = local_session
+        self.local_max_workers = local_max_workers
+        self._local_backend: Optional[LocalBackend] = None
+        # Cache keys of the results of cached invocations, and those whose value isn't stored yet
+        self._result_cache_keys: Dict[str, str] = {}
+        self._pending_cache_writes: Dict[str, str] = {}
+        self._poller: Optional[ResultPoller] = None
+        self._status_tracker: Optional[StatusTracker] = None
         self.batch_size = batch_size
         self.task_handler: Optional[TaskHandler] = None
+        self._data_chunk_max_size: Optional[int] = None
         self._original_sigint_handler = None
         self._sigint_handler_set = False
 
@@ -438,6 +740,59 @@ class Pymonik:
             )
 
 
+    def _get_memo_store(self) -> Optional[MemoStore]:
+        return self._memo_store if self._memo_store is not None else get_default_memo_store()
+
+    def _store_cached_result(self, key: str, data: bytes) -> None:
+        """Store the value of a cached invocation output, downloaded by ResultHandle.get."""
+        memo_store = self._get_memo_store()
+        if memo_store is None:
+            return
+        try:
+            memo_store.put(key, data)
+        except Exception as e:
+            print(f"Could not store result in the task result cache: {e}")
+
+    def _get_data_chunk_max_size(self) -> int:
+        """Maximum size of a data chunk accepted by the results service, queried once."""
+        if not self._results_client:
+            raise RuntimeError("Results client not initialized.")
+        if self._data_chunk_max_size is None:
+            self._data_chunk_max_size = self._results_client.get_service_config()
+        return self._data_chunk_max_size
+
+    def _dispatch_upload_stream(
+        self, name: str, chunks: Iterable[bytes], progress: Optional[Callable[[int], None]] = None
+    ) -> Result:
+        """Internal method to create a result and stream its data in chunks, only available in client mode."""
+        if self.is_worker():
+            raise NotImplementedError(
+                "TaskHandler does not support streaming uploads."
+            )
+        chunk_size = self._get_data_chunk_max_size()
+        result = self._dispatch_create_metadata([name])[name]
+        upload_result_stream(
+            self._results_client,
+            self._session_id,
+            result.result_id,
+            chunks,
+            chunk_size=chunk_size,
+            progress=progress,
+        )
+        return result
+
+    def _upload_bytes(self, name: str, data: bytes) -> str:
+        """Upload data as a new result, sent in chunks of the service's maximum size. Returns the result ID."""
+        if self.is_worker():
+            return self._dispatch_create_payloads({name: data})[name].result_id
+        return self._dispatch_upload_stream(name, [data]).result_id
+
+    def _upload_object(self, name: str, obj: Any) -> str:
+        """Upload an object as a new result, pickled as it's sent so that it's never held pickled in memory. Returns the result ID."""
+        if self.is_worker():
+            return self._upload_bytes(name, pickle.dumps(obj))
+        return self._dispatch_upload_stream(name, stream_pickle(obj, self._get_data_chunk_max_size())).result_id
+
     def _dispatch_create_payloads(
         self, payloads: Dict[str, bytes]
     ) -> Dict[str, Result]:
@@ -471,32 +826,66 @@ class Pymonik:
             self._tasks_client.submit_tasks(self._session_id, task_definitions, default_task_options=task_options)
 
 
-    def _wait_for_results_availability(self, session_id: str, result_ids: List[str]):
-        if self.disable_events_client:
-            if not result_ids:
-                return
+    @property
+    def polling_metrics(self):
+        """Latency metrics of the polling backend, None if it hasn't been used."""
+        return self._poller.metrics if self._poller is not None else None
 
-            for batch_of_ids in batched(result_ids, self.polling_batch_size):
-                if not batch_of_ids: # This should not happen (please)
-                    continue
-                
-                _poll_batch_for_results(
-                    results_client=self._results_client,
-                    result_ids_in_batch=list(batch_of_ids), 
-                    polling_interval_seconds=self.polling_interval
-                )
-        else:
-            if self._events_client is None:
-                raise RuntimeError(
-                    "Events client (self._events_client) is not initialized. "
-                    "Ensure Pymonik.create() has been called or is active in the current context."
-                )
-            return self._events_client.wait_for_result_availability(
-                result_ids=result_ids,
-                session_id=session_id,
-                bucket_size=self.batch_size, # Use Pymonik's configured batch_size
-                parallelism=1               # Sensible default for events client path here
+    def _get_poller(self) -> ResultPoller:
+        if self._poller is None or self._poller.session_id != self._session_id:
+            if self._poller is not None:
+                self._poller.close()
+            self._poller = ResultPoller(
+                results_client=self._results_client,
+                session_id=self._session_id,
+                polling_interval=self.polling_interval,
+                max_polling_interval=self.max_polling_interval,
+                batch_size=self.polling_batch_size,
+                parallelism=self.polling_parallelism,
             )
+        return self._poller
+
+    def _get_status_tracker(self) -> StatusTracker:
+        """Shared tracker resolving the futures of this instance's result handles."""
+        self._ensure_client_ready()
+        poller = self._get_poller()
+        if self._status_tracker is None or self._status_tracker._poller is not poller:
+            if self._status_tracker is not None:
+                self._status_tracker.close()
+            self._status_tracker = StatusTracker(poller)
+        return self._status_tracker
+
+    def _known_result_status(self, result_id: str) -> Optional[ResultStatus]:
+        """Last status of a result seen by this instance (wait, download or poll), None if unknown."""
+        if self._poller is None or self._poller.session_id != self._session_id:
+            return None
+        return self._poller.status(result_id)
+
+    def _record_result_statuses(self, result_ids: List[str], status: ResultStatus) -> None:
+        """Remember the status of results, so that the futures of their handles resolve without polling."""
+        if self._is_worker_mode or not self._session_created:
+            return
+        self._get_poller().record(result_ids, status)
+
+    def _wait_for_results_availability(self, session_id: str, result_ids: List[str]):
+        with get_default_tracer().span("pymonik.wait", attributes={"pymonik.results": len(result_ids)}):
+            if self.disable_events_client:
+                if not result_ids:
+                    return
+                self._get_poller().wait(result_ids)
+            else:
+                if self._events_client is None:
+                    raise RuntimeError(
+                        "Events client (self._events_client) is not initialized. "
+                        "Ensure Pymonik.create() has been called or is active in the current context."
+                    )
+                self._events_client.wait_for_result_availability(
+                    result_ids=result_ids,
+                    session_id=session_id,
+                    bucket_size=self.batch_size, # Use Pymonik's configured batch_size
+                    parallelism=1               # Sensible default for events client path here
+                )
+                self._record_result_statuses(result_ids, ResultStatus.COMPLETED)
 
     def register_tasks(self, tasks: List[Task]):
         """Register a task with the PymoniK instance."""
@@ -543,12 +932,13 @@ class Pymonik:
     def create(
         self,
         task_handler: Optional[TaskHandler] = None,
-        expected_output: Optional[str] = None,
+        expected_output: Optional[Union[str, List[str]]] = None,
     ) -> "Pymonik":
         """Initialize client connections and create a session.
 
         Args:
             task_handler (Optional[TaskHandler]): The task handler to use in worker mode.
+            expected_output (Optional[Union[str, List[str]]]): The expected output(s) of the parent task in worker mode.
         Returns:
             Pymonik: The current instance of Pymonik.
         """
@@ -559,7 +949,11 @@ class Pymonik:
             self._connected = True  # Mark as 'connected' in worker context
             self._session_id = task_handler.session_id  # Get session from handler
             self._session_created = True  # Mark session as 'created' in worker context
-            self.parent_task_result_id = expected_output  # Store the expected output ID for the parent task to be used for subtasking.
+            # Store the expected output IDs of the parent task to be used for subtasking (delegation).
+            if isinstance(expected_output, str):
+                expected_output = [expected_output]
+            self.parent_task_result_ids = list(expected_output or [])
+            self.parent_task_result_id = self.parent_task_result_ids[0] if self.parent_task_result_ids else None
             return self
 
         if self._connected:
@@ -568,7 +962,11 @@ class Pymonik:
         # TODO: Cloudpickle goes in here (maintain registrar of serialized functions, send them over during init, can also do dank thing here like with unison)
 
         # Initialize clients
-        if self._endpoint != None:
+        if self._local_session:
+            # Local sessions run on a local stand-in for the cluster, with the same client interfaces
+            self._local_backend = LocalBackend(max_workers=self.local_max_workers)
+            self._channel = None
+        elif self._endpoint != None:
             # TODO: Add parameters for TLS
             self._channel = create_grpc_channel(self._endpoint)
         else:
@@ -593,10 +991,16 @@ class Pymonik:
                     client_key=client_key,
                 )
 
-        self._tasks_client = ArmoniKTasks(self._channel)
-        self._results_client = ArmoniKResults(self._channel)
-        self._sessions_client = ArmoniKSessions(self._channel)
-        self._events_client = ArmoniKEvents(self._channel)
+        if self._local_backend is not None:
+            self._tasks_client = self._local_backend.tasks_client
+            self._results_client = self._local_backend.results_client
+            self._sessions_client = self._local_backend.sessions_client
+            self._events_client = self._local_backend.events_client
+        else:
+            self._tasks_client = ArmoniKTasks(self._channel)
+            self._results_client = ArmoniKResults(self._channel)
+            self._sessions_client = ArmoniKSessions(self._channel)
+            self._events_client = ArmoniKEvents(self._channel)
         self._connected = True
 
         # Create a session
@@ -695,12 +1099,96 @@ class Pymonik:
         if not self._session_id:
              raise RuntimeError("Session ID not available after create().")
 
+    def _find_completed_results(self, names: List[str], names_per_query: int = 100) -> Dict[str, str]:
+        """Look up completed results of the session by name.
+
+        Returns:
+            Dict[str, str]: Name -> result ID for the names that have a completed result.
+        """
+        found = {}
+        for names_batch in batched(list(dict.fromkeys(names)), names_per_query):
+            names_filter = None
+            for name in names_batch:
+                condition = Result.name == name
+                names_filter = condition if names_filter is None else names_filter | condition
+            result_filter = (
+                (Result.session_id == self._session_id)
+                & (Result.status == ResultStatus.COMPLETED)
+                & names_filter
+            )
+            page = 0
+            while True:
+                total, results = self._results_client.list_results(
+                    result_filter=result_filter, page=page, page_size=1000
+                )
+                for result in results:
+                    found.setdefault(result.name, result.result_id)
+                page += 1
+                if not results or page * 1000 >= total:
+                    break
+        return found
+
+    def _upload_materialize_files(self, mat: Materialize, force_upload: bool = False) -> Dict[str, Tuple[str, str]]:
+        """Upload the files of a per-file synced directory as content-addressed results.
+
+        Only the files whose content isn't already in the session are uploaded.
+
+        Returns:
+            Dict[str, Tuple[str, str]]: Relative path -> (file hash, result ID).
+        """
+        manifest = _calculate_directory_manifest(mat.source_path, hash_index=get_default_hash_index())
+        if _calculate_manifest_hash(manifest) != mat.content_hash:
+            raise ValueError(f"Content of {mat.source_path} changed since it was materialized, call materialize again.")
+
+        file_result_names = {file_hash: f"materialize_file_{file_hash}" for file_hash in manifest.values()}
+        file_result_ids = {}
+        if not force_upload:
+            existing_results = self._find_completed_results(list(file_result_names.values()))
+            for file_hash, result_name in file_result_names.items():
+                if result_name in existing_results:
+                    file_result_ids[file_hash] = existing_results[result_name]
+
+        paths_by_hash = {file_hash: relative_path for relative_path, file_hash in manifest.items()}
+        missing_hashes = [file_hash for file_hash in file_result_names if file_hash not in file_result_ids]
+        print(
+            f"Materialize {mat.source_path}: {len(manifest)} files, "
+            f"{len(file_result_ids)} already uploaded, uploading {len(missing_hashes)}"
+        )
+        def _upload_batch(batch_hashes: List[str]) -> None:
+            payloads = {}
+            for file_hash in batch_hashes:
+                with open(os.path.join(mat.source_path, paths_by_hash[file_hash]), "rb") as f:
+                    payloads[file_result_names[file_hash]] = f.read()
+            upload_results = self._dispatch_create_payloads(payloads)
+            for file_hash in batch_hashes:
+                file_result_ids[file_hash] = upload_results[file_result_names[file_hash]].result_id
+
+        # Upload in batches bounded in bytes so that a large directory isn't held in memory at once
+        batch_hashes, batch_bytes = [], 0
+        for file_hash in missing_hashes:
+            batch_hashes.append(file_hash)
+            batch_bytes += os.path.getsize(os.path.join(mat.source_path, paths_by_hash[file_hash]))
+            if batch_bytes >= _MAX_UPLOAD_BATCH_BYTES:
+                _upload_batch(batch_hashes)
+                batch_hashes, batch_bytes = [], 0
+        if batch_hashes:
+            _upload_batch(batch_hashes)
+
+        return {
+            relative_path: (file_hash, file_result_ids[file_hash])
+            for relative_path, file_hash in manifest.items()
+        }
+
     def upload_materialize(self, mat: Materialize, force_upload: bool = False) -> Materialize:
         """
         Upload a Materialize object to ArmoniK if it doesn't already exist.
+
+        For per-file synced directories, each file is uploaded as its own content-addressed result
+        (skipping those already in the session) and the uploaded result is the file manifest.
         
         Args:
             mat: Materialize object to upload
+            force_upload: Upload the content even if it already exists in the session
             
         Returns:
             Materialize: Updated materialize object with result_id set
@@ -708,20 +1196,12 @@ class Pymonik:
         self._ensure_client_ready()
         
         # Check if result with this hash already exists
-        hash_result_name = f"materialize_{mat.content_hash}"
+        hash_result_name = self._materialize_result_name(mat)
         
         try:
-            # Try to list results to see if one with this name exists
-            # This is a simplified approach but it should work right?
-            # ... surely..?
-            
-            # Query for existing results with our hash name
-            existing_results = self._results_client.get_results_ids(
-                session_id=self._session_id,
-                names=[hash_result_name]
-            )
-            print(f"Existing Results = {existing_results}")
-            if not force_upload and hash_result_name in existing_results:
+            # Query for existing (completed) results with our hash name
+            existing_results = {} if force_upload else self._find_completed_results([hash_result_name])
+            if hash_result_name in existing_results:
                 existing_result_id = existing_results[hash_result_name]
                 print(f"Materialize content with hash {mat.content_hash} already exists: {existing_result_id}")
                 mat.result_id = existing_result_id
@@ -731,60 +1211,277 @@ class Pymonik:
             # If query fails, proceed with upload
             print(f"Could not check for existing materialize content: {e}")
         
-        # Prepare content for upload
-        if mat.is_directory:
-            content_bytes = _create_zip_from_directory(mat.source_path)
+        # Upload to ArmoniK, archives and files are streamed in chunks to keep memory use constant
+        if mat.per_file_sync:
+            content_bytes = pickle.dumps(self._upload_materialize_files(mat, force_upload))
+            upload_results = self._dispatch_create_payloads({hash_result_name: content_bytes})
+            mat.result_id = upload_results[hash_result_name].result_id
         else:
-            with open(mat.source_path, 'rb') as f:
-                content_bytes = f.read()
-        # Upload to ArmoniK
-        upload_results = self._dispatch_create_payloads({hash_result_name: content_bytes})
-        mat.result_id = upload_results[hash_result_name].result_id
+            mat.result_id = self._stream_materialize_content(mat, hash_result_name)
         
         print(f"Uploaded materialize content: {mat.source_path} -> {mat.result_id} (hash: {mat.content_hash})")
         return mat
 
-    def put(self, obj: U_Obj, name: Optional[str] = None) -> ResultHandle[U_Obj]:
+    @staticmethod
+    def _materialize_result_name(mat: Materialize) -> str:
+        """Content-addressed result name of a Materialize object, per-file manifests don't share names with archives."""
+        if mat.per_file_sync:
+            return f"materialize_manifest_{mat.content_hash}"
+        return f"materialize_{mat.content_hash}"
+
+    def _stream_materialize_content(self, mat: Materialize, result_name: str) -> str:
+        """Stream the content of a file or the archive of a directory to a new result, returns its ID."""
+        if mat.is_directory:
+            with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE) as spool:
+                _create_zip_from_directory(mat.source_path, spool)
+                spool.seek(0)
+                return self._dispatch_upload_stream(
+                    result_name, iter(lambda: spool.read(_SPOOL_MAX_SIZE // 16), b"")
+                ).result_id
+        with open(mat.source_path, 'rb') as f:
+            return self._dispatch_upload_stream(
+                result_name, iter(lambda: f.read(_SPOOL_MAX_SIZE // 16), b"")
+            ).result_id
+
+    def _read_materialize_content(self, mat: Materialize, force_upload: bool = False) -> bytes:
+        """Read the content to upload for a Materialize object in memory."""
+        if mat.per_file_sync:
+            return pickle.dumps(self._upload_materialize_files(mat, force_upload))
+        if mat.is_directory:
+            return _create_zip_from_directory(mat.source_path)
+        with open(mat.source_path, 'rb') as f:
+            return f.read()
+
+    def upload_materialize_many(
+        self, mats: List[Materialize], force_upload: bool = False, max_workers: int = 8
+    ) -> List[Materialize]:
+        """
+        Upload many Materialize objects to ArmoniK at once.
+
+        The existing contents are looked up with a single batched query, the missing ones are read
+        (and zipped) in parallel and uploaded in batches. Objects sharing the same content are only
+        uploaded once. Contents larger than a batch are streamed individually.
+
+        Args:
+            mats: Materialize objects to upload
+            force_upload: Upload the contents even if they already exist in the session
+            max_workers: Number of threads reading the contents to upload
+
+        Returns:
+            List[Materialize]: The materialize objects with their result_id set, in the same order
+        """
+        self._ensure_client_ready()
+        if not mats:
+            return []
+
+        mats_by_name: Dict[str, List[Materialize]] = {}
+        for mat in mats:
+            mats_by_name.setdefault(self._materialize_result_name(mat), []).append(mat)
+
+        result_ids = {}
+        if not force_upload:
+            try:
+                result_ids.update(self._find_completed_results(list(mats_by_name)))
+            except Exception as e:
+                # If query fails, proceed with upload
+                print(f"Could not check for existing materialize content: {e}")
+        missing_names = [name for name in mats_by_name if name not in result_ids]
+
+        def _estimated_size(mat: Materialize) -> int:
+            if mat.per_file_sync:
+                # Only the manifest is uploaded here, the files are batched by _upload_materialize_files
+                return 0
+            if mat.is_directory:
+                return sum(
+                    os.path.getsize(os.path.join(mat.source_path, relative_path))
+                    for relative_path in _list_directory_files(mat.source_path)
+                )
+            return os.path.getsize(mat.source_path)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pymonik-materialize") as executor:
+            sizes = dict(zip(missing_names, executor.map(lambda name: _estimated_size(mats_by_name[name][0]), missing_names)))
+
+            def _upload_batch(batch_names: List[str]) -> None:
+                contents = executor.map(
+                    lambda name: self._read_materialize_content(mats_by_name[name][0], force_upload), batch_names
+                )
+                upload_results = self._dispatch_create_payloads(dict(zip(batch_names, contents)))
+                for name in batch_names:
+                    result_ids[name] = upload_results[name].result_id
+
+            batch_names, batch_bytes = [], 0
+            for name in missing_names:
+                if sizes[name] > _MAX_UPLOAD_BATCH_BYTES:
+                    result_ids[name] = self._stream_materialize_content(mats_by_name[name][0], name)
+                    continue
+                if batch_names and batch_bytes + sizes[name] > _MAX_UPLOAD_BATCH_BYTES:
+                    _upload_batch(batch_names)
+                    batch_names, batch_bytes = [], 0
+                batch_names.append(name)
+                batch_bytes += sizes[name]
+            if batch_names:
+                _upload_batch(batch_names)
+
+        for name, named_mats in mats_by_name.items():
+            for mat in named_mats:
+                mat.result_id = result_ids[name]
+        print(
+            f"Materialize: {len(mats)} objects, {len(mats_by_name) - len(missing_names)} contents already uploaded, "
+            f"uploaded {len(missing_names)}"
+        )
+        return mats
+
+    def put(
+        self,
+        obj: U_Obj,
+        name: Optional[str] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        content_addressed: Optional[bool] = None,
+        chunked: bool = False,
+    ) -> ResultHandle[U_Obj]:
         """
         Uploads a single Python object to ArmoniK.
 
+        The object is pickled as a stream of chunks that are uploaded as they are produced, so objects
+        of any size are uploaded with a constant amount of extra memory. Objects fitting in a single
+        chunk are uploaded in one request.
+
+        In content-addressed mode the result is named after the hash of the pickled object: if the
+        session already holds a completed result with the same content, it is returned instead of
+        uploading the object again (the object is then only pickled to be hashed).
+
         Args:
             obj: The Python object to upload.
-            name: An optional name for this data. Used for traceability.
+            name: An optional name for this data. Used for traceability, ignored in content-addressed mode.
+            progress: An optional callback, called with the total number of bytes uploaded so far.
+            content_addressed: Reuse an existing result with the same content. Defaults to the
+                instance's content_addressed_puts setting.
+            chunked: Split the pickled object in content-defined chunks, each stored as a content-addressed
+                result. Only the chunks missing from the session are uploaded, so re-uploading a slightly
+                modified version of a large object only sends the chunks around the changes. Chunks are
+                only looked up in the current session: the first chunked put of a new session uploads all
+                of its chunks. Workers cache the chunks. The object is reassembled transparently by
+                ResultHandle.get and in tasks.
 
         Returns:
             A ResultHandle for the uploaded object.
         """
         self._ensure_client_ready() # Ensures create() is called if needed for client mode
 
-        payload_bytes = pickle.dumps(obj)
-        
-        descriptive_name_part = name if name else str(uuid.uuid4())
-        # This is the key used in the dictionary for _dispatch_create_payloads
-        internal_payload_key = f"pymonik_put_data__{descriptive_name_part}"
+        if content_addressed is None:
+            content_addressed = self.content_addressed_puts
+        if content_addressed:
+            internal_payload_key = f"pymonik_put_cas__{hash_pickle(obj)}"
+            existing_results = self._find_completed_results([internal_payload_key])
+            if internal_payload_key in existing_results:
+                return ResultHandle(
+                    result_id=existing_results[internal_payload_key],
+                    session_id=self._session_id, # type: ignore
+                    pymonik_instance=self
+                )
+        else:
+            descriptive_name_part = name if name else str(uuid.uuid4())
+            # This is the key used in the dictionary for _dispatch_create_payloads
+            internal_payload_key = f"pymonik_put_data__{descriptive_name_part}"
+
+        if chunked:
+            manifest = self._upload_content_chunks(stream_pickle(obj, self._get_data_chunk_max_size()), progress)
+            armonik_result_obj = self._dispatch_create_payloads({internal_payload_key: manifest})[internal_payload_key]
+            return ResultHandle(
+                result_id=armonik_result_obj.result_id,
+                session_id=self._session_id, # type: ignore
+                pymonik_instance=self
+            )
 
-        payloads_to_upload = {internal_payload_key: payload_bytes}
-        
-        # _dispatch_create_payloads returns a Dict[str, Result]
-        # The keys in the returned dict match the keys in payloads_to_upload
-        created_armonik_results_map = self._dispatch_create_payloads(payloads_to_upload)
-        
-        armonik_result_obj = created_armonik_results_map[internal_payload_key]
+        chunks = stream_pickle(obj, self._get_data_chunk_max_size())
+        first_chunk = next(chunks, b"")
+        second_chunk = next(chunks, None)
+        if second_chunk is None:
+            # Small object, a single create_results call is enough
+            created_armonik_results_map = self._dispatch_create_payloads({internal_payload_key: first_chunk})
+            armonik_result_obj = created_armonik_results_map[internal_payload_key]
+            if progress is not None:
+                progress(len(first_chunk))
+        else:
+            armonik_result_obj = self._dispatch_upload_stream(
+                internal_payload_key, itertools.chain([first_chunk, second_chunk], chunks), progress=progress
+            )
 
-        return ResultHandle[U_Obj](
+        return ResultHandle(
             result_id=armonik_result_obj.result_id, 
             session_id=self._session_id, # type: ignore (self._session_id is confirmed by _ensure_client_ready)
             pymonik_instance=self
         )
 
-    def put_many(self, objects: List[V_Obj], names: Optional[List[str]] = None) -> List[ResultHandle[V_Obj]]:
+    def _upload_content_chunks(
+        self, stream: Iterable[bytes], progress: Optional[Callable[[int], None]] = None
+    ) -> bytes:
+        """Upload a stream as content-defined chunks, skipping the chunks already in the session.
+
+        Returns:
+            bytes: The manifest listing the chunk results, to be stored in place of the data.
+        """
+        chunk_result_ids: List[str] = []
+        counts = {"chunks": 0, "uploaded": 0, "bytes": 0}
+
+        def _upload_group(group: List[Tuple[str, bytes]]) -> None:
+            existing_results = self._find_completed_results([name for name, _ in group])
+            missing = {name: chunk for name, chunk in group if name not in existing_results}
+            created = self._dispatch_create_payloads(missing) if missing else {}
+            for name, chunk in group:
+                chunk_result_ids.append(
+                    existing_results[name] if name in existing_results else created[name].result_id
+                )
+                counts["bytes"] += len(chunk)
+            counts["chunks"] += len(group)
+            counts["uploaded"] += len(missing)
+            if progress is not None:
+                progress(counts["bytes"])
+
+        # Chunks are looked up and uploaded in groups bounded in bytes
+        group, group_bytes = [], 0
+        for chunk in content_defined_chunks(stream):
+            group.append((chunk_result_name(chunk), chunk))
+            group_bytes += len(chunk)
+            if group_bytes >= _MAX_UPLOAD_BATCH_BYTES:
+                _upload_group(group)
+                group, group_bytes = [], 0
+        if group:
+            _upload_group(group)
+        print(
+            f"Chunked upload: {counts['chunks']} chunks ({counts['bytes']} bytes), "
+            f"{counts['chunks'] - counts['uploaded']} already uploaded"
+        )
+        return encode_chunk_manifest(chunk_result_ids)
+
+    def put_many(
+        self,
+        objects: List[V_Obj],
+        names: Optional[List[str]] = None,
+        max_workers: int = 8,
+        max_batch_bytes: int = _MAX_UPLOAD_BATCH_BYTES,
+        max_concurrent_uploads: int = 4,
+        content_addressed: Optional[bool] = None,
+    ) -> List[ResultHandle[V_Obj]]:
         """
         Uploads multiple Python objects to ArmoniK.
 
+        Objects are pickled on a thread pool (pickling large NumPy arrays releases the GIL) and the
+        pickled objects are grouped, as they complete, into batches bounded in bytes that are uploaded
+        concurrently. Objects larger than a batch are streamed on their own.
+
+        In content-addressed mode (see `put`) the objects are first hashed in parallel, looked up with a
+        single batched query, and only the contents missing from the session are uploaded, once each.
+
         Args:
             objects: A list of Python objects to upload.
             names: An optional list of names for these objects. If provided,
                    its length must match the length of objects.
+            max_workers: Number of threads pickling the objects.
+            max_batch_bytes: Maximum size in bytes of the data sent in a single batched upload.
+            max_concurrent_uploads: Number of batches uploaded concurrently.
+            content_addressed: Reuse existing results with the same contents. Defaults to the
+                instance's content_addressed_puts setting.
 
         Returns:
             A list of ResultHandles for the uploaded objects, in the same order.
@@ -797,32 +1494,79 @@ class Pymonik:
         if names and len(objects) != len(names):
             raise ValueError("Length of objects and names must match if names are provided.")
 
-        payloads_to_upload: Dict[str, bytes] = {}
-        ordered_internal_keys: List[str] = [] 
-
-        for i, obj in enumerate(objects):
-            payload_bytes = pickle.dumps(obj)
-            
-            descriptive_name_part = names[i] if names else str(uuid.uuid4())
-            internal_payload_key = f"pymonik_put_many_data__{i}__{descriptive_name_part}" # Add index for more uniqueness
-            
-            payloads_to_upload[internal_payload_key] = payload_bytes
-            ordered_internal_keys.append(internal_payload_key)
-        
-        created_armonik_results_map = self._dispatch_create_payloads(payloads_to_upload)
-        
-        result_handles = []
-        for key in ordered_internal_keys:
-            armonik_result_obj = created_armonik_results_map[key]
-            result_handles.append(
-                ResultHandle[V_Obj](
-                    result_id=armonik_result_obj.result_id,
-                    session_id=self._session_id, # type: ignore
-                    pymonik_instance=self
-                )
+        if content_addressed is None:
+            content_addressed = self.content_addressed_puts
+        result_ids: Dict[str, str] = {}
+        if content_addressed:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pymonik-hash") as hash_executor:
+                ordered_internal_keys = [
+                    f"pymonik_put_cas__{content_hash}" for content_hash in hash_executor.map(hash_pickle, objects)
+                ]
+            result_ids.update(self._find_completed_results(ordered_internal_keys))
+            objects_by_key = {}
+            for key, obj in zip(ordered_internal_keys, objects):
+                if key not in result_ids:
+                    objects_by_key.setdefault(key, obj)
+            upload_keys, upload_objects = list(objects_by_key), list(objects_by_key.values())
+        else:
+            ordered_internal_keys = [
+                f"pymonik_put_many_data__{i}__{names[i] if names else uuid.uuid4()}" # Add index for more uniqueness
+                for i in range(len(objects))
+            ]
+            upload_keys, upload_objects = ordered_internal_keys, objects
+
+        def _upload_batch(batch: Dict[str, bytes]) -> None:
+            created_armonik_results_map = self._dispatch_create_payloads(batch)
+            for key in batch:
+                result_ids[key] = created_armonik_results_map[key].result_id
+
+        def _upload_large(key: str, payload_bytes: bytes) -> None:
+            result_ids[key] = self._dispatch_upload_stream(key, [payload_bytes]).result_id
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pymonik-pickle") as pickle_executor, \
+                ThreadPoolExecutor(max_workers=max_concurrent_uploads, thread_name_prefix="pymonik-upload") as upload_executor:
+
+            def _pickled_in_order():
+                # Keep a bounded window of objects being pickled so that memory doesn't grow with the object count
+                window = collections.deque()
+                for obj in upload_objects:
+                    window.append(pickle_executor.submit(pickle.dumps, obj))
+                    if len(window) >= 2 * max_workers:
+                        yield window.popleft().result()
+                while window:
+                    yield window.popleft().result()
+
+            pending_uploads = collections.deque()
+
+            def _submit_upload(fn, *args) -> None:
+                # Wait for the oldest uploads when too many batches are waiting in memory
+                while len(pending_uploads) >= 2 * max_concurrent_uploads:
+                    pending_uploads.popleft().result()
+                pending_uploads.append(upload_executor.submit(fn, *args))
+
+            batch, batch_bytes = {}, 0
+            for key, payload_bytes in zip(upload_keys, _pickled_in_order()):
+                if len(payload_bytes) > max_batch_bytes:
+                    _submit_upload(_upload_large, key, payload_bytes)
+                    continue
+                if batch and batch_bytes + len(payload_bytes) > max_batch_bytes:
+                    _submit_upload(_upload_batch, batch)
+                    batch, batch_bytes = {}, 0
+                batch[key] = payload_bytes
+                batch_bytes += len(payload_bytes)
+            if batch:
+                _submit_upload(_upload_batch, batch)
+            while pending_uploads:
+                pending_uploads.popleft().result()
+
+        return [
+            ResultHandle(
+                result_id=result_ids[key],
+                session_id=self._session_id, # type: ignore
+                pymonik_instance=self
             )
-        
-        return result_handles
+            for key in ordered_internal_keys
+        ]
 
     def is_worker(self) -> bool:
         """Returns True if running in worker mode, False if in client mode."""
@@ -838,13 +1582,28 @@ class Pymonik:
                 self._sessions_client.close_session(self._session_id)
                 print(f"Session {self._session_id} has been closed")
                 self._session_created = False
+                _forget_invocations(self._session_id)
             except Exception as e:
                 print(f"Error closing session {self._session_id}: {e}")
 
+        if self._status_tracker is not None:
+            self._status_tracker.close()
+            self._status_tracker = None
+
+        if self._poller is not None:
+            self._poller.close()
+            self._poller = None
+
         if self._connected:
-            self._channel.close()
+            if self._local_backend is not None:
+                self._local_backend.shutdown()
+                self._local_backend = None
+            else:
+                self._channel.close()
             self._connected = False
 
+        get_default_tracer().flush()
+
     def cancel(self):
         """Cancel the session and clean up resources."""
         if self._is_worker_mode:
@@ -855,13 +1614,28 @@ class Pymonik:
                 self._sessions_client.cancel_session(self._session_id)
                 print(f"Session {self._session_id} has been cancelled")
                 self._session_created = False
+                _forget_invocations(self._session_id)
             except Exception as e:
                 print(f"Error cancelling session {self._session_id}: {e}")
 
+        if self._status_tracker is not None:
+            self._status_tracker.close()
+            self._status_tracker = None
+
+        if self._poller is not None:
+            self._poller.close()
+            self._poller = None
+
         if self._connected:
-            self._channel.close()
+            if self._local_backend is not None:
+                self._local_backend.shutdown()
+                self._local_backend = None
+            else:
+                self._channel.close()
             self._connected = False
 
+        get_default_tracer().flush()
+
     def __enter__(self):
         """Context manager entry point."""
         # Workers have to create the session on their own
@@ -923,6 +1697,10 @@ def task(
     max_duration: Optional[Union[timedelta, int, float]] = None,
     priority: Optional[int] = None,
     max_retries: Optional[int] = None,
+    num_returns: int = 1,
+    shared_memory: bool = False,
+    memoize: bool = False,
+    cache: bool = False,
 ) -> Union[Callable, Task]:
     """Decorator to create a Task from a function.
     
@@ -935,6 +1713,18 @@ def task(
         max_duration: Maximum duration for the task (timedelta, or seconds as int/float)
         priority: Task priority 
         max_retries: Maximum number of retries
+        num_returns: Number of outputs of the task, each one is stored as its own result.
+            The function must then return a Shards (or list/tuple) with num_returns pieces.
+        shared_memory: Attach large result arguments (e.g. NumPy arrays) read-only from a node-local
+            shared store, so that the tasks of a node share a single copy instead of unpickling their own.
+        memoize: Return the results of an identical invocation (same function, same argument values and
+            same result handles) already submitted in the session instead of submitting the task again.
+            Invocations are remembered by the process, on the client as well as on the workers.
+        cache: Keep the outputs of the task in a persistent cache (see Pymonik's memo_store), keyed by the
+            pickled function and arguments. Invocations found in the cache aren't submitted, their cached
+            values are uploaded as completed results instead. Outputs are stored when they are first
+            retrieved with get(). Result arguments are only cacheable if they come from cached tasks.
+            Only applies to invocations from the client.
     
     Usage:
         @task
@@ -948,6 +1738,10 @@ def task(
         @task(task_options=TaskOptions(max_duration=timedelta(minutes=10)))
         def complex_func():
             pass
+
+        @task(num_returns=2)
+        def split_func():
+            return Shards([first_half, second_half])
     """
     def decorator(func: Callable[P_Args,R_Type]) -> Task[P_Args,R_Type]:
         resolved_name = function_name or func.__name__
@@ -1000,7 +1794,11 @@ def task(
             func, 
             require_context=require_context, 
             func_name=resolved_name,
-            task_options=decorator_task_options
+            task_options=decorator_task_options,
+            num_returns=num_returns,
+            shared_memory=shared_memory,
+            memoize=memoize,
+            cache=cache,
         )
 
     if _func is None:
@@ -0,0 +1,196 @@
+import dataclasses
+import logging
+import os
+import uuid
+
+import cloudpickle as pickle
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from armonik.common import Output, Result, ResultStatus, TaskDefinition, TaskOptions
+from armonik.protogen.common.agent_common_pb2 import DataRequest, DataResponse
+
+from .core import Pymonik, Task
+from .materialize import Materialize, _calculate_file_hash, _create_zip_from_directory, _list_directory_files
+from .results import ResultHandle
+from .worker import _process_task
+from .worker_cache import _DEFAULT_CACHE_ROOT
+
+
+class _FakeAgentStub:
+    """Stand-in for the agent's gRPC stub, serving GetResourceData from the data of a FakeAgent."""
+
+    def __init__(self, agent: "FakeAgent"):
+        self._agent = agent
+
+    def GetResourceData(self, request: DataRequest) -> DataResponse:
+        # Like the agent, the data is written to <cache root>/<token>/<result ID>
+        cache_root = Path(os.getenv("PYMONIK_WORKER_CACHE_DIR", _DEFAULT_CACHE_ROOT))
+        target = cache_root / request.communication_token / request.result_id
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(self._agent.data[request.result_id])
+        self._agent.resource_requests += 1
+        return DataResponse(result_id=request.result_id)
+
+
+class FakeTaskHandler:
+    """
+    In-memory test double of armonik.worker.TaskHandler, backed by a FakeAgent.
+
+    Data dependencies are read from the agent, and the results created or sent by the task are stored in
+    it. What the task did is recorded in created_results, sent_results and submitted_tasks.
+    """
+
+    def __init__(
+        self,
+        agent: "FakeAgent",
+        payload: bytes,
+        data_dependencies: List[str],
+        expected_results: List[str],
+        task_id: Optional[str] = None,
+    ):
+        self._agent = agent
+        self.session_id = agent.session_id
+        self.task_id = task_id or str(uuid.uuid4())
+        self.token = self.task_id
+        self.payload = payload
+        self.data_dependencies = {result_id: agent.data[result_id] for result_id in data_dependencies}
+        self.expected_results = list(expected_results)
+        self.created_results: Dict[str, Result] = {}
+        self.sent_results: Dict[str, bytes] = {}
+        self.submitted_tasks: List[TaskDefinition] = []
+        self._client = _FakeAgentStub(agent)
+
+    def create_results_metadata(self, result_names: List[str], batch_size: int = 100) -> Dict[str, Result]:
+        results = {}
+        for name in result_names:
+            results[name] = Result(
+                session_id=self.session_id, name=name, result_id=str(uuid.uuid4()), status=ResultStatus.CREATED
+            )
+        self.created_results.update(results)
+        return results
+
+    def create_results(self, results_data: Dict[str, bytes], batch_size: int = 1) -> Dict[str, Result]:
+        results = {}
+        for name, data in results_data.items():
+            result_id = self._agent.store(data)
+            results[name] = Result(
+                session_id=self.session_id, name=name, result_id=result_id, status=ResultStatus.COMPLETED
+            )
+        self.created_results.update(results)
+        return results
+
+    def send_results(self, results_data: Dict[str, Union[bytes, bytearray]]) -> None:
+        for result_id, data in results_data.items():
+            self._agent.data[result_id] = bytes(data)
+            self.sent_results[result_id] = bytes(data)
+
+    def submit_tasks(
+        self,
+        tasks: List[TaskDefinition],
+        default_task_options: Optional[TaskOptions] = None,
+        batch_size: Optional[int] = 100,
+    ) -> List:
+        self.submitted_tasks.extend(tasks)
+        return []
+
+
+class FakeAgent:
+    """
+    In-memory stand-in for the ArmoniK agent of a worker, to run PymoniK tasks without a cluster.
+
+    Tasks are prepared with the regular PymoniK code (a worker-mode Pymonik on a FakeTaskHandler), so
+    their payloads and dependencies are exactly the ones a worker receives, then run through the worker's
+    task processing code with a FakeTaskHandler:
+
+        agent = FakeAgent()
+        task_definition = agent.prepare(my_task, agent.put(large_object), 42)
+        output, handler = agent.run(task_definition)
+        value = agent.get(task_definition.expected_output_ids[0])
+
+    Results fetched on demand through GetResourceData (chunks, Materialize content) are written under
+    $PYMONIK_WORKER_CACHE_DIR (/cache/shared by default), as the agent does.
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id or str(uuid.uuid4())
+        self.data: Dict[str, bytes] = {}
+        self.resource_requests = 0
+        self._client_handler = FakeTaskHandler(self, payload=b"", data_dependencies=[], expected_results=[])
+        self.pymonik = Pymonik(is_worker=True).create(task_handler=self._client_handler, expected_output=[])
+
+    def store(self, data: bytes) -> str:
+        """Store raw data as a new result, returns its ID."""
+        result_id = str(uuid.uuid4())
+        self.data[result_id] = bytes(data)
+        return result_id
+
+    def put(self, obj: Any) -> ResultHandle:
+        """Store an object as a new result, returns a handle to pass to tasks."""
+        return ResultHandle(self.store(pickle.dumps(obj)), self.session_id, self.pymonik)
+
+    def get(self, result_id: str) -> Any:
+        """Unpickle the data of a result."""
+        return pickle.loads(self.data[result_id])
+
+    def materialize(self, mat: Materialize) -> Materialize:
+        """Store the content of a Materialize object, returns it with its result ID set."""
+        if mat.per_file_sync:
+            # Like the client, every file is stored as its own result, listed by a manifest
+            files = {
+                relative_path: (
+                    _calculate_file_hash(Path(mat.source_path) / relative_path),
+                    self.store((Path(mat.source_path) / relative_path).read_bytes()),
+                )
+                for relative_path in _list_directory_files(mat.source_path)
+            }
+            content = pickle.dumps(files)
+        elif mat.is_directory:
+            content = _create_zip_from_directory(mat.source_path)
+        else:
+            content = Path(mat.source_path).read_bytes()
+        return dataclasses.replace(mat, result_id=self.store(content))
+
+    def prepare(self, task: Task, *args) -> TaskDefinition:
+        """Invoke a task like a client would, returns the definition of the submitted task."""
+        with self.pymonik:
+            task.invoke(*args, pymonik=self.pymonik)
+        return self._client_handler.submitted_tasks[-1]
+
+    def task_handler(self, task_definition: TaskDefinition) -> FakeTaskHandler:
+        """Create the handler of a run of a submitted task."""
+        return FakeTaskHandler(
+            self,
+            payload=self.data[task_definition.payload_id],
+            data_dependencies=task_definition.data_dependencies,
+            expected_results=task_definition.expected_output_ids,
+        )
+
+    def run(
+        self,
+        task_definition: TaskDefinition,
+        logger: Optional[logging.Logger] = None,
+        construct_environment: bool = False,
+        phase_times: Optional[Dict[str, float]] = None,
+    ) -> Tuple[Output, FakeTaskHandler]:
+        """
+        Run a submitted task through the worker's task processing code.
+
+        Args:
+            task_definition: Definition of the task, as returned by prepare.
+            logger: Logger of the task, defaults to the "PymonikFakeAgent" logger.
+            construct_environment: Whether to install the environment requested by the task.
+            phase_times: If given, filled with the time spent in each phase of the task.
+
+        Returns:
+            Tuple[Output, FakeTaskHandler]: The output of the task and the handler recording what it did.
+        """
+        task_handler = self.task_handler(task_definition)
+        output = _process_task(
+            task_handler,
+            logger or logging.getLogger("PymonikFakeAgent"),
+            construct_environment=construct_environment,
+            phase_times=phase_times,
+        )
+        return output, task_handler
@@ -0,0 +1,419 @@
+import queue
+import threading
+import time
+import uuid
+
+import cloudpickle as pickle
+import grpc
+
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from armonik.common import ResultStatus
+from armonik.protogen.client.events_service_pb2_grpc import EventsServicer, add_EventsServicer_to_server
+from armonik.protogen.client.results_service_pb2_grpc import ResultsServicer, add_ResultsServicer_to_server
+from armonik.protogen.client.sessions_service_pb2_grpc import SessionsServicer, add_SessionsServicer_to_server
+from armonik.protogen.client.tasks_service_pb2_grpc import TasksServicer, add_TasksServicer_to_server
+from armonik.protogen.common.events_common_pb2 import EventSubscriptionRequest, EventSubscriptionResponse
+from armonik.protogen.common.results_common_pb2 import (
+    CreateResultsMetaDataRequest,
+    CreateResultsMetaDataResponse,
+    CreateResultsRequest,
+    CreateResultsResponse,
+    DownloadResultDataRequest,
+    DownloadResultDataResponse,
+    ListResultsRequest,
+    ListResultsResponse,
+    ResultRaw,
+    ResultsServiceConfigurationResponse,
+    UploadResultDataRequest,
+    UploadResultDataResponse,
+)
+from armonik.protogen.common.sessions_common_pb2 import (
+    CancelSessionRequest,
+    CancelSessionResponse,
+    CloseSessionRequest,
+    CloseSessionResponse,
+    CreateSessionReply,
+    CreateSessionRequest,
+    SessionRaw,
+)
+from armonik.protogen.common.session_status_pb2 import (
+    SESSION_STATUS_CANCELLED,
+    SESSION_STATUS_CLOSED,
+    SESSION_STATUS_RUNNING,
+)
+from armonik.protogen.common.tasks_common_pb2 import SubmitTasksRequest, SubmitTasksResponse
+
+from .local import matches_filters
+
+_DEFAULT_DATA_CHUNK_MAX_SIZE = 84 * 1024
+
+
+@dataclass
+class FakeControlPlaneMetrics:
+    """Counters collected by a FakeControlPlane."""
+    calls: Counter = field(default_factory=Counter)  # RPC name -> number of calls
+    bytes_received: int = 0
+    bytes_sent: int = 0
+    results_created: int = 0
+    tasks_submitted: int = 0
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+@dataclass
+class _FakeResult:
+    session_id: str
+    name: str
+    result_id: str
+    status: int = ResultStatus.CREATED
+    owner_task_id: str = ""
+    created_by: str = ""
+    size: int = 0
+
+    def to_message(self) -> ResultRaw:
+        return ResultRaw(
+            session_id=self.session_id,
+            name=self.name,
+            result_id=self.result_id,
+            status=self.status,
+            owner_task_id=self.owner_task_id,
+            created_by=self.created_by,
+            size=self.size,
+        )
+
+
+@dataclass
+class _FakeTask:
+    task_id: str
+    expected_outputs: List[str]
+    remaining: int = 0
+
+
+class FakeControlPlane:
+    """
+    In-memory stand-in for the ArmoniK control plane, served over gRPC on localhost.
+
+    It implements the calls of the Results, Tasks, Sessions and Events services that PymoniK uses, so that
+    a Pymonik client pointed at its endpoint runs its whole client side (pickling, naming, batching, RPCs)
+    without a cluster. Tasks aren't executed: a submitted task completes once its data dependencies are
+    completed and task_duration has elapsed, its expected outputs then hold output_data. This measures the
+    client's own overhead separately from the cluster's scheduling.
+
+    A remote cluster is modelled by sleeping `latency` seconds at the start of every call, and by
+    limiting the data transferred by each call to `bandwidth` bytes per second.
+
+    Example:
+        with FakeControlPlane(latency=0.002) as control_plane:
+            with Pymonik(endpoint=control_plane.endpoint):
+                my_task.map_invoke(args).wait()
+            print(control_plane.metrics.calls)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        task_duration: float = 0.0,
+        output_data: bytes = pickle.dumps(None),
+        data_chunk_max_size: int = _DEFAULT_DATA_CHUNK_MAX_SIZE,
+        max_workers: int = 32,
+    ):
+        """
+        Args:
+            latency: Delay in seconds added to every call.
+            bandwidth: Transfer rate in bytes per second of the data sent or received by a call, None for unlimited.
+            task_duration: Time in seconds between a task becoming ready and its outputs being completed.
+            output_data: Data of the outputs of the (not executed) tasks. Defaults to pickled None.
+            data_chunk_max_size: Maximum size of the data chunks of streamed uploads and downloads.
+            max_workers: Number of threads serving the calls.
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.task_duration = task_duration
+        self.output_data = output_data
+        self.data_chunk_max_size = data_chunk_max_size
+        self.metrics = FakeControlPlaneMetrics()
+        self.endpoint: Optional[str] = None
+        self._max_workers = max_workers
+        self._server: Optional[grpc.Server] = None
+        self._lock = threading.Lock()
+        self._results: Dict[str, _FakeResult] = {}
+        self._data: Dict[str, bytes] = {}
+        self._sessions: Dict[str, int] = {}
+        self._dependents: Dict[str, List[_FakeTask]] = defaultdict(list)
+        self._subscribers: Dict[str, List[queue.Queue]] = defaultdict(list)
+        self._timers: Set[threading.Timer] = set()
+
+    def start(self) -> str:
+        """Start serving on a free localhost port, returns the endpoint to give to Pymonik."""
+        server = grpc.server(
+            ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="pymonik-fake-cluster"),
+            options=[("grpc.max_receive_message_length", -1), ("grpc.max_send_message_length", -1)],
+        )
+        add_ResultsServicer_to_server(_FakeResultsServicer(self), server)
+        add_TasksServicer_to_server(_FakeTasksServicer(self), server)
+        add_SessionsServicer_to_server(_FakeSessionsServicer(self), server)
+        add_EventsServicer_to_server(_FakeEventsServicer(self), server)
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+        self._server = server
+        self.endpoint = f"localhost:{port}"
+        return self.endpoint
+
+    def stop(self) -> None:
+        with self._lock:
+            for timer in self._timers:
+                timer.cancel()
+            self._timers.clear()
+        if self._server is not None:
+            self._server.stop(grace=None)
+            self._server = None
+
+    def __enter__(self) -> "FakeControlPlane":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    # Network model
+
+    def _call(self, name: str) -> None:
+        with self._lock:
+            self.metrics.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _transfer(self, size: int, received: bool) -> None:
+        with self._lock:
+            if received:
+                self.metrics.bytes_received += size
+            else:
+                self.metrics.bytes_sent += size
+        if self.bandwidth:
+            time.sleep(size / self.bandwidth)
+
+    # State, methods called with the lock held
+
+    def _new_result(self, session_id: str, name: str) -> _FakeResult:
+        result = _FakeResult(session_id=session_id, name=name, result_id=str(uuid.uuid4()))
+        self._results[result.result_id] = result
+        self.metrics.results_created += 1
+        self._publish(result, new=True)
+        return result
+
+    def _complete(self, result_ids: Iterable[str]) -> None:
+        for result_id in result_ids:
+            result = self._results[result_id]
+            if result.status != ResultStatus.CREATED:
+                continue
+            result.status = ResultStatus.COMPLETED
+            result.size = len(self._data.get(result_id, b""))
+            self._publish(result)
+            for fake_task in self._dependents.pop(result_id, []):
+                fake_task.remaining -= 1
+                if fake_task.remaining == 0:
+                    self._run(fake_task)
+
+    def _abort_session(self, session_id: str) -> None:
+        for result in self._results.values():
+            if result.session_id == session_id and result.status == ResultStatus.CREATED:
+                result.status = ResultStatus.ABORTED
+                self._publish(result)
+
+    def _schedule(self, fake_task: _FakeTask, dependencies: Iterable[str]) -> None:
+        for result_id in set(dependencies):
+            if self._results[result_id].status != ResultStatus.COMPLETED:
+                self._dependents[result_id].append(fake_task)
+                fake_task.remaining += 1
+        if fake_task.remaining == 0:
+            self._run(fake_task)
+
+    def _run(self, fake_task: _FakeTask) -> None:
+        if self.task_duration <= 0:
+            self._finish(fake_task)
+            return
+        timer = threading.Timer(self.task_duration, self._finish_later, args=(fake_task,))
+        timer.daemon = True
+        self._timers.add(timer)
+        timer.start()
+
+    def _finish_later(self, fake_task: _FakeTask) -> None:
+        with self._lock:
+            self._timers.discard(threading.current_thread())
+            self._finish(fake_task)
+
+    def _finish(self, fake_task: _FakeTask) -> None:
+        for result_id in fake_task.expected_outputs:
+            self._data[result_id] = self.output_data
+        self._complete(fake_task.expected_outputs)
+
+    def _publish(self, result: _FakeResult, new: bool = False) -> None:
+        for subscriber in self._subscribers.get(result.session_id, []):
+            subscriber.put((result, new))
+
+
+class _FakeResultsServicer(ResultsServicer):
+    def __init__(self, control_plane: FakeControlPlane):
+        self._cp = control_plane
+
+    def CreateResultsMetaData(self, request: CreateResultsMetaDataRequest, context) -> CreateResultsMetaDataResponse:
+        self._cp._call("CreateResultsMetaData")
+        with self._cp._lock:
+            created = [self._cp._new_result(request.session_id, r.name).to_message() for r in request.results]
+        return CreateResultsMetaDataResponse(results=created)
+
+    def CreateResults(self, request: CreateResultsRequest, context) -> CreateResultsResponse:
+        self._cp._call("CreateResults")
+        self._cp._transfer(sum(len(r.data) for r in request.results), received=True)
+        with self._cp._lock:
+            created = []
+            for r in request.results:
+                result = self._cp._new_result(request.session_id, r.name)
+                self._cp._data[result.result_id] = r.data
+                self._cp._complete([result.result_id])
+                created.append(result.to_message())
+        return CreateResultsResponse(results=created)
+
+    def UploadResultData(self, request_iterator: Iterator[UploadResultDataRequest], context) -> UploadResultDataResponse:
+        self._cp._call("UploadResultData")
+        result_id = next(request_iterator).id.result_id
+        chunks = []
+        for request in request_iterator:
+            self._cp._transfer(len(request.data_chunk), received=True)
+            chunks.append(request.data_chunk)
+        with self._cp._lock:
+            if result_id not in self._cp._results:
+                context.abort(grpc.StatusCode.NOT_FOUND, f"Result {result_id} not found")
+            self._cp._data[result_id] = b"".join(chunks)
+            self._cp._complete([result_id])
+            return UploadResultDataResponse(result=self._cp._results[result_id].to_message())
+
+    def DownloadResultData(self, request: DownloadResultDataRequest, context) -> Iterator[DownloadResultDataResponse]:
+        self._cp._call("DownloadResultData")
+        with self._cp._lock:
+            data = self._cp._data.get(request.result_id)
+        if data is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Result {request.result_id} has no data")
+        chunk_size = self._cp.data_chunk_max_size
+        for start in range(0, max(len(data), 1), chunk_size):
+            chunk = data[start : start + chunk_size]
+            self._cp._transfer(len(chunk), received=False)
+            yield DownloadResultDataResponse(data_chunk=chunk)
+
+    def ListResults(self, request: ListResultsRequest, context) -> ListResultsResponse:
+        self._cp._call("ListResults")
+        with self._cp._lock:
+            matching = [r for r in self._cp._results.values() if matches_filters(r, request.filters)]
+        start = request.page * request.page_size
+        return ListResultsResponse(
+            results=[r.to_message() for r in matching[start : start + request.page_size]],
+            page=request.page,
+            page_size=request.page_size,
+            total=len(matching),
+        )
+
+    def GetServiceConfiguration(self, request, context) -> ResultsServiceConfigurationResponse:
+        self._cp._call("GetServiceConfiguration")
+        return ResultsServiceConfigurationResponse(data_chunk_max_size=self._cp.data_chunk_max_size)
+
+
+class _FakeTasksServicer(TasksServicer):
+    def __init__(self, control_plane: FakeControlPlane):
+        self._cp = control_plane
+
+    def SubmitTasks(self, request: SubmitTasksRequest, context) -> SubmitTasksResponse:
+        self._cp._call("SubmitTasks")
+        task_infos = []
+        with self._cp._lock:
+            for creation in request.task_creations:
+                fake_task = _FakeTask(task_id=str(uuid.uuid4()), expected_outputs=list(creation.expected_output_keys))
+                for result_id in fake_task.expected_outputs:
+                    self._cp._results[result_id].owner_task_id = fake_task.task_id
+                self._cp._schedule(fake_task, [creation.payload_id, *creation.data_dependencies])
+                task_infos.append(
+                    SubmitTasksResponse.TaskInfo(
+                        task_id=fake_task.task_id,
+                        expected_output_ids=creation.expected_output_keys,
+                        data_dependencies=creation.data_dependencies,
+                        payload_id=creation.payload_id,
+                    )
+                )
+            self._cp.metrics.tasks_submitted += len(task_infos)
+        return SubmitTasksResponse(task_infos=task_infos)
+
+
+class _FakeSessionsServicer(SessionsServicer):
+    def __init__(self, control_plane: FakeControlPlane):
+        self._cp = control_plane
+
+    def CreateSession(self, request: CreateSessionRequest, context) -> CreateSessionReply:
+        self._cp._call("CreateSession")
+        session_id = str(uuid.uuid4())
+        with self._cp._lock:
+            self._cp._sessions[session_id] = SESSION_STATUS_RUNNING
+        return CreateSessionReply(session_id=session_id)
+
+    def CloseSession(self, request: CloseSessionRequest, context) -> CloseSessionResponse:
+        self._cp._call("CloseSession")
+        with self._cp._lock:
+            self._cp._sessions[request.session_id] = SESSION_STATUS_CLOSED
+        return CloseSessionResponse(session=SessionRaw(session_id=request.session_id, status=SESSION_STATUS_CLOSED))
+
+    def CancelSession(self, request: CancelSessionRequest, context) -> CancelSessionResponse:
+        self._cp._call("CancelSession")
+        with self._cp._lock:
+            self._cp._sessions[request.session_id] = SESSION_STATUS_CANCELLED
+            self._cp._abort_session(request.session_id)
+        return CancelSessionResponse(session=SessionRaw(session_id=request.session_id, status=SESSION_STATUS_CANCELLED))
+
+
+class _FakeEventsServicer(EventsServicer):
+    def __init__(self, control_plane: FakeControlPlane):
+        self._cp = control_plane
+
+    @staticmethod
+    def _event(result: _FakeResult, new: bool) -> EventSubscriptionResponse:
+        if new:
+            return EventSubscriptionResponse(
+                session_id=result.session_id,
+                new_result=EventSubscriptionResponse.NewResult(
+                    result_id=result.result_id, owner_id=result.owner_task_id, status=result.status
+                ),
+            )
+        return EventSubscriptionResponse(
+            session_id=result.session_id,
+            result_status_update=EventSubscriptionResponse.ResultStatusUpdate(
+                result_id=result.result_id, status=result.status
+            ),
+        )
+
+    def GetEvents(self, request: EventSubscriptionRequest, context) -> Iterator[EventSubscriptionResponse]:
+        self._cp._call("GetEvents")
+        updates: queue.Queue = queue.Queue()
+        with self._cp._lock:
+            # The current state of the matching results is sent first, then their updates
+            current = [
+                r for r in self._cp._results.values()
+                if r.session_id == request.session_id and matches_filters(r, request.results_filters)
+            ]
+            self._cp._subscribers[request.session_id].append(updates)
+        try:
+            for result in current:
+                yield self._event(result, new=True)
+            while context.is_active():
+                try:
+                    result, new = updates.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if matches_filters(result, request.results_filters):
+                    yield self._event(result, new)
+        finally:
+            with self._cp._lock:
+                self._cp._subscribers[request.session_id].remove(updates)
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+# Files modified this close (in ns) to the time they're hashed aren't cached: a write landing in the same
+# mtime tick as the hash would go unnoticed otherwise.
+_RACY_WINDOW_NS = 2_000_000_000
+# Number of paths looked up per query, below SQLite's default limit of 999 parameters
+_LOOKUP_BATCH_SIZE = 900
+
+
+def _default_cache_dir() -> Path:
+    cache_dir = os.getenv("PYMONIK_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+    return Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "pymonik"
+
+
+class FileHashIndex:
+    """
+    Persistent local index of file hashes, keyed by (path, size, mtime_ns, inode).
+
+    A file whose stat information matches its index entry isn't read again, so hashing a large
+    unchanged tree only costs one stat per file. The index is an SQLite database stored in
+    $PYMONIK_CACHE_DIR (defaults to ~/.cache/pymonik).
+    """
+
+    def __init__(self, index_path: Optional[Union[str, Path]] = None):
+        self.index_path = Path(index_path) if index_path else _default_cache_dir() / "file_hashes.sqlite"
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS file_hashes ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, digest TEXT)"
+            )
+
+    @staticmethod
+    def _stat_keys(file_paths: List[Path]) -> List[Tuple[str, int, int, int]]:
+        # Directories are resolved once rather than every file: a tree's files share a few parents
+        resolved_dirs: Dict[str, str] = {}
+        keys = []
+        for file_path in file_paths:
+            directory, name = os.path.split(os.fspath(file_path))
+            resolved_dir = resolved_dirs.get(directory)
+            if resolved_dir is None:
+                resolved_dir = resolved_dirs[directory] = os.path.realpath(directory or ".")
+            path = os.path.join(resolved_dir, name)
+            if os.path.islink(path):
+                path = os.path.realpath(path)
+            stat = os.stat(path)
+            keys.append((path, stat.st_size, stat.st_mtime_ns, stat.st_ino))
+        return keys
+
+    def hash_files(
+        self,
+        file_paths: List[Path],
+        hash_fn: Callable[[Path], str],
+        max_workers: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Hash files, only reading those whose stat information changed since they were indexed.
+
+        Args:
+            file_paths: Files to hash.
+            hash_fn: Function computing the hash of a file, called on a thread pool for index misses.
+            max_workers: Number of threads hashing the missed files.
+
+        Returns:
+            List[str]: The hashes, in the order of file_paths.
+        """
+        keys = self._stat_keys(file_paths)
+        indexed = {}
+        with self._lock:
+            # One query per batch of paths rather than per file
+            for start in range(0, len(keys), _LOOKUP_BATCH_SIZE):
+                paths = [key[0] for key in keys[start : start + _LOOKUP_BATCH_SIZE]]
+                rows = self._connection.execute(
+                    f"SELECT path, size, mtime_ns, inode, digest FROM file_hashes WHERE path IN ({','.join('?' * len(paths))})",
+                    paths,
+                )
+                for path, size, mtime_ns, inode, digest in rows:
+                    indexed[(path, size, mtime_ns, inode)] = digest
+        digests: List[Optional[str]] = [indexed.get(key) for key in keys]
+
+        missing = [i for i, digest in enumerate(digests) if digest is None]
+        self.hits += len(digests) - len(missing)
+        self.misses += len(missing)
+        if not missing:
+            return digests
+
+        hashed_at_ns = time.time_ns()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pymonik-hash") as executor:
+            for i, digest in zip(missing, executor.map(lambda i: hash_fn(file_paths[i]), missing)):
+                digests[i] = digest
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, inode, digest) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (*keys[i], digests[i])
+                    for i in missing
+                    if hashed_at_ns - keys[i][2] > _RACY_WINDOW_NS
+                ],
+            )
+        return digests
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_default_index: Optional[FileHashIndex] = None
+_default_index_failed = False
+_default_index_lock = threading.Lock()
+
+
+def get_default_hash_index() -> Optional[FileHashIndex]:
+    """The process-wide FileHashIndex, None if the index can't be opened (e.g. read-only home)."""
+    global _default_index, _default_index_failed
+    with _default_index_lock:
+        if _default_index is None and not _default_index_failed:
+            try:
+                _default_index = FileHashIndex()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Could not open the file hash index, hashes won't be cached: {e}")
+                _default_index_failed = True
+        return _default_index
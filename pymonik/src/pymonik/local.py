@@ -0,0 +1,645 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+from collections import defaultdict
+from collections.abc import Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from armonik.common import Output, Result, ResultStatus, Task, TaskDefinition, TaskOptions
+from armonik.protogen.common.agent_common_pb2 import DataRequest, DataResponse
+from armonik.protogen.common.filters_common_pb2 import (
+    FILTER_STRING_OPERATOR_CONTAINS,
+    FILTER_STRING_OPERATOR_ENDS_WITH,
+    FILTER_STRING_OPERATOR_EQUAL,
+    FILTER_STRING_OPERATOR_NOT_CONTAINS,
+    FILTER_STRING_OPERATOR_NOT_EQUAL,
+    FILTER_STRING_OPERATOR_STARTS_WITH,
+    FILTER_STATUS_OPERATOR_EQUAL,
+)
+from armonik.protogen.common.results_fields_pb2 import (
+    RESULT_RAW_ENUM_FIELD_CREATED_BY,
+    RESULT_RAW_ENUM_FIELD_NAME,
+    RESULT_RAW_ENUM_FIELD_OWNER_TASK_ID,
+    RESULT_RAW_ENUM_FIELD_RESULT_ID,
+    RESULT_RAW_ENUM_FIELD_SESSION_ID,
+    RESULT_RAW_ENUM_FIELD_STATUS,
+)
+from armonik.protogen.common.results_common_pb2 import UploadResultDataRequest
+
+from .tracing import get_default_tracer
+
+logger = logging.getLogger(__name__)
+
+# Maximum size of the data chunks of streamed uploads, as reported by get_service_config
+_DATA_CHUNK_MAX_SIZE = 4 * 1024 * 1024
+
+_RESULT_FIELDS = {
+    RESULT_RAW_ENUM_FIELD_SESSION_ID: "session_id",
+    RESULT_RAW_ENUM_FIELD_NAME: "name",
+    RESULT_RAW_ENUM_FIELD_OWNER_TASK_ID: "owner_task_id",
+    RESULT_RAW_ENUM_FIELD_STATUS: "status",
+    RESULT_RAW_ENUM_FIELD_RESULT_ID: "result_id",
+    RESULT_RAW_ENUM_FIELD_CREATED_BY: "created_by",
+}
+
+_STRING_OPERATORS = {
+    FILTER_STRING_OPERATOR_EQUAL: lambda value, expected: value == expected,
+    FILTER_STRING_OPERATOR_NOT_EQUAL: lambda value, expected: value != expected,
+    FILTER_STRING_OPERATOR_CONTAINS: lambda value, expected: expected in value,
+    FILTER_STRING_OPERATOR_NOT_CONTAINS: lambda value, expected: expected not in value,
+    FILTER_STRING_OPERATOR_STARTS_WITH: lambda value, expected: value.startswith(expected),
+    FILTER_STRING_OPERATOR_ENDS_WITH: lambda value, expected: value.endswith(expected),
+}
+
+
+def _matches_condition(result: Result, condition) -> bool:
+    raw_field = condition.field.result_raw_field.field
+    if raw_field not in _RESULT_FIELDS:
+        raise NotImplementedError(f"Filtering results on field {raw_field} isn't supported locally")
+    value = getattr(result, _RESULT_FIELDS[raw_field])
+    kind = condition.WhichOneof("value_condition")
+    if kind == "filter_string":
+        return _STRING_OPERATORS[condition.filter_string.operator](value or "", condition.filter_string.value)
+    if kind == "filter_status":
+        equal = int(value) == condition.filter_status.value
+        return equal if condition.filter_status.operator == FILTER_STATUS_OPERATOR_EQUAL else not equal
+    raise NotImplementedError(f"Filtering results with {kind} isn't supported locally")
+
+
+def matches_filters(result: Result, filters) -> bool:
+    """
+    Evaluate a results filter message (as built by Filter.to_message) on a result.
+
+    Filters are in disjunctive normal form: the result matches if all the conditions of any of the
+    "or" clauses hold. Conditions on strings and statuses are supported, which covers the filters PymoniK uses.
+    """
+    clauses = getattr(filters, "or")
+    if not clauses:
+        return True
+    return any(all(_matches_condition(result, condition) for condition in getattr(clause, "and")) for clause in clauses)
+
+
+def _indexed_condition(condition) -> Optional[Tuple[str, Union[str, int]]]:
+    """("result_id", ID) or ("status", status) if a condition selects results by one of these, None otherwise."""
+    raw_field = condition.field.result_raw_field.field
+    kind = condition.WhichOneof("value_condition")
+    if (
+        raw_field == RESULT_RAW_ENUM_FIELD_RESULT_ID
+        and kind == "filter_string"
+        and condition.filter_string.operator == FILTER_STRING_OPERATOR_EQUAL
+    ):
+        return "result_id", condition.filter_string.value
+    if (
+        raw_field == RESULT_RAW_ENUM_FIELD_STATUS
+        and kind == "filter_status"
+        and condition.filter_status.operator == FILTER_STATUS_OPERATOR_EQUAL
+    ):
+        return "status", condition.filter_status.value
+    return None
+
+
+@dataclass
+class _LocalTaskSpec:
+    """What a local worker process needs to run a task."""
+    session_id: str
+    task_id: str
+    payload_id: str
+    data_dependencies: List[str]
+    expected_outputs: List[str]
+    data_dir: str
+    materialize_root: str
+
+
+@dataclass
+class _LocalTaskOutcome:
+    """Changes made by a task, applied by the backend once the task ended."""
+    error: Optional[str] = None
+    created: List[Tuple[str, str, bool]] = field(default_factory=list)  # (name, result ID, has data)
+    sent: List[str] = field(default_factory=list)
+    submitted: List[Tuple[List[TaskDefinition], Optional[TaskOptions]]] = field(default_factory=list)
+
+
+@dataclass
+class _PendingTask:
+    spec: _LocalTaskSpec
+    remaining: int = 0
+    aborted: bool = False
+
+
+class _LocalDataDependencies(Mapping):
+    """Data dependencies of a local task, read from the results directory when accessed."""
+
+    def __init__(self, data_dir: Path, result_ids: List[str]):
+        self._data_dir = data_dir
+        self._result_ids = list(result_ids)
+
+    def __getitem__(self, result_id: str) -> bytes:
+        if result_id not in self._result_ids:
+            raise KeyError(result_id)
+        return (self._data_dir / result_id).read_bytes()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._result_ids)
+
+    def __len__(self) -> int:
+        return len(self._result_ids)
+
+
+class _LocalAgentStub:
+    """Stand-in for the agent's gRPC stub, serving GetResourceData from the results directory."""
+
+    def __init__(self, data_dir: Path, cache_root: Path):
+        self._data_dir = data_dir
+        self._cache_root = cache_root
+
+    def GetResourceData(self, request: DataRequest) -> DataResponse:
+        # Like the agent, the data is copied to <cache root>/<token>/<result ID>
+        target = self._cache_root / request.communication_token / request.result_id
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self._data_dir / request.result_id, target)
+        return DataResponse(result_id=request.result_id)
+
+
+class _LocalTaskHandler:
+    """
+    TaskHandler of the tasks run by a LocalBackend.
+
+    Data is written to the results directory right away, while the results created, the results sent and
+    the subtasks submitted are recorded and applied by the backend when the task ends.
+    """
+
+    def __init__(self, spec: _LocalTaskSpec):
+        data_dir = Path(spec.data_dir)
+        self._data_dir = data_dir
+        self.session_id = spec.session_id
+        self.task_id = spec.task_id
+        self.token = spec.task_id
+        self.expected_results = list(spec.expected_outputs)
+        self.data_folder = str(data_dir)
+        # Materialize content is written under this directory instead of the worker path itself
+        self.materialize_root = spec.materialize_root
+        self.payload = (data_dir / spec.payload_id).read_bytes()
+        self.data_dependencies = _LocalDataDependencies(data_dir, spec.data_dependencies)
+        self._client = _LocalAgentStub(data_dir, Path(os.environ["PYMONIK_WORKER_CACHE_DIR"]))
+        self.outcome = _LocalTaskOutcome()
+
+    def create_results_metadata(self, result_names: List[str], batch_size: int = 100) -> Dict[str, Result]:
+        results = {}
+        for name in result_names:
+            result_id = str(uuid.uuid4())
+            results[name] = Result(session_id=self.session_id, name=name, result_id=result_id, status=ResultStatus.CREATED)
+            self.outcome.created.append((name, result_id, False))
+        return results
+
+    def create_results(self, results_data: Dict[str, bytes], batch_size: int = 1) -> Dict[str, Result]:
+        results = {}
+        for name, data in results_data.items():
+            result_id = str(uuid.uuid4())
+            _write_data(self._data_dir / result_id, data)
+            results[name] = Result(session_id=self.session_id, name=name, result_id=result_id, status=ResultStatus.COMPLETED)
+            self.outcome.created.append((name, result_id, True))
+        return results
+
+    def send_results(self, results_data: Dict[str, Union[bytes, bytearray]]) -> None:
+        for result_id, data in results_data.items():
+            _write_data(self._data_dir / result_id, data)
+            self.outcome.sent.append(result_id)
+
+    def submit_tasks(
+        self,
+        tasks: List[TaskDefinition],
+        default_task_options: Optional[TaskOptions] = None,
+        batch_size: Optional[int] = 100,
+    ) -> List[Task]:
+        self.outcome.submitted.append((list(tasks), default_task_options))
+        return []
+
+
+def _write_data(file_path: Path, data: Union[bytes, bytearray, Iterable[bytes]]) -> int:
+    # Written to a temporary file first so that readers never see partial data
+    tmp_path = file_path.with_name(f".{file_path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    size = 0
+    with open(tmp_path, "wb") as f:
+        for chunk in [data] if isinstance(data, (bytes, bytearray, memoryview)) else data:
+            f.write(chunk)
+            size += len(chunk)
+    os.replace(tmp_path, file_path)
+    return size
+
+
+def _init_local_worker(cache_root: str) -> None:
+    # Objects retrieved by the tasks (and the worker object cache) live in the backend's directory
+    os.environ["PYMONIK_WORKER_CACHE_DIR"] = cache_root
+    # The worker processes are forked from the client: they inherit its tracer and its pending spans
+    tracer = get_default_tracer()
+    tracer.clear()
+    tracer.service_name = "pymonik-worker"
+
+
+def _run_local_task(spec: _LocalTaskSpec) -> _LocalTaskOutcome:
+    """Run a task in a local worker process, through the same code path as on an ArmoniK worker."""
+    # Imported here: the worker module imports core, which imports this module
+    from .worker import _process_task
+
+    task_handler = _LocalTaskHandler(spec)
+    output: Output = _process_task(task_handler, logging.getLogger("PymonikLocalWorker"), construct_environment=False)
+    task_handler.outcome.error = output.error
+    return task_handler.outcome
+
+
+class LocalBackend:
+    """
+    Local stand-in for an ArmoniK cluster, used by Pymonik(local_session=True).
+
+    Results are files of a temporary directory, and tasks run on a pool of local processes as soon as
+    their data dependencies are completed, through the same code path as on an ArmoniK worker. The
+    subtasks submitted by a task (including delegations to its own expected outputs) are scheduled
+    when it ends, as on a cluster. The backend exposes objects with the interface of the ArmoniK
+    clients PymoniK uses (results_client, tasks_client, sessions_client, events_client), so the
+    rest of PymoniK works unchanged. The environment requested by tasks isn't installed and tasks
+    aren't retried: a failing task aborts its expected outputs. Materialize content is written to a
+    directory of the session under the backend's directory rather than to its worker path: tasks get
+    Materialize objects whose worker_path points there.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, directory: Optional[Union[str, Path]] = None):
+        self._owns_directory = directory is None
+        self.directory = Path(tempfile.mkdtemp(prefix="pymonik-local-") if directory is None else directory)
+        self.data_dir = self.directory / "results"
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        cache_root = self.directory / "cache"
+        cache_root.mkdir(exist_ok=True)
+        # Forked processes see the functions and modules of the client as they are, where available
+        if "fork" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("fork")
+        else:
+            mp_context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_local_worker,
+            initargs=(str(cache_root),),
+        )
+        # A forking pool starts all its processes on the first submission: do it now, before the client
+        # starts threads (forking a multi-threaded process can deadlock the children)
+        self._executor.submit(os.getpid).result()
+        self._condition = threading.Condition()
+        self._results: Dict[str, Result] = {}
+        # Result IDs by status, so that listing the results of a status doesn't go through all of them
+        self._results_by_status: Dict[int, Set[str]] = defaultdict(set)
+        self._sessions: Dict[str, str] = {}
+        self._dependents: Dict[str, List[_PendingTask]] = defaultdict(list)
+        self._running: Set[Future] = set()
+        self.results_client = _LocalResults(self)
+        self.tasks_client = _LocalTasks(self)
+        self.sessions_client = _LocalSessions(self)
+        self.events_client = _LocalEvents(self)
+
+    # Sessions
+
+    def create_session(self) -> str:
+        session_id = str(uuid.uuid4())
+        with self._condition:
+            self._sessions[session_id] = "running"
+        return session_id
+
+    def end_session(self, session_id: str, cancel: bool = False) -> None:
+        with self._condition:
+            self._sessions[session_id] = "cancelled" if cancel else "closed"
+            if cancel:
+                self._abort(
+                    [
+                        result_id
+                        for result_id in self._results_by_status[ResultStatus.CREATED]
+                        if self._results[result_id].session_id == session_id
+                    ]
+                )
+
+    # Results
+
+    def create_results(
+        self, session_id: str, names: Iterable[str], data: Optional[Dict[str, bytes]] = None
+    ) -> Dict[str, Result]:
+        created = {}
+        for name in names:
+            result = Result(
+                session_id=session_id,
+                name=name,
+                status=ResultStatus.CREATED,
+                created_at=datetime.now(timezone.utc),
+                result_id=str(uuid.uuid4()),
+            )
+            if data is not None:
+                _write_data(self.data_dir / result.result_id, data[name])
+            created[name] = result
+        with self._condition:
+            for result in created.values():
+                self._add_result(result)
+            if data is not None:
+                self._complete([result.result_id for result in created.values()])
+        return created
+
+    def write_result(self, result_id: str, data: Union[bytes, bytearray, Iterable[bytes]]) -> None:
+        with self._condition:
+            if result_id not in self._results:
+                raise KeyError(f"Result {result_id} doesn't exist")
+        _write_data(self.data_dir / result_id, data)
+        with self._condition:
+            self._complete([result_id])
+
+    def read_result(self, result_id: str) -> bytes:
+        with self._condition:
+            result = self._results.get(result_id)
+            if result is None or result.status != ResultStatus.COMPLETED:
+                raise RuntimeError(f"Result {result_id} isn't available")
+        return (self.data_dir / result_id).read_bytes()
+
+    def _candidate_ids(self, filters) -> Optional[Set[str]]:
+        # Called with the lock held. The results a filter can match when each of its clauses selects
+        # results by ID or by status (as the poller's filters do), None if all of them have to be checked.
+        candidates: Set[str] = set()
+        for clause in getattr(filters, "or"):
+            for condition in getattr(clause, "and"):
+                indexed = _indexed_condition(condition)
+                if indexed is not None:
+                    key, value = indexed
+                    candidates.update([value] if key == "result_id" else self._results_by_status.get(value, ()))
+                    break
+            else:
+                return None
+        return candidates
+
+    def list_results(self, filters=None) -> List[Result]:
+        with self._condition:
+            candidate_ids = self._candidate_ids(filters) if filters is not None and getattr(filters, "or") else None
+            if candidate_ids is None:
+                results = list(self._results.values())
+            else:
+                results = [self._results[r_id] for r_id in candidate_ids if r_id in self._results]
+        if filters is None:
+            return results
+        return [result for result in results if matches_filters(result, filters)]
+
+    def _add_result(self, result: Result) -> None:
+        # Called with the lock held
+        self._results[result.result_id] = result
+        self._results_by_status[result.status].add(result.result_id)
+
+    def _set_status(self, result: Result, status: ResultStatus) -> None:
+        # Called with the lock held
+        self._results_by_status[result.status].discard(result.result_id)
+        result.status = status
+        self._results_by_status[status].add(result.result_id)
+
+    def wait(self, result_ids: Iterable[str]) -> None:
+        """Block until the results are completed, raising RuntimeError if one of them is aborted."""
+        pending = set(result_ids)
+        with self._condition:
+            while pending:
+                for result_id in list(pending):
+                    result = self._results.get(result_id)
+                    if result is None:
+                        raise RuntimeError(f"Result {result_id} doesn't exist")
+                    if result.status == ResultStatus.ABORTED:
+                        raise RuntimeError(f"Result {result_id} has been aborted.")
+                    if result.status == ResultStatus.COMPLETED:
+                        pending.discard(result_id)
+                if pending:
+                    self._condition.wait()
+
+    def _complete(self, result_ids: Iterable[str]) -> None:
+        # Called with the lock held
+        now = datetime.now(timezone.utc)
+        for result_id in result_ids:
+            result = self._results[result_id]
+            if result.status != ResultStatus.CREATED:
+                continue
+            self._set_status(result, ResultStatus.COMPLETED)
+            result.completed_at = now
+            result.size = (self.data_dir / result_id).stat().st_size
+            for pending_task in self._dependents.pop(result_id, []):
+                pending_task.remaining -= 1
+                if pending_task.remaining == 0 and not pending_task.aborted:
+                    self._start(pending_task.spec)
+        self._condition.notify_all()
+
+    def _abort(self, result_ids: Iterable[str]) -> None:
+        # Called with the lock held, the tasks depending on an aborted result abort their outputs as well
+        to_abort = list(result_ids)
+        while to_abort:
+            result = self._results.get(to_abort.pop())
+            if result is None or result.status != ResultStatus.CREATED:
+                continue
+            self._set_status(result, ResultStatus.ABORTED)
+            for pending_task in self._dependents.pop(result.result_id, []):
+                if not pending_task.aborted:
+                    pending_task.aborted = True
+                    to_abort.extend(pending_task.spec.expected_outputs)
+        self._condition.notify_all()
+
+    # Tasks
+
+    def submit_tasks(
+        self, session_id: str, tasks: List[TaskDefinition], default_task_options: Optional[TaskOptions] = None
+    ) -> List[Task]:
+        with self._condition:
+            if self._sessions.get(session_id) != "running":
+                raise RuntimeError(f"Session {session_id} doesn't accept new tasks")
+            return self._submit(session_id, tasks, default_task_options)
+
+    def _submit(
+        self, session_id: str, tasks: List[TaskDefinition], default_task_options: Optional[TaskOptions] = None
+    ) -> List[Task]:
+        # Called with the lock held
+        submitted = []
+        for task_definition in tasks:
+            spec = _LocalTaskSpec(
+                session_id=session_id,
+                task_id=str(uuid.uuid4()),
+                payload_id=task_definition.payload_id,
+                data_dependencies=list(task_definition.data_dependencies),
+                expected_outputs=list(task_definition.expected_output_ids),
+                data_dir=str(self.data_dir),
+                materialize_root=str(self.directory / "sessions" / session_id / "materialized"),
+            )
+            for result_id in spec.expected_outputs:
+                self._results[result_id].owner_task_id = spec.task_id
+            self._schedule(spec)
+            submitted.append(
+                Task(
+                    id=spec.task_id,
+                    session_id=session_id,
+                    data_dependencies=spec.data_dependencies,
+                    expected_output_ids=spec.expected_outputs,
+                    payload_id=spec.payload_id,
+                    options=task_definition.options or default_task_options,
+                )
+            )
+        return submitted
+
+    def _schedule(self, spec: _LocalTaskSpec) -> None:
+        # Called with the lock held
+        pending_task = _PendingTask(spec)
+        for result_id in set([spec.payload_id] + spec.data_dependencies):
+            status = self._results[result_id].status
+            if status == ResultStatus.ABORTED:
+                self._abort(spec.expected_outputs)
+                return
+            if status != ResultStatus.COMPLETED:
+                self._dependents[result_id].append(pending_task)
+                pending_task.remaining += 1
+        if pending_task.remaining == 0:
+            self._start(spec)
+
+    def _start(self, spec: _LocalTaskSpec) -> None:
+        # Called with the lock held
+        try:
+            future = self._executor.submit(_run_local_task, spec)
+        except RuntimeError:  # The pool has been shut down
+            self._abort(spec.expected_outputs)
+            return
+        self._running.add(future)
+        future.add_done_callback(partial(self._task_done, spec))
+
+    def _task_done(self, spec: _LocalTaskSpec, future: Future) -> None:
+        try:
+            outcome = future.result()
+        except Exception as e:  # e.g. a worker process died, errors raised by the task are in the outcome
+            logger.error(f"Local worker failed to run task {spec.task_id}: {e!r}")
+            outcome = _LocalTaskOutcome(error=repr(e))
+        with self._condition:
+            self._running.discard(future)
+            if self._sessions.get(spec.session_id) == "cancelled":
+                return
+            if outcome.error is not None:
+                self._abort(spec.expected_outputs)
+                return
+            now = datetime.now(timezone.utc)
+            for name, result_id, _ in outcome.created:
+                self._add_result(
+                    Result(
+                        session_id=spec.session_id,
+                        name=name,
+                        created_by=spec.task_id,
+                        status=ResultStatus.CREATED,
+                        created_at=now,
+                        result_id=result_id,
+                    )
+                )
+            self._complete([result_id for _, result_id, has_data in outcome.created if has_data])
+            self._complete(outcome.sent)
+            delegated = set()
+            for task_definitions, default_task_options in outcome.submitted:
+                self._submit(spec.session_id, task_definitions, default_task_options)
+                for task_definition in task_definitions:
+                    delegated.update(task_definition.expected_output_ids)
+            # On a cluster the agent fails a task ending without providing its outputs
+            missing = [
+                result_id
+                for result_id in spec.expected_outputs
+                if self._results[result_id].status == ResultStatus.CREATED and result_id not in delegated
+            ]
+            if missing:
+                logger.warning(f"Task {spec.task_id} ended without sending its results {missing}")
+                self._abort(missing)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes and remove the results directory."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._condition:
+            self._abort(list(self._results_by_status[ResultStatus.CREATED]))
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class _LocalResultsStub:
+    """Stand-in for the Results gRPC stub, for the streamed uploads of upload_result_stream."""
+
+    def __init__(self, backend: LocalBackend):
+        self._backend = backend
+
+    def UploadResultData(self, requests: Iterable[UploadResultDataRequest]) -> None:
+        requests = iter(requests)
+        result_id = next(requests).id.result_id
+        self._backend.write_result(result_id, (request.data_chunk for request in requests))
+
+
+class _LocalResults:
+    """ArmoniKResults interface of a LocalBackend."""
+
+    def __init__(self, backend: LocalBackend):
+        self._backend = backend
+        self._client = _LocalResultsStub(backend)
+
+    def create_results_metadata(self, result_names: List[str], session_id: str, batch_size: int = 100) -> Dict[str, Result]:
+        return self._backend.create_results(session_id, result_names)
+
+    def create_results(self, results_data: Dict[str, bytes], session_id: str, batch_size: int = 1) -> Dict[str, Result]:
+        return self._backend.create_results(session_id, results_data.keys(), results_data)
+
+    def upload_result_data(self, result_id: str, session_id: str, result_data: Union[bytes, bytearray]) -> None:
+        self._backend.write_result(result_id, result_data)
+
+    def download_result_data(self, result_id: str, session_id: str) -> bytes:
+        return self._backend.read_result(result_id)
+
+    def list_results(self, result_filter=None, page: int = 0, page_size: int = 1000, sort_field=None, sort_direction=None) -> Tuple[int, List[Result]]:
+        results = self._backend.list_results(result_filter.to_message() if result_filter is not None else None)
+        return len(results), results[page * page_size : (page + 1) * page_size]
+
+    def get_service_config(self) -> int:
+        return _DATA_CHUNK_MAX_SIZE
+
+
+class _LocalTasks:
+    """ArmoniKTasks interface of a LocalBackend."""
+
+    def __init__(self, backend: LocalBackend):
+        self._backend = backend
+
+    def submit_tasks(
+        self,
+        session_id: str,
+        tasks: List[TaskDefinition],
+        default_task_options: Optional[TaskOptions] = None,
+        chunk_size: Optional[int] = 100,
+    ) -> List[Task]:
+        return self._backend.submit_tasks(session_id, tasks, default_task_options)
+
+
+class _LocalSessions:
+    """ArmoniKSessions interface of a LocalBackend."""
+
+    def __init__(self, backend: LocalBackend):
+        self._backend = backend
+
+    def create_session(self, default_task_options: TaskOptions, partition_ids: Optional[List[str]] = None) -> str:
+        return self._backend.create_session()
+
+    def close_session(self, session_id: str) -> None:
+        self._backend.end_session(session_id)
+
+    def cancel_session(self, session_id: str) -> None:
+        self._backend.end_session(session_id, cancel=True)
+
+
+class _LocalEvents:
+    """ArmoniKEvents interface of a LocalBackend."""
+
+    def __init__(self, backend: LocalBackend):
+        self._backend = backend
+
+    def wait_for_result_availability(
+        self, result_ids: Union[str, List[str]], session_id: str, bucket_size: int = 100, parallelism: int = 1
+    ) -> None:
+        self._backend.wait([result_ids] if isinstance(result_ids, str) else result_ids)
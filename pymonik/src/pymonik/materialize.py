@@ -9,13 +9,22 @@
 
 import hashlib
 import io
+import json
 import os
+import shutil
+import uuid
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, BinaryIO, Dict, List, Optional, Union
 import cloudpickle as pickle
 from dataclasses import dataclass
 
+from .hash_index import FileHashIndex, get_default_hash_index
+
+# Size of the reads when streaming files through the hasher
+_HASH_CHUNK_SIZE = 1024 * 1024
+
 
 @dataclass
 class Materialize:
@@ -28,6 +37,7 @@ class Materialize:
     content_hash: str  # SHA-256 hash of the content
     is_directory: bool  # Whether the source was a directory (and thus zipped)
     result_id: Optional[str] = None  # Set after upload to ArmoniK
+    per_file_sync: bool = False  # Directory files are uploaded/synced one by one instead of as a zip
     
     def __post_init__(self):
         # Ensure paths are normalized
@@ -39,49 +49,223 @@ def _calculate_file_hash(file_path: Union[str, Path]) -> str:
     """Calculate SHA-256 hash of a file."""
     hasher = hashlib.sha256()
     with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
             hasher.update(chunk)
     return hasher.hexdigest()
 
 
-def _calculate_directory_hash(dir_path: Union[str, Path]) -> str:
-    """Calculate SHA-256 hash of a directory by hashing its zipped contents."""
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        dir_path = Path(dir_path)
-        for file_path in sorted(dir_path.rglob('*')):
-            if file_path.is_file():
-                arcname = file_path.relative_to(dir_path)
-                zipf.write(file_path, arcname)
-    
-    zip_buffer.seek(0)
+def _list_directory_files(dir_path: Union[str, Path]) -> List[str]:
+    """List the files of a directory as sorted, '/'-separated paths relative to it."""
+    dir_path = Path(dir_path)
+    return sorted(
+        file_path.relative_to(dir_path).as_posix()
+        for file_path in dir_path.rglob('*')
+        if file_path.is_file()
+    )
+
+
+def _calculate_directory_manifest(
+    dir_path: Union[str, Path],
+    max_workers: Optional[int] = None,
+    hash_index: Optional[FileHashIndex] = None,
+) -> Dict[str, str]:
+    """
+    Calculate the SHA-256 hash of every file of a directory.
+
+    Files are hashed by streaming reads on a thread pool (hashlib releases the GIL). With a
+    hash_index, only the files whose stat information changed since they were indexed are read.
+
+    Returns:
+        Dict[str, str]: Relative file path -> hash, in sorted path order.
+    """
+    dir_path = Path(dir_path)
+    relative_paths = _list_directory_files(dir_path)
+    if hash_index is not None:
+        digests = hash_index.hash_files(
+            [dir_path / rel for rel in relative_paths], _calculate_file_hash, max_workers=max_workers
+        )
+        return dict(zip(relative_paths, digests))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pymonik-hash") as executor:
+        digests = executor.map(lambda rel: _calculate_file_hash(dir_path / rel), relative_paths)
+        return dict(zip(relative_paths, digests))
+
+
+def _calculate_manifest_hash(manifest: Dict[str, str]) -> str:
+    """Combine the file hashes of a manifest into the hash of the directory, in sorted path order."""
     hasher = hashlib.sha256()
-    for chunk in iter(lambda: zip_buffer.read(8192), b""):
-        hasher.update(chunk)
+    for relative_path in sorted(manifest):
+        hasher.update(relative_path.encode("utf-8"))
+        hasher.update(b"\0")
+        hasher.update(manifest[relative_path].encode("ascii"))
+        hasher.update(b"\n")
     return hasher.hexdigest()
 
 
-def _create_zip_from_directory(dir_path: Union[str, Path]) -> bytes:
-    """Create a zip file from a directory and return its bytes."""
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+def _calculate_directory_hash(dir_path: Union[str, Path], hash_index: Optional[FileHashIndex] = None) -> str:
+    """
+    Calculate SHA-256 hash of a directory.
+
+    This is a Merkle-style hash: the hash of the (relative path, file hash) list of the directory,
+    so no archive is built and memory use doesn't depend on the directory size.
+    """
+    return _calculate_manifest_hash(_calculate_directory_manifest(dir_path, hash_index=hash_index))
+
+
+def _get_marker_path(worker_path: Union[str, Path]) -> Path:
+    """Path of the manifest marker of a materialized path, stored next to it."""
+    worker_path = Path(worker_path)
+    return worker_path.parent / f".{worker_path.name}.pymonik-manifest.json"
+
+
+def _stat_materialized_files(worker_path: Path, is_directory: bool) -> Dict[str, List[int]]:
+    """Relative path -> [size, mtime_ns] for a materialized file ("" as its path) or every file of a directory."""
+    if not is_directory:
+        stat = worker_path.stat()
+        return {"": [stat.st_size, stat.st_mtime_ns]}
+    files = {}
+    for relative_path in _list_directory_files(worker_path):
+        stat = (worker_path / relative_path).stat()
+        files[relative_path] = [stat.st_size, stat.st_mtime_ns]
+    return files
+
+
+def _write_materialize_marker(
+    worker_path: Union[str, Path],
+    content_hash: str,
+    is_directory: bool,
+    file_hashes: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Atomically write the manifest marker of a materialized path.
+
+    The marker records the content hash along with the size and mtime of every file, so later tasks
+    can check the content is still intact with stat calls only. The hash of every file can also be
+    recorded, for per-file syncs to know which local files can be kept.
+    """
+    worker_path = Path(worker_path)
+    marker = {
+        "content_hash": content_hash,
+        "is_directory": is_directory,
+        "files": _stat_materialized_files(worker_path, is_directory),
+    }
+    if file_hashes is not None:
+        marker["file_hashes"] = file_hashes
+    marker_path = _get_marker_path(worker_path)
+    tmp_path = marker_path.with_name(f"{marker_path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(marker, f)
+    os.replace(tmp_path, marker_path)
+
+
+def _read_materialize_marker(worker_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_get_marker_path(worker_path), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _get_intact_file_hashes(worker_path: Union[str, Path]) -> Dict[str, str]:
+    """Hashes recorded in the marker of a materialized directory for the files whose size and mtime didn't change."""
+    worker_path = Path(worker_path)
+    marker = _read_materialize_marker(worker_path)
+    if not marker or not marker.get("is_directory") or not worker_path.is_dir():
+        return {}
+    recorded_stats = marker.get("files", {})
+    intact = {}
+    for relative_path, file_hash in marker.get("file_hashes", {}).items():
+        try:
+            stat = (worker_path / relative_path).stat()
+        except OSError:
+            continue
+        if recorded_stats.get(relative_path) == [stat.st_size, stat.st_mtime_ns]:
+            intact[relative_path] = file_hash
+    return intact
+
+
+def _check_materialize_marker(worker_path: Union[str, Path], content_hash: str, is_directory: bool) -> bool:
+    """Check a materialized path against its marker: same hash, and the same files with the same size and mtime."""
+    worker_path = Path(worker_path)
+    try:
+        marker = _read_materialize_marker(worker_path)
+        if marker is None:
+            return False
+        if marker.get("content_hash") != content_hash or marker.get("is_directory") != is_directory:
+            return False
+        if is_directory != worker_path.is_dir():
+            return False
+        return _stat_materialized_files(worker_path, is_directory) == marker.get("files")
+    except (OSError, ValueError):
+        return False
+
+
+def _remove_path(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Hard link a file when possible (same filesystem), copy it otherwise."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def _replace_path(staging_path: Path, worker_path: Path) -> None:
+    """
+    Move a fully written staging file/directory to its final path.
+
+    Existing content is first renamed aside, so the final path either holds the old content or the new one.
+    """
+    old_path = None
+    if worker_path.exists() or worker_path.is_symlink():
+        old_path = worker_path.with_name(f".{worker_path.name}.pymonik-old-{uuid.uuid4().hex}")
+        os.replace(worker_path, old_path)
+    os.replace(staging_path, worker_path)
+    if old_path is not None:
+        _remove_path(old_path)
+
+
+def _create_zip_from_directory(dir_path: Union[str, Path], fileobj: Optional[BinaryIO] = None) -> Optional[bytes]:
+    """
+    Create a zip file from a directory.
+
+    If fileobj is given the archive is streamed into it (file contents are read in chunks by zipfile)
+    and None is returned, otherwise the bytes of the archive are returned.
+    """
+    target = fileobj if fileobj is not None else io.BytesIO()
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as zipf:
         dir_path = Path(dir_path)
         for file_path in sorted(dir_path.rglob('*')):
             if file_path.is_file():
                 arcname = file_path.relative_to(dir_path)
                 zipf.write(file_path, arcname)
     
-    zip_buffer.seek(0)
-    return zip_buffer.getvalue()
+    if fileobj is not None:
+        return None
+    return target.getvalue()
 
 
-def materialize(source_path: Union[str, Path], worker_path: Union[str, Path]) -> Materialize:
+def materialize(
+    source_path: Union[str, Path],
+    worker_path: Union[str, Path],
+    use_hash_cache: bool = True,
+    per_file_sync: bool = False,
+) -> Materialize:
     """
     Create a Materialize object for a file or directory.
     
     Args:
         source_path: Local file or directory path to materialize
         worker_path: Target path in the worker where the file/directory should be placed
+        use_hash_cache: Reuse the hashes of files that didn't change (same path, size, mtime and inode)
+            since a previous run, from the local index in $PYMONIK_CACHE_DIR (defaults to ~/.cache/pymonik)
+        per_file_sync: For directories, upload every file as its own content-addressed result instead of
+            a single zip. Only the files missing from the session are uploaded, and workers only fetch the
+            files that differ from their local copy. Useful for large directories that change a little.
         
     Returns:
         Materialize: Object representing the materialized content
@@ -95,11 +279,15 @@ def materialize(source_path: Union[str, Path], worker_path: Union[str, Path]) ->
     if not source_path.exists():
         raise FileNotFoundError(f"Source path does not exist: {source_path}")
     
+    hash_index = get_default_hash_index() if use_hash_cache else None
     if source_path.is_file():
-        content_hash = _calculate_file_hash(source_path)
+        if hash_index is not None:
+            content_hash = hash_index.hash_files([source_path], _calculate_file_hash)[0]
+        else:
+            content_hash = _calculate_file_hash(source_path)
         is_directory = False
     elif source_path.is_dir():
-        content_hash = _calculate_directory_hash(source_path)
+        content_hash = _calculate_directory_hash(source_path, hash_index=hash_index)
         is_directory = True
     else:
         raise ValueError(f"Source path must be a file or directory: {source_path}")
@@ -108,5 +296,6 @@ def materialize(source_path: Union[str, Path], worker_path: Union[str, Path]) ->
         source_path=str(source_path),
         worker_path=str(worker_path),
         content_hash=content_hash,
-        is_directory=is_directory
+        is_directory=is_directory,
+        per_file_sync=per_file_sync and is_directory,
     )
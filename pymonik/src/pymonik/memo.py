@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Union
+
+from .hash_index import _default_cache_dir
+
+_DEFAULT_MAX_BYTES = 10 * 1024 * 1024 * 1024
+
+
+class MemoStore(ABC):
+    """
+    Backend of the persistent task result cache used by @task(cache=True).
+
+    Maps invocation keys (hashes of the function and of its arguments) to the pickled values of the
+    task outputs. Subclass it to keep the cache somewhere else than on the local disk (e.g. a shared
+    filesystem or an object store) and pass an instance to Pymonik(memo_store=...).
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Pickled value stored for a key, None if there is none."""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        """Store the pickled value of a key."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every stored value."""
+
+
+class LocalMemoStore(MemoStore):
+    """
+    MemoStore keeping the values as files of a local directory, indexed by an SQLite database.
+
+    The directory defaults to memo/ in $PYMONIK_CACHE_DIR (~/.cache/pymonik by default). When the stored
+    values exceed max_bytes, the least recently used ones are removed.
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, max_bytes: int = _DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory else _default_cache_dir() / "memo"
+        self.max_bytes = max_bytes
+        self.blobs_dir = self.directory / "blobs"
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.directory / "index.sqlite"), timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS memo (key TEXT PRIMARY KEY, size INTEGER, created REAL, last_access REAL)"
+            )
+
+    def _blob_path(self, key: str) -> Path:
+        # Keys are hex digests, spread the blobs over subdirectories
+        return self.blobs_dir / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock, self._connection:
+            found = self._connection.execute(
+                "UPDATE memo SET last_access = ? WHERE key = ?", (time.time(), key)
+            ).rowcount
+            if not found:
+                self.misses += 1
+                return None
+        try:
+            data = self._blob_path(key).read_bytes()
+        except FileNotFoundError:
+            with self._lock, self._connection:
+                self._connection.execute("DELETE FROM memo WHERE key = ?", (key,))
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        blob_path = self._blob_path(key)
+        blob_path.parent.mkdir(exist_ok=True)
+        # Written to a temporary file first so that a concurrent reader never sees a partial value
+        tmp_path = blob_path.with_name(f".{key}.tmp-{os.getpid()}-{threading.get_ident()}")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, blob_path)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO memo (key, size, created, last_access) VALUES (?, ?, ?, ?)",
+                (key, len(data), now, now),
+            )
+            self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        # Called with the lock held, inside a transaction
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM memo").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM memo WHERE key != ? ORDER BY last_access ASC", (keep,)
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._blob_path(key).unlink(missing_ok=True)
+            evicted.append(key)
+            total -= size
+        self._connection.executemany("DELETE FROM memo WHERE key = ?", [(key,) for key in evicted])
+        self.evictions += len(evicted)
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            for (key,) in self._connection.execute("SELECT key FROM memo").fetchall():
+                self._blob_path(key).unlink(missing_ok=True)
+            self._connection.execute("DELETE FROM memo")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_default_store: Optional[LocalMemoStore] = None
+_default_store_failed = False
+_default_store_lock = threading.Lock()
+
+
+def get_default_memo_store() -> Optional[LocalMemoStore]:
+    """
+    The process-wide LocalMemoStore, None if it can't be opened (e.g. read-only home).
+
+    Its budget is read from PYMONIK_MEMO_MAX_BYTES (10 GiB by default).
+    """
+    global _default_store, _default_store_failed
+    with _default_store_lock:
+        if _default_store is None and not _default_store_failed:
+            try:
+                _default_store = LocalMemoStore(
+                    max_bytes=int(os.getenv("PYMONIK_MEMO_MAX_BYTES", _DEFAULT_MAX_BYTES))
+                )
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"Could not open the task result cache, results won't be cached: {e}")
+                _default_store_failed = True
+        return _default_store
@@ -0,0 +1,221 @@
+import random
+import threading
+import time
+import grpc
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from armonik.client import ArmoniKResults
+from armonik.common import Result, ResultStatus, batched
+
+
+@dataclass
+class PollingMetrics:
+    """
+    Latency and throughput counters collected by a ResultPoller.
+    Each "poll" is one round over all the pending results, which may involve several list calls.
+    Counters are updated under a lock, as a poller is shared by the waiting threads and the status tracker.
+    """
+    polls: int = 0
+    list_calls: int = 0
+    rpc_errors: int = 0
+    status_changes: int = 0
+    total_latency: float = 0.0
+    min_latency: Optional[float] = None
+    max_latency: float = 0.0
+    last_latency: float = 0.0
+    last_interval: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_poll(self, latency: float, changes: int, interval: float) -> None:
+        with self._lock:
+            self.polls += 1
+            self.status_changes += changes
+            self.total_latency += latency
+            self.last_latency = latency
+            self.last_interval = interval
+            self.max_latency = max(self.max_latency, latency)
+            self.min_latency = latency if self.min_latency is None else min(self.min_latency, latency)
+
+    def record_list_calls(self, count: int) -> None:
+        with self._lock:
+            self.list_calls += count
+
+    def record_rpc_error(self) -> None:
+        with self._lock:
+            self.rpc_errors += 1
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.polls if self.polls else 0.0
+
+
+@dataclass
+class _PollState:
+    """Last known status for every result the poller has been asked about."""
+    statuses: Dict[str, ResultStatus] = field(default_factory=dict)
+
+
+class ResultPoller:
+    """
+    Polling engine used to wait for results when the events service is unavailable.
+
+    Every round polls all the pending results at once, with result id filters split in chunks of
+    batch_size that are listed concurrently. A round costs one list call per chunk of pending results,
+    whatever the number of results the session already holds, and each call returns a single page
+    bounded by its ids, so results can't be skipped or duplicated across pages. Statuses are diffed
+    against the previous round, and the interval between rounds backs off (with jitter) while nothing
+    changes.
+    """
+
+    def __init__(
+        self,
+        results_client: ArmoniKResults,
+        session_id: str,
+        polling_interval: float = 1.0,
+        max_polling_interval: float = 10.0,
+        backoff_factor: float = 1.5,
+        jitter: float = 0.1,
+        batch_size: int = 10,
+        parallelism: int = 8,
+    ):
+        self._results_client = results_client
+        self.session_id = session_id
+        self.polling_interval = polling_interval
+        self.max_polling_interval = max(max_polling_interval, polling_interval)
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.batch_size = batch_size
+        self.parallelism = parallelism
+        self.metrics = PollingMetrics()
+        self._state = _PollState()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.parallelism, thread_name_prefix="pymonik-poller"
+            )
+        return self._executor
+
+    def _list_by_ids(self, result_ids: List[str]) -> List[Result]:
+        result_filter = None
+        for r_id in result_ids:
+            condition = Result.result_id == r_id
+            result_filter = condition if result_filter is None else result_filter | condition
+        _, results = self._results_client.list_results(
+            result_filter=(Result.session_id == self.session_id) & result_filter,
+            page=0,
+            page_size=len(result_ids),
+        )
+        return results
+
+    def _fetch_finished(self, pending: Set[str]) -> List[Result]:
+        chunks = [list(chunk) for chunk in batched(sorted(pending), self.batch_size)]
+        self.metrics.record_list_calls(len(chunks))
+        if len(chunks) == 1:
+            return self._list_by_ids(chunks[0])
+        results = []
+        for chunk_results in self._get_executor().map(self._list_by_ids, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def poll(self, result_ids: Iterable[str]) -> Dict[str, ResultStatus]:
+        """
+        Run a single polling round over the given results.
+
+        Returns:
+            Dict[str, ResultStatus]: The results whose status changed since the previous round.
+        """
+        pending = set(result_ids)
+        if not pending:
+            return {}
+        fetched = self._fetch_finished(pending)
+        changes = {}
+        with self._lock:
+            for res_summary in fetched:
+                r_id = res_summary.result_id
+                if r_id not in pending:
+                    continue
+                if self._state.statuses.get(r_id) != res_summary.status:
+                    self._state.statuses[r_id] = res_summary.status
+                    changes[r_id] = res_summary.status
+        return changes
+
+    def status(self, result_id: str) -> Optional[ResultStatus]:
+        """Last status observed for a result, None if it was never observed."""
+        with self._lock:
+            return self._state.statuses.get(result_id)
+
+    def record(self, result_ids: Iterable[str], status: ResultStatus) -> None:
+        """Record a status observed outside of the poller (e.g. by the events client or a download)."""
+        with self._lock:
+            for r_id in result_ids:
+                self._state.statuses[r_id] = status
+
+    def next_interval(self, current_interval: float, had_changes: bool) -> float:
+        """Compute the (un-jittered) interval to use after a polling round."""
+        if had_changes:
+            return self.polling_interval
+        return min(current_interval * self.backoff_factor, self.max_polling_interval)
+
+    def jittered(self, interval: float) -> float:
+        """Randomize an interval by +/- jitter so that concurrent pollers don't synchronize."""
+        if self.jitter <= 0:
+            return interval
+        return max(0.0, interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def wait(self, result_ids: Iterable[str]) -> None:
+        """
+        Block until all the given results are completed.
+
+        Raises:
+            RuntimeError: If one of the results has been aborted.
+        """
+        pending = set(result_ids)
+        interval = self.polling_interval
+        while True:
+            # The poller is shared (status tracker, other waiters): a result whose change was seen by
+            # another observer isn't reported by poll() again, so the known statuses are checked first
+            self._discard_finished(pending)
+            if not pending:
+                return
+            start = time.perf_counter()
+            try:
+                changes = self.poll(pending)
+            except grpc.RpcError:
+                # Basic retry on RpcError, backing off like an idle round
+                self.metrics.record_rpc_error()
+                changes = {}
+            except Exception as e:
+                raise RuntimeError(f"An unexpected error occurred while polling for results: {e}")
+            finished = len(pending)
+            self._discard_finished(pending)
+            finished -= len(pending)
+            interval = self.next_interval(interval, bool(changes) or finished > 0)
+            self.metrics.record_poll(time.perf_counter() - start, len(changes), interval)
+            if pending:
+                time.sleep(self.jittered(interval))
+
+    def _discard_finished(self, pending: Set[str]) -> None:
+        """
+        Remove the completed results from pending, according to the known statuses.
+
+        Raises:
+            RuntimeError: If one of the results has been aborted.
+        """
+        with self._lock:
+            for r_id in list(pending):
+                known_status = self._state.statuses.get(r_id)
+                if known_status == ResultStatus.ABORTED:
+                    raise RuntimeError(f"Result {r_id} has been aborted.")
+                if known_status == ResultStatus.COMPLETED:
+                    pending.discard(r_id)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -1,18 +1,110 @@
+import threading
 import cloudpickle as pickle
-from typing import Generic, TypeVar, get_args, List
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generic, Iterable, Mapping, Optional, TypeVar, Union, get_args, List
+
+from armonik.common import ResultStatus
+
+from .chunking import resolve_chunked
+from .tracing import get_default_tracer
+from .tracking import _set_future_status
+from .utils import loads_buffer_views
 
 T = TypeVar("T")
 
+# Internal state of concurrent.futures.Future, only set up once a handle is used as a future
+_FUTURE_STATE_ATTRIBUTES = frozenset(
+    ("_condition", "_state", "_result", "_exception", "_waiters", "_done_callbacks")
+)
+_future_init_lock = threading.Lock()
+
 
 # TODO: Generics for better typing ... ResultHandle[str] for example..
 class ResultHandle(Generic[T]):
-    """A handle to a future result from an ArmoniK task."""
+    """
+    A handle to a future result from an ArmoniK task.
+
+    Handles implement the concurrent.futures.Future protocol (done, result, add_done_callback, and
+    can be passed to concurrent.futures.wait/as_completed). The future completes when the result is
+    available in ArmoniK, its state is fed by the shared status tracker of the PymoniK instance
+    which only starts following a handle the first time it is used as a future.
+    """
+
+    # Handles are created by the million, they use slots (so they can't subclass Future, which has none)
+    # and borrow Future's implementation of the protocol instead.
+    __slots__ = ("result_id", "session_id", "_pymonik", "__weakref__", *_FUTURE_STATE_ATTRIBUTES)
+
+    cancel = Future.cancel
+    cancelled = Future.cancelled
+    running = Future.running
+    done = Future.done
+    exception = Future.exception
+    add_done_callback = Future.add_done_callback
+    set_running_or_notify_cancel = Future.set_running_or_notify_cancel
+    set_result = Future.set_result
+    set_exception = Future.set_exception
+    _invoke_callbacks = Future._invoke_callbacks
+    _Future__get_result = Future._Future__get_result
 
     def __init__(self, result_id: str, session_id: str, pymonik_instance: "Pymonik"):
+        # Future.__init__ is deferred to the first use of the future protocol (see __getattr__)
         self.result_id = result_id
         self.session_id: str = session_id
         self._pymonik = pymonik_instance
 
+    def __getattr__(self, name):
+        # Only called for unset slots/missing attributes
+        if name in _FUTURE_STATE_ATTRIBUTES:
+            self._start_tracking()
+            return object.__getattribute__(self, name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def _future_started(self) -> bool:
+        try:
+            object.__getattribute__(self, "_condition")
+            return True
+        except AttributeError:
+            return False
+
+    def _start_tracking(self) -> None:
+        with _future_init_lock:
+            if self._future_started():
+                return
+            if self._pymonik.is_worker():
+                raise RuntimeError(
+                    "Cannot track result completion in worker context. Use the client context instead."
+                )
+            Future.__init__(self)
+            # The task is submitted as soon as the handle exists, it can't be cancelled from here
+            self.set_running_or_notify_cancel()
+        # Results already seen finished (waited for, downloaded or polled) resolve right away
+        known_status = self._pymonik._known_result_status(self.result_id)
+        if known_status in (ResultStatus.COMPLETED, ResultStatus.ABORTED):
+            _set_future_status(self, self.result_id, known_status)
+            return
+        self._pymonik._get_status_tracker().track(self.result_id, self)
+
+    def _finished(self, status: ResultStatus) -> None:
+        """Record a terminal status of the result seen by a wait or a download, resolving the future if in use."""
+        self._pymonik._record_result_statuses([self.result_id], status)
+        if self._future_started():
+            _set_future_status(self, self.result_id, status)
+
+    def result(self, timeout: Optional[float] = None) -> T:
+        """
+        Wait for the result to be available and return its value.
+
+        Args:
+            timeout: Maximum number of seconds to wait, waits indefinitely if None.
+
+        Raises:
+            TimeoutError: If the result isn't available before the timeout.
+            RuntimeError: If the result has been aborted.
+        """
+        Future.result(self, timeout)
+        return self.get()
+
     def wait(self) -> "ResultHandle[T]":
         """Wait for the result to be available."""
         if self._pymonik.is_worker():
@@ -23,17 +115,45 @@ class ResultHandle(Generic[T]):
             self._pymonik._wait_for_results_availability(
                 self.session_id, [self.result_id]
             )
-            return self
         except Exception as e:
+            if self._pymonik._known_result_status(self.result_id) == ResultStatus.ABORTED:
+                self._finished(ResultStatus.ABORTED)
             print(f"Error waiting for result {self.result_id}: {e}")
             raise
+        self._finished(ResultStatus.COMPLETED)
+        return self
+
+    def _download(self) -> bytes:
+        """Download the pickled value of the result."""
+        results_client = self._pymonik._results_client
+        with get_default_tracer().span("pymonik.download", attributes={"pymonik.result_id": self.result_id}) as span:
+            result_data = results_client.download_result_data(self.result_id, self.session_id)
+            # Objects uploaded with put(chunked=True) hold a manifest of their chunks
+            result_data = resolve_chunked(
+                result_data, lambda chunk_id: results_client.download_result_data(chunk_id, self.session_id)
+            )
+            span.set_attribute("pymonik.bytes", len(result_data))
+        if not self._pymonik.is_worker():
+            self._finished(ResultStatus.COMPLETED)
+        return result_data
 
     def get(self) -> T:
-        """Get the result value."""
-        result_data = self._pymonik._results_client.download_result_data(
-            self.result_id, self.session_id
-        )
-        return pickle.loads(result_data)
+        """
+        Get the result value.
+
+        If the task returned a Shards container as its only output, the pieces are not downloaded,
+        a MultiResultHandle over them is returned instead (or a dict of handles for keyed shards).
+        """
+        result_data = self._download()
+        with get_default_tracer().span("pymonik.deserialize"):
+            value = pickle.loads(result_data)
+        if isinstance(value, _ShardedOutput):
+            return value.to_handles(self.session_id, self._pymonik)
+        # Outputs of @task(cache=True) invocations are stored in the persistent cache once retrieved
+        cache_key = self._pymonik._pending_cache_writes.pop(self.result_id, None)
+        if cache_key is not None:
+            self._pymonik._store_cached_result(cache_key, result_data)
+        return value
 
     def __repr__(self):
         type_str = "T"  # Default to the TypeVar name if not specialized
@@ -70,13 +190,102 @@ class ResultHandle(Generic[T]):
         return f"<ResultHandle(id={self.result_id}, session={self.session_id}, type={type_str})>"
 
 
+class _ResultIdTable:
+    """
+    Compact columnar storage for result ids.
+
+    ArmoniK result ids are UUID strings, they are packed as 16 raw bytes each in a single bytearray.
+    If an id that isn't a canonical UUID is added, the table falls back to a list of strings.
+    """
+
+    __slots__ = ("_packed", "_ids")
+
+    def __init__(self, result_ids: Iterable[str] = ()):
+        self._packed: Optional[bytearray] = bytearray()
+        self._ids: Optional[List[str]] = None
+        self.extend(result_ids)
+
+    @staticmethod
+    def _pack(result_id: str) -> Optional[bytes]:
+        if (
+            not isinstance(result_id, str)
+            or len(result_id) != 36
+            or result_id[8] != "-" or result_id[13] != "-" or result_id[18] != "-" or result_id[23] != "-"
+            or result_id != result_id.lower()
+        ):
+            return None
+        try:
+            return bytes.fromhex(result_id.replace("-", ""))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _unpack(packed: bytes) -> str:
+        h = packed.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+    def append(self, result_id: str) -> None:
+        if self._ids is None:
+            packed = self._pack(result_id)
+            if packed is not None:
+                self._packed += packed
+                return
+            self._ids = list(self)
+            self._packed = None
+        self._ids.append(result_id)
+
+    def extend(self, result_ids: Iterable[str]) -> None:
+        if isinstance(result_ids, _ResultIdTable) and result_ids._ids is None and self._ids is None:
+            self._packed += result_ids._packed
+            return
+        for result_id in result_ids:
+            self.append(result_id)
+
+    def slice(self, index: slice) -> "_ResultIdTable":
+        table = _ResultIdTable()
+        if self._ids is not None:
+            table._ids = self._ids[index]
+            table._packed = None
+        elif index.step in (None, 1):
+            start, stop, _ = index.indices(len(self))
+            table._packed = self._packed[16 * start : 16 * max(start, stop)]
+        else:
+            table.extend(self[i] for i in range(*index.indices(len(self))))
+        return table
+
+    def __getitem__(self, index: int) -> str:
+        if self._ids is not None:
+            return self._ids[index]
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("result index out of range")
+        return self._unpack(self._packed[16 * index : 16 * index + 16])
+
+    def __iter__(self):
+        if self._ids is not None:
+            return iter(self._ids)
+        return (self._unpack(self._packed[i : i + 16]) for i in range(0, len(self._packed), 16))
+
+    def __len__(self):
+        if self._ids is not None:
+            return len(self._ids)
+        return len(self._packed) // 16
+
+
 # TODO: implement _results_as_completed for retrieving results as they're completed
 # nvm maybe this is better, it'd be weird to fetch things when you iterate, implicit behavior bad..
 class MultiResultHandle:
-    """A handle to multiple future results from ArmoniK tasks."""
+    """
+    A handle to multiple future results from ArmoniK tasks.
+
+    Only the result ids are stored, in a compact table. ResultHandle objects are created on demand
+    when indexing or iterating.
+    """
 
     def __init__(self, result_handles: List[ResultHandle]):
-        self.result_handles = result_handles
+        self._result_ids = _ResultIdTable(handle.result_id for handle in result_handles)
         if result_handles:
             self._pymonik = result_handles[0]._pymonik
             self.session_id = result_handles[0].session_id
@@ -84,12 +293,56 @@ class MultiResultHandle:
             self._pymonik = None
             self.session_id = None
 
+    @classmethod
+    def from_result_ids(
+        cls, result_ids: Iterable[str], session_id: str, pymonik_instance: "Pymonik"
+    ) -> "MultiResultHandle":
+        """Create a MultiResultHandle without creating a ResultHandle per result."""
+        handle = cls([])
+        handle._result_ids = result_ids if isinstance(result_ids, _ResultIdTable) else _ResultIdTable(result_ids)
+        handle.session_id = session_id
+        handle._pymonik = pymonik_instance
+        return handle
+
+    @property
+    def result_ids(self) -> List[str]:
+        """The ids of the results."""
+        return list(self._result_ids)
+
+    @property
+    def result_handles(self) -> List[ResultHandle]:
+        """A new list with a ResultHandle for each result (use result_ids when the ids are enough)."""
+        return list(self)
+
+    def done(self) -> bool:
+        """
+        Return True if all the results are available (or aborted).
+
+        Computed from the statuses known by the Pymonik instance (results waited for, downloaded or
+        polled), results not known to be finished are handed to the status tracker.
+        """
+        if not self._result_ids:
+            return True
+        if self._pymonik.is_worker():
+            raise RuntimeError(
+                "Cannot track result completion in worker context. Use the client context instead."
+            )
+        unfinished = [
+            result_id
+            for result_id in self._result_ids
+            if self._pymonik._known_result_status(result_id) not in (ResultStatus.COMPLETED, ResultStatus.ABORTED)
+        ]
+        if not unfinished:
+            return True
+        self._pymonik._get_status_tracker().watch(unfinished)
+        return False
+
     def wait(self):
         """Wait for all results to be available."""
-        if not self.result_handles:
+        if not self._result_ids:
             return self
 
-        result_ids = [handle.result_id for handle in self.result_handles]
+        result_ids = self.result_ids
         try:
             self._pymonik._wait_for_results_availability(
                 self.session_id, result_ids
@@ -102,39 +355,129 @@ class MultiResultHandle:
     def get(self):
         """Get all result values."""
         # TODO: maybe should cache the get
-        return [handle.get() for handle in self.result_handles]
+        with get_default_tracer().span("pymonik.get", attributes={"pymonik.results": len(self)}):
+            return [handle.get() for handle in self]
+
+    def gather_into(
+        self,
+        out_array: Any,
+        index_fn: Optional[Callable[[int], Any]] = None,
+        max_workers: int = 8,
+    ) -> Any:
+        """
+        Download all results concurrently and write them into a preallocated array.
+
+        Each result is decoded as a view on its downloaded data (the buffers of NumPy arrays aren't copied
+        out of the pickled data) and copied into its slice of `out_array` (a NumPy ndarray, memmap or anything
+        supporting item assignment), then released: the data of a result is copied once, at most
+        `max_workers` downloaded results are held in memory at once and no list of the results is built.
+        Results should be available (see wait).
+
+        Args:
+            out_array: Preallocated destination array.
+            index_fn: Maps the position of a result in this handle to the index (int, slice or tuple of slices)
+                of `out_array` it's written to. Defaults to the position itself, stacking results along the first axis.
+            max_workers: Number of concurrent downloads.
+
+        Returns:
+            The destination array.
+        """
+        def _fetch_into(position: int) -> None:
+            value = loads_buffer_views(self[position]._download())
+            out_array[position if index_fn is None else index_fn(position)] = value
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pymonik-gather") as executor:
+            # Consume the iterator to propagate the first exception
+            for _ in executor.map(_fetch_into, range(len(self))):
+                pass
+        return out_array
+
+    def _adopt(self, other: Union[ResultHandle, "MultiResultHandle"]) -> None:
+        if self._pymonik is None:
+            self._pymonik = other._pymonik
+            self.session_id = other.session_id
     
     def append(self, other):
         if isinstance(other, ResultHandle):
-            self.result_handles.append(other)
+            self._adopt(other)
+            self._result_ids.append(other.result_id)
         else:
             raise TypeError(f'Cannot append a "{type(other).__name__}" type to a MultiResultHandle, append parmeter must be ResultHandle type')
     
     def extend(self, other):
         if isinstance(other, MultiResultHandle):
-            self.result_handles.extend(other)
+            if other._pymonik is not None:
+                self._adopt(other)
+            self._result_ids.extend(other._result_ids)
         elif isinstance(other, list) and all(isinstance(x, ResultHandle) for x in other):
-            self.result_handles.extend(other)
+            for handle in other:
+                self.append(handle)
         else:
             raise TypeError(f'Cannot extend with a "{type(other).__name__}" type, extend parmeter must be MultiResultHandle or List[ResultHandle] type')
 
     def __iter__(self):
-        return iter(self.result_handles)
+        for result_id in self._result_ids:
+            yield ResultHandle(result_id, self.session_id, self._pymonik)
 
     def __getitem__(self, index):
         if isinstance(index, slice):
-            return MultiResultHandle(self.result_handles[index])
+            return MultiResultHandle.from_result_ids(self._result_ids.slice(index), self.session_id, self._pymonik)
         elif isinstance(index, int):
-            return self.result_handles[index]
+            return ResultHandle(self._result_ids[index], self.session_id, self._pymonik)
         else:
             raise TypeError("Index must be an integer or a slice.")
 
     def __len__(self):
-        return len(self.result_handles)
+        return len(self._result_ids)
 
     def __repr__(self):
         return f"<MultiResultHandle(results={self.result_handles})>"
 
+class Shards:
+    """
+    Container for a task return value whose pieces are stored as separate results.
+
+    A task declared with `@task(num_returns=N)` can return a Shards (or a list/tuple) of N pieces,
+    each piece is sent to its own expected output and exposed as its own ResultHandle. When a task
+    without num_returns returns a Shards, the worker creates one result per piece and the task output
+    resolves to a MultiResultHandle over them (or a dict of handles if the Shards was built from a mapping).
+    Downstream tasks can then depend on just the pieces they read. A task receiving the whole output as
+    argument gets the pieces, as a list (or a dict for a mapping).
+    """
+
+    def __init__(self, pieces: Union[Iterable[Any], Mapping[Any, Any]]):
+        if isinstance(pieces, Mapping):
+            self.keys: Optional[List[Any]] = list(pieces.keys())
+            self.pieces: List[Any] = list(pieces.values())
+        else:
+            self.keys = None
+            self.pieces = list(pieces)
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def __repr__(self):
+        if self.keys is not None:
+            return f"<Shards(keys={self.keys})>"
+        return f"<Shards(count={len(self.pieces)})>"
+
+
+class _ShardedOutput:
+    """Stored in place of a task output when the worker split a Shards into dynamically created results."""
+
+    def __init__(self, result_ids: List[str], keys: Optional[List[Any]] = None):
+        self.result_ids = result_ids
+        self.keys = keys
+
+    def to_handles(self, session_id: str, pymonik_instance: "Pymonik") -> Union[MultiResultHandle, Dict[Any, ResultHandle]]:
+        if self.keys is not None:
+            return {
+                key: ResultHandle(r_id, session_id, pymonik_instance)
+                for key, r_id in zip(self.keys, self.result_ids)
+            }
+        return MultiResultHandle.from_result_ids(self.result_ids, session_id, pymonik_instance)
+
+
 class RemoteFile:
     def __init__(self) -> None:
         pass
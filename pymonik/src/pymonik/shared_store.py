@@ -0,0 +1,126 @@
+import mmap
+import os
+import pickle
+import struct
+import threading
+
+import cloudpickle
+
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, List, Optional, Tuple
+
+from .worker_cache import WorkerObjectCache
+
+# File layout: magic, header length, buffer count, (offset, length) per buffer, pickle stream, then the
+# out-of-band buffers, each aligned so that the arrays attached on top of them are aligned as well.
+_MAGIC = b"PMKSHM1\0"
+_HEADER = struct.Struct("<8sQQ")
+_BUFFER_ENTRY = struct.Struct("<QQ")
+_ALIGNMENT = 64
+
+# Objects with less out-of-band data than this aren't worth sharing
+_DEFAULT_MIN_SHARED_BYTES = 1024 * 1024
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _dump_with_buffers(obj: Any) -> Tuple[bytes, List[memoryview]]:
+    buffers: List[pickle.PickleBuffer] = []
+    stream = cloudpickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    return stream, [buffer.raw() for buffer in buffers]
+
+
+def _write_shared_file(file_path: Path, stream: bytes, buffers: List[memoryview]) -> None:
+    table_size = _HEADER.size + _BUFFER_ENTRY.size * len(buffers)
+    offset = _aligned(table_size + len(stream))
+    entries = []
+    for buffer in buffers:
+        entries.append((offset, buffer.nbytes))
+        offset = _aligned(offset + buffer.nbytes)
+    with open(file_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(stream), len(buffers)))
+        for entry in entries:
+            f.write(_BUFFER_ENTRY.pack(*entry))
+        f.write(stream)
+        for (buffer_offset, _), buffer in zip(entries, buffers):
+            f.seek(buffer_offset)
+            f.write(buffer)
+
+
+def _attach_shared_file(f: BinaryIO) -> Any:
+    # The mapping stays alive as long as objects reference its buffers, closing (or unlinking) the file doesn't unmap it
+    mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    magic, stream_size, buffer_count = _HEADER.unpack_from(view, 0)
+    if magic != _MAGIC:
+        raise ValueError(f"{f.name} is not a shared object file")
+    buffers = []
+    for i in range(buffer_count):
+        buffer_offset, buffer_size = _BUFFER_ENTRY.unpack_from(view, _HEADER.size + i * _BUFFER_ENTRY.size)
+        buffers.append(view[buffer_offset : buffer_offset + buffer_size])
+    stream_offset = _HEADER.size + _BUFFER_ENTRY.size * buffer_count
+    return pickle.loads(view[stream_offset : stream_offset + stream_size], buffers=buffers)
+
+
+class SharedObjectStore:
+    """
+    Node-local store sharing large objects (e.g. NumPy arrays) between the task processes of a node.
+
+    The first task loading a dependency re-serializes it with pickle protocol 5, writing its out-of-band
+    buffers to a file of the worker object cache. Every task (including the first one) then maps that file
+    read-only: the buffers are backed by the page cache, so the node holds a single copy of the data no
+    matter how many tasks use it. Objects attached this way are read-only, writing to them raises.
+    Shared files count towards the worker cache budget and are evicted like any other object.
+    """
+
+    def __init__(self, object_cache: WorkerObjectCache, min_shared_bytes: int = _DEFAULT_MIN_SHARED_BYTES):
+        self._object_cache = object_cache
+        self.min_shared_bytes = min_shared_bytes
+
+    @staticmethod
+    def _key(result_id: str) -> str:
+        return f"{result_id}.shared"
+
+    def attach(self, result_id: str) -> Optional[Any]:
+        """Attach a shared object, None if it isn't in the store (e.g. evicted by another task)."""
+        # An eviction (by this or another process) only unlinks the file: the open file, then its mapping,
+        # keep the data readable until the attached object is released
+        f = self._object_cache.open(self._key(result_id))
+        if f is None:
+            return None
+        with f:
+            return _attach_shared_file(f)
+
+    def load(self, result_id: str, read_data: Callable[[], bytes]) -> Any:
+        """
+        Load the object of a result, sharing it with the other tasks of the node if it is large enough.
+
+        Args:
+            result_id: ID of the result, used as the key of the shared object.
+            read_data: Function returning the pickled object, only called if the object isn't already in the store.
+
+        Returns:
+            Any: The object, attached from the store when it has enough out-of-band data.
+        """
+        shared = self.attach(result_id)
+        if shared is not None:
+            return shared
+        obj = cloudpickle.loads(read_data())
+        stream, buffers = _dump_with_buffers(obj)
+        if sum(buffer.nbytes for buffer in buffers) < self.min_shared_bytes:
+            return obj
+        key = self._key(result_id)
+        tmp_path = self._object_cache.objects_dir / f".{key}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            _write_shared_file(tmp_path, stream, buffers)
+            # Drop the private copy and map the shared one before publishing it, the mapping stays valid
+            # if another task evicts the file right after
+            del obj, buffers
+            with open(tmp_path, "rb") as f:
+                shared = _attach_shared_file(f)
+            self._object_cache.adopt(key, tmp_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return shared
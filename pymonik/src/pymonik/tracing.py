@@ -0,0 +1,301 @@
+import atexit
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+# OpenTelemetry span kind and status codes, as used in the OTLP JSON encoding
+_SPAN_KIND_INTERNAL = 1
+_STATUS_CODE_ERROR = 2
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("pymonik_current_span", default=None)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # 64 bit integers are strings in OTLP JSON
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _parse_traceparent(traceparent: Optional[str]):
+    """Trace and span IDs of a W3C traceparent header ("00-<trace id>-<span id>-<flags>"), None if invalid."""
+    if not traceparent:
+        return None
+    parts = traceparent.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class Span:
+    """A timed operation of a trace. Spans are created by a Tracer and exported once ended."""
+
+    __slots__ = ("_tracer", "name", "trace_id", "span_id", "parent_span_id", "start_ns", "end_ns", "attributes", "error", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_span_id: Optional[str], attributes: Optional[Dict[str, Any]]):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.error: Optional[str] = None
+        self._token: Optional[contextvars.Token] = None
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header of the span, to propagate its context."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        """Mark the operation as failed."""
+        self.error = message
+
+    def end(self) -> None:
+        """End the span, it's exported with the next flush of its tracer."""
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self._tracer._finished(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_val is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc_val}"
+        _current_span.reset(self._token)
+        self.end()
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The span in the OTLP JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.error is not None:
+            span["status"] = {"code": _STATUS_CODE_ERROR, "message": self.error}
+        return span
+
+
+class _NoopSpan:
+    """Span returned by a disabled tracer, doing nothing."""
+
+    __slots__ = ()
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Records the spans of the operations of PymoniK and exports them as OpenTelemetry (OTLP) JSON.
+
+    Spans are buffered and appended to the export file on flush, one OTLP export request
+    ({"resourceSpans": [...]}) per line, the format of the OpenTelemetry collector's file exporter.
+    The buffer is flushed once it holds max_buffered_spans spans or flush_interval seconds after the
+    previous flush, and the client also flushes when a session is closed and at exit, workers after
+    every task.
+
+    A disabled tracer returns a shared no-op span, so instrumented code costs a single check.
+    """
+
+    def __init__(
+        self,
+        export_path: Optional[Union[str, Path]] = None,
+        service_name: str = "pymonik",
+        max_buffered_spans: int = 2048,
+        flush_interval: float = 5.0,
+    ):
+        self.service_name = service_name
+        self.export_path: Optional[Path] = None
+        self.max_buffered_spans = max_buffered_spans
+        self.flush_interval = flush_interval
+        self._spans: List[Span] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+        if export_path:
+            self.enable(export_path)
+
+    @property
+    def enabled(self) -> bool:
+        return self.export_path is not None
+
+    def enable(self, export_path: Union[str, Path]) -> None:
+        """Start recording spans, exported to export_path."""
+        self.export_path = Path(export_path)
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def disable(self) -> None:
+        """Stop recording spans, those not exported yet are dropped."""
+        self.export_path = None
+        self.clear()
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[str] = None,
+    ) -> Union[Span, _NoopSpan]:
+        """
+        Create a span, to use as a context manager: it becomes the parent of the spans created in the block.
+
+        Args:
+            name: Name of the operation.
+            attributes: Attributes of the span.
+            parent: W3C traceparent of the parent span (e.g. propagated from another process), defaults to
+                the current span. Without parent, the span starts a new trace.
+
+        Returns:
+            The span, or a no-op span if tracing is disabled.
+        """
+        if self.export_path is None:
+            return _NOOP_SPAN
+        parent_ids = _parse_traceparent(parent)
+        if parent_ids is None:
+            current = _current_span.get()
+            if current is not None:
+                parent_ids = current.trace_id, current.span_id
+        if parent_ids is None:
+            return Span(self, name, f"{random.getrandbits(128):032x}", None, attributes)
+        return Span(self, name, parent_ids[0], parent_ids[1], attributes)
+
+    def current_traceparent(self) -> Optional[str]:
+        """W3C traceparent of the current span, None if tracing is disabled or there is no current span."""
+        if self.export_path is None:
+            return None
+        current = _current_span.get()
+        return current.traceparent if current is not None else None
+
+    def _finished(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            flush = (
+                len(self._spans) >= self.max_buffered_spans
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if flush:
+            self.flush()
+
+    def clear(self) -> None:
+        """Drop the spans not exported yet."""
+        with self._lock:
+            self._spans = []
+
+    def to_otlp(self, spans: List[Span]) -> Dict[str, Any]:
+        """OTLP JSON export request of spans."""
+        from . import __version__
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": self.service_name, "process.pid": os.getpid()}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "pymonik", "version": __version__},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def flush(self) -> None:
+        """Append the ended spans to the export file."""
+        with self._lock:
+            spans, self._spans = self._spans, []
+            self._last_flush = time.monotonic()
+        if not spans or self.export_path is None:
+            return
+        line = json.dumps(self.to_otlp(spans), separators=(",", ":")) + "\n"
+        try:
+            self.export_path.parent.mkdir(parents=True, exist_ok=True)
+            # A single write per flush, so that the lines of concurrent processes don't interleave
+            with open(self.export_path, "a") as f:
+                f.write(line)
+        except OSError as e:
+            print(f"Could not export {len(spans)} spans to {self.export_path}: {e}")
+
+
+_default_tracer: Optional[Tracer] = None
+_default_tracer_lock = threading.Lock()
+
+
+def get_default_tracer() -> Tracer:
+    """The process-wide Tracer, enabled if $PYMONIK_TRACE_FILE is set (the path spans are exported to)."""
+    global _default_tracer
+    if _default_tracer is None:
+        with _default_tracer_lock:
+            if _default_tracer is None:
+                _default_tracer = Tracer(os.getenv("PYMONIK_TRACE_FILE") or None)
+    return _default_tracer
+
+
+def enable_tracing(export_path: Union[str, Path]) -> Tracer:
+    """
+    Record the spans of PymoniK's client operations (and of the tasks run by local sessions created
+    afterwards), exported as OpenTelemetry JSON lines to export_path.
+
+    Workers record the spans of their tasks when $PYMONIK_TRACE_FILE is set in their environment,
+    linked to the client span that submitted them if the client was traced.
+
+    Returns:
+        Tracer: The process-wide tracer.
+    """
+    tracer = get_default_tracer()
+    tracer.enable(export_path)
+    return tracer
+
+
+def disable_tracing() -> None:
+    """Stop recording spans."""
+    get_default_tracer().disable()
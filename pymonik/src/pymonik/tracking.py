@@ -0,0 +1,127 @@
+import threading
+import time
+import grpc
+
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, Iterable, List
+
+from armonik.common import ResultStatus
+
+from .polling import ResultPoller
+
+
+def _set_future_status(future: Future, result_id: str, status: ResultStatus) -> None:
+    """Resolve a future from the terminal status of its result, unless it's already resolved."""
+    try:
+        if status == ResultStatus.COMPLETED:
+            future.set_result(None)
+        else:
+            future.set_exception(RuntimeError(f"Result {result_id} has been aborted."))
+    except InvalidStateError:
+        # Resolved concurrently, by a wait or a download of the result
+        pass
+
+
+class StatusTracker:
+    """
+    Shared background tracker feeding the completion state of ResultHandle futures.
+
+    A single daemon thread polls the statuses of every tracked result through the session's
+    ResultPoller, resolving the matching futures as their results complete or get aborted.
+    The thread stops when nothing is left to track and is restarted on demand.
+    """
+
+    def __init__(self, poller: ResultPoller):
+        self._poller = poller
+        self._tracked: Dict[str, List[Future]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def track(self, result_id: str, future: Future) -> None:
+        """Start tracking a result, the future is resolved once the result is available."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Status tracker has been closed.")
+            self._tracked.setdefault(result_id, []).append(future)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="pymonik-status-tracker", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def watch(self, result_ids: List[str]) -> None:
+        """Poll the statuses of results without futures, the statuses found are kept by the poller."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Status tracker has been closed.")
+            for result_id in result_ids:
+                self._tracked.setdefault(result_id, [])
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="pymonik-status-tracker", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def _known_finished(self, result_ids: Iterable[str]) -> Dict[str, ResultStatus]:
+        """Results known by the poller to be completed or aborted, with their status."""
+        finished = {}
+        for r_id in result_ids:
+            known_status = self._poller.status(r_id)
+            if known_status in (ResultStatus.COMPLETED, ResultStatus.ABORTED):
+                finished[r_id] = known_status
+        return finished
+
+    def _resolve(self, result_id: str, status: ResultStatus) -> None:
+        with self._lock:
+            futures = self._tracked.pop(result_id, [])
+        for future in futures:
+            _set_future_status(future, result_id, status)
+
+    def _run(self) -> None:
+        interval = self._poller.polling_interval
+        while True:
+            with self._lock:
+                if self._closed or not self._tracked:
+                    self._thread = None
+                    return
+                pending = list(self._tracked)
+            # Cleared before polling, so that a result tracked during the round wakes up the next one
+            self._wakeup.clear()
+            start = time.perf_counter()
+            # Results already seen finished by a previous wait or poll won't show up as changes
+            changes = self._known_finished(pending)
+            try:
+                changes.update(self._poller.poll(r_id for r_id in pending if r_id not in changes))
+                # Nor those recorded by a concurrent waiter during the round
+                changes.update(self._known_finished(r_id for r_id in pending if r_id not in changes))
+            except grpc.RpcError:
+                self._poller.metrics.record_rpc_error()
+            except Exception as e:
+                for r_id in pending:
+                    with self._lock:
+                        futures = self._tracked.pop(r_id, [])
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(
+                                RuntimeError(f"An unexpected error occurred while tracking result {r_id}: {e}")
+                            )
+                continue
+            finished = {
+                r_id: status for r_id, status in changes.items()
+                if status in (ResultStatus.COMPLETED, ResultStatus.ABORTED)
+            }
+            for r_id, status in finished.items():
+                self._resolve(r_id, status)
+            interval = self._poller.next_interval(interval, bool(finished))
+            self._poller.metrics.record_poll(time.perf_counter() - start, len(finished), interval)
+            self._wakeup.wait(self._poller.jittered(interval))
+
+    def close(self) -> None:
+        """Stop the background thread, pending futures are left unresolved."""
+        with self._lock:
+            self._closed = True
+        self._wakeup.set()
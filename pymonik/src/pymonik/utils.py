@@ -1,10 +1,17 @@
-import time
+import hashlib
+import io
+import pickle as pickle_std
+import queue
+import struct
+import threading
 import grpc
 import cloudpickle as pickle
 
-from typing import List, Optional, Set, Union
-from armonik.common import create_channel, Result, ResultStatus
+from typing import Any, Callable, Iterable, Iterator, Optional
 from armonik.client import ArmoniKResults
+from armonik.common import create_channel
+from armonik.protogen.common.results_common_pb2 import UploadResultDataRequest
+from armonik.protogen.client.results_service_pb2_grpc import ResultsStub
 
 def create_grpc_channel(
     endpoint: str,
@@ -50,56 +57,247 @@ class LazyArgs:
         return self._args
 
     def __repr__(self):
-        return f"<LazyArgs - Not Loaded>" if self._args is None else repr(self._args)
+        # Used in the worker logs, the (possibly large) arguments themselves aren't formatted
+        return f"<LazyArgs - Not Loaded>" if self._args is None else f"<LazyArgs - {len(self._args)} args loaded>"
 
 
-def _poll_batch_for_results(
+class PickledObject:
+    """
+    An object pickled ahead of time. Pickling it again embeds its pickled bytes as they are, and
+    unpickling gives back the original object (not a PickledObject).
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __reduce__(self):
+        return pickle.loads, (self.data,)
+
+
+def _rechunk(chunks: Iterable[bytes], chunk_size: int) -> Iterator[bytes]:
+    """Regroup a stream of byte chunks of any size into chunks of exactly chunk_size bytes (except the last one)."""
+    buffer = bytearray()
+    for chunk in chunks:
+        view = memoryview(chunk).cast("B")
+        while len(view) > 0:
+            if not buffer and len(view) >= chunk_size:
+                # Avoid copying through the buffer when a chunk is large enough
+                yield bytes(view[:chunk_size])
+                view = view[chunk_size:]
+                continue
+            taken = min(chunk_size - len(buffer), len(view))
+            buffer += view[:taken]
+            view = view[taken:]
+            if len(buffer) == chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _results_stub(results_client: ArmoniKResults) -> ResultsStub:
+    """
+    The gRPC stub of an ArmoniKResults client, to call the Results service directly.
+
+    ArmoniKResults (armonik 3.25 to 3.29 at least) only uploads data held in memory at once, and keeps
+    its stub in the private _client attribute: this is the only place relying on it.
+    """
+    return results_client._client
+
+
+def upload_result_stream(
     results_client: ArmoniKResults,
-    result_ids_in_batch: List[str],
-    polling_interval_seconds: float,
+    session_id: str,
+    result_id: str,
+    chunks: Iterable[bytes],
+    chunk_size: int,
+    progress: Optional[Callable[[int], None]] = None,
 ) -> None:
     """
-    Polls for the completion or abortion of a batch of results.
+    Upload the data of an existing result from a stream of byte chunks.
+
+    Unlike ArmoniKResults.upload_result_data the data is never held in memory at once: chunks are
+    regrouped to the service's maximum chunk size and sent as they are produced.
+    If given, progress is called with the total number of bytes sent after each chunk.
     """
-    if not result_ids_in_batch:
-        return
+    def _requests():
+        yield UploadResultDataRequest(
+            id=UploadResultDataRequest.ResultIdentifier(session_id=session_id, result_id=result_id)
+        )
+        sent = 0
+        for data_chunk in _rechunk(chunks, chunk_size):
+            yield UploadResultDataRequest(data_chunk=data_chunk)
+            sent += len(data_chunk)
+            if progress is not None:
+                progress(sent)
+
+    _results_stub(results_client).UploadResultData(_requests())
+
+
+class _ChunkQueueWriter:
+    """File-like object handing the data written to it to a consumer thread, in chunks, through a bounded queue."""
+
+    def __init__(self, chunk_queue: queue.Queue, chunk_size: int, cancelled: threading.Event):
+        self._queue = chunk_queue
+        self._chunk_size = chunk_size
+        self._cancelled = cancelled
+        self._buffer = bytearray()
+
+    def _put(self, item) -> None:
+        # Blocks while the consumer is behind, gives up if it stopped consuming
+        while True:
+            if self._cancelled.is_set():
+                raise RuntimeError("Stream consumer stopped.")
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
 
-    not_found: Set[str] = set(result_ids_in_batch)
+    def write(self, data) -> int:
+        # The pickler may hand over large buffers (e.g. array data) at once, they're sliced without a full copy
+        view = memoryview(data).cast("B")
+        written = len(view)
+        if self._buffer:
+            taken = min(self._chunk_size - len(self._buffer), len(view))
+            self._buffer += view[:taken]
+            view = view[taken:]
+            if len(self._buffer) < self._chunk_size:
+                return written
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        while len(view) >= self._chunk_size:
+            self._put(bytes(view[: self._chunk_size]))
+            view = view[self._chunk_size :]
+        self._buffer += view
+        return written
 
-    while not_found:
-        current_filter = None
-        for r_id in not_found:
-            filter_condition = (Result.result_id == r_id)
-            if current_filter is None:
-                current_filter = filter_condition
-            else:
-                current_filter = current_filter | filter_condition
+    def flush(self) -> None:
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
 
-        if current_filter is None: # Should not happen if not_found is populated
-            break
 
+_END_OF_STREAM = object()
+
+
+def stream_pickle(obj: Any, chunk_size: int, max_pending_chunks: int = 4) -> Iterator[bytes]:
+    """
+    Pickle an object as a stream of chunks of chunk_size bytes (except the last one).
+
+    The pickler runs on a separate thread and at most max_pending_chunks chunks are buffered, so the
+    memory used doesn't depend on the size of the pickled object.
+    """
+    chunk_queue: queue.Queue = queue.Queue(maxsize=max_pending_chunks)
+    cancelled = threading.Event()
+    writer = _ChunkQueueWriter(chunk_queue, chunk_size, cancelled)
+    errors = []
+
+    def _pickle():
         try:
-            _total, fetched_results = results_client.list_results(
-                result_filter=current_filter,
-                page=0,
-                page_size=len(not_found),
-            )
-            for res_summary in fetched_results: 
-                if res_summary.result_id in not_found:
-                    if res_summary.status == ResultStatus.COMPLETED:
-                        not_found.remove(res_summary.result_id)
-                    elif res_summary.status == ResultStatus.ABORTED:
-                        raise RuntimeError(f"Result {res_summary.result_id} has been aborted.")
-
-            if not not_found: # All results in this batch are completed
+            pickle.dump(obj, writer, protocol=5)
+            writer.flush()
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            try:
+                writer._put(_END_OF_STREAM)
+            except RuntimeError:
+                pass
+
+    thread = threading.Thread(target=_pickle, name="pymonik-pickler", daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunk_queue.get()
+            if chunk is _END_OF_STREAM:
                 break
+            yield chunk
+        if errors:
+            raise errors[0]
+    finally:
+        cancelled.set()
+        thread.join()
+
+
+class _HashWriter:
+    """File-like object hashing the data written to it."""
+
+    def __init__(self):
+        self.hash = hashlib.sha256()
+
+    def write(self, data) -> int:
+        view = memoryview(data).cast("B")
+        self.hash.update(view)
+        return len(view)
+
+
+def hash_pickle(obj: Any) -> str:
+    """SHA-256 of the pickled object, computed without holding the pickled bytes in memory."""
+    writer = _HashWriter()
+    pickle.dump(obj, writer, protocol=5)
+    return writer.hash.hexdigest()
+
+
+class _CanonicalPickler(pickle.Pickler):
+    """
+    Pickler whose output doesn't depend on the hash seed of the process ($PYTHONHASHSEED), to hash objects:
+    sets and frozensets (including the set constants of pickled functions) are written as the sorted
+    pickles of their items. The output is only meant to be hashed, it can't be unpickled.
+    """
+
+    def persistent_id(self, obj):
+        # Called for every object, unlike reducer_override which the pickler skips for sets
+        if type(obj) in (set, frozenset):
+            return type(obj).__name__, sorted(_canonical_dumps(item) for item in obj)
+        return None
+
+
+def _canonical_dumps(obj: Any) -> bytes:
+    buffer = io.BytesIO()
+    _CanonicalPickler(buffer, protocol=5).dump(obj)
+    return buffer.getvalue()
+
+
+def hash_canonical(obj: Any) -> str:
+    """
+    SHA-256 of the object pickled canonically, the same in every process for equal objects of the
+    built-in types (unlike hash_pickle, which depends on the hash seed for sets and frozensets).
+    """
+    writer = _HashWriter()
+    _CanonicalPickler(writer, protocol=5).dump(obj)
+    return writer.hash.hexdigest()
+
+
+class _BufferViewUnpickler(pickle_std._Unpickler):
+    """
+    Unpickler returning views on the pickled data for the large buffers written outside of frames
+    (e.g. the data of in-band pickled NumPy arrays), instead of copying them into new bytearrays.
+
+    Objects built on these buffers are read-only and keep the pickled data alive.
+    """
+
+    dispatch = dict(pickle_std._Unpickler.dispatch)
+
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        self._data_file = io.BytesIO(self._data)
+        super().__init__(self._data_file)
+
+    def _load_bytearray8(self) -> None:
+        (size,) = struct.unpack("<Q", self.read(8))
+        if self._unframer.current_frame is not None:
+            self.append(bytearray(self.read(size)))
+            return
+        start = self._data_file.tell()
+        self._data_file.seek(start + size)
+        self.append(self._data[start : start + size])
+
+    dispatch[pickle_std.BYTEARRAY8[0]] = _load_bytearray8
 
-        except grpc.RpcError:
-            # Basic retry on RpcError.
-            pass
-        except RuntimeError: # Re-raise "Result ... has been aborted."
-            raise
-        except Exception as e:
-            raise RuntimeError(f"An unexpected error occurred while polling for results batch: {e}")
 
-        time.sleep(polling_interval_seconds)
\ No newline at end of file
+def loads_buffer_views(data: bytes) -> Any:
+    """Unpickle data, objects holding large buffers (e.g. NumPy arrays) are views on data rather than copies."""
+    return _BufferViewUnpickler(data).load()
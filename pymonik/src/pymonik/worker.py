@@ -1,10 +1,20 @@
+import dataclasses
+import time
 import cloudpickle as pickle
 
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Optional
+
 from .materialize import Materialize
 from .core import Pymonik
 from .context import PymonikContext
 from .environment import RuntimeEnvironment
-from .results import ResultHandle, MultiResultHandle
+from .results import ResultHandle, MultiResultHandle, Shards, _ShardedOutput
+from .shared_store import SharedObjectStore
+from .worker_cache import get_worker_cache
+from .chunking import resolve_chunked
+from .tracing import get_default_tracer
 
 from armonik.common import Output
 from armonik.worker import TaskHandler, armonik_worker, ClefLogger
@@ -19,15 +29,27 @@ def _process_materialize_args(func_name, retrieved_args, task_handler, logger):
         
         # Log each argument type
         for i, arg in enumerate(retrieved_args):
-            logger.debug(f"Arg {i}: type={type(arg)}, value={repr(arg) if not isinstance(arg, Materialize) else f'Materialize(source={arg.source_path}, worker={arg.worker_path}, hash={arg.content_hash}, result_id={arg.result_id})'}")
+            # Only Materialize objects are described, formatting the other (possibly large) values is too costly
+            if isinstance(arg, Materialize):
+                logger.debug(f"Arg {i}: type={type(arg)}, value=Materialize(source={arg.source_path}, worker={arg.worker_path}, hash={arg.content_hash}, result_id={arg.result_id})")
+            else:
+                logger.debug(f"Arg {i}: type={type(arg)}")
         
         # Create context for materialization
         ctx = PymonikContext(task_handler, logger)
         logger.debug(f"Created PymonikContext, is_local={ctx.is_local}")
         
+        # Local sessions materialize into a directory of their own rather than the client's real paths
+        materialize_root = getattr(task_handler, "materialize_root", None)
+
         materialize_count = 0
         for i, arg in enumerate(retrieved_args):
             if isinstance(arg, Materialize):
+                if materialize_root is not None:
+                    worker_path = Path(arg.worker_path)
+                    arg = retrieved_args[i] = dataclasses.replace(
+                        arg, worker_path=str(Path(materialize_root) / worker_path.relative_to(worker_path.anchor))
+                    )
                 logger.debug(f"Found Materialize argument at position {i}: {arg.source_path} -> {arg.worker_path}")
                 logger.debug(f"Materialize result_id: {arg.result_id}")
                 logger.debug(f"Materialize content_hash: {arg.content_hash}")
@@ -55,38 +77,186 @@ def _process_materialize_args(func_name, retrieved_args, task_handler, logger):
         logger.error(f"Traceback: {traceback.format_exc()}")
         # Don't fail the task, just log the error
 
-def run_pymonik_worker():
-    """Run the worker."""
+def _read_dependency(result_id: str, task_handler: TaskHandler, ctx: PymonikContext) -> bytes:
+    """Read a data dependency, reassembling it from its chunks (cached on the node) if it was uploaded chunked."""
+    def _fetch_chunk(chunk_id: str) -> bytes:
+        chunk = ctx.retrieve_object(chunk_id, auto_unpickle=False)
+        if chunk is None:
+            raise RuntimeError(f"Failed to retrieve chunk {chunk_id} of {result_id}")
+        return chunk
 
-    @armonik_worker()
-    def processor(task_handler: TaskHandler) -> Output:
+    return resolve_chunked(task_handler.data_dependencies[result_id], _fetch_chunk)
+
+def _read_shard(result_id: str, ctx: PymonikContext) -> bytes:
+    """Read a piece of a sharded output, these aren't data dependencies of the task and are fetched on demand."""
+    data = ctx.retrieve_object(result_id, auto_unpickle=False)
+    if data is None:
+        raise RuntimeError(f"Failed to retrieve shard {result_id}")
+    return data
+
+def _unpickle_result(result_id: str, read_data, shared_store=None):
+    if shared_store is not None:
+        return shared_store.load(result_id, read_data)
+    return pickle.loads(read_data())
+
+def _load_dependency(result_id: str, task_handler: TaskHandler, ctx: PymonikContext, shared_store=None):
+    """
+    Unpickle a data dependency, attaching it from the node's shared object store if one is given.
+
+    The output of a task that returned a Shards is resolved to its pieces: a list, or a dict for keyed shards.
+    """
+    value = _unpickle_result(result_id, lambda: _read_dependency(result_id, task_handler, ctx), shared_store)
+    if isinstance(value, _ShardedOutput):
+        pieces = [
+            _unpickle_result(shard_id, lambda shard_id=shard_id: _read_shard(shard_id, ctx), shared_store)
+            for shard_id in value.result_ids
+        ]
+        return dict(zip(value.keys, pieces)) if value.keys is not None else pieces
+    return value
+
+def _split_shards(result, num_returns: int, task_handler: TaskHandler) -> dict:
+    """
+    Build the results to send for a task's return value.
+
+    With num_returns > 1 the pieces of the returned Shards (or list/tuple) are sent to the task's expected
+    outputs in order. A Shards returned by a single output task gets one newly created result per piece,
+    the expected output then holds a reference to these results.
+    """
+    expected_results = task_handler.expected_results
+    if num_returns > 1:
+        if isinstance(result, Shards):
+            pieces = result.pieces
+        elif isinstance(result, (list, tuple)):
+            pieces = list(result)
+        else:
+            raise TypeError(
+                f"Task declared with num_returns={num_returns} must return a Shards, list or tuple, got {type(result).__name__}"
+            )
+        if len(pieces) != num_returns:
+            raise ValueError(f"Task declared with num_returns={num_returns} returned {len(pieces)} pieces")
+        return {
+            result_id: pickle.dumps(piece)
+            for result_id, piece in zip(expected_results, pieces)
+        }
+    if isinstance(result, Shards):
+        shard_payloads = {
+            f"{task_handler.session_id}__shard__{expected_results[0]}__{i}": pickle.dumps(piece)
+            for i, piece in enumerate(result.pieces)
+        }
+        created_shards = task_handler.create_results(shard_payloads) if shard_payloads else {}
+        shard_ids = [created_shards[name].result_id for name in shard_payloads]
+        return {expected_results[0]: pickle.dumps(_ShardedOutput(shard_ids, result.keys))}
+    return {expected_results[0]: pickle.dumps(result)}
+
+@contextmanager
+def _phase(name: str, phase_times: Optional[Dict[str, float]], trace: bool = True):
+    """
+    Add the time spent in the block to phase_times[name], if phase times are collected, and record it
+    as a span if tracing is enabled and trace is True.
+    """
+    with get_default_tracer().span(f"pymonik.worker.{name}") if trace else nullcontext():
+        if phase_times is None:
+            yield
+            return
+        start = time.perf_counter()
         try:
-            logger = ClefLogger.getLogger("ArmoniKWorker")
-            logger.info("Starting PymoniK worker... Loading the payload")
+            yield
+        finally:
+            phase_times[name] = phase_times.get(name, 0.0) + time.perf_counter() - start
+
+def _task_error(task_handler: TaskHandler, logger, e: Exception) -> Output:
+    import traceback
+
+    logger.error(
+        f"Error processing task {task_handler.task_id} : {e}\n{traceback.format_exc()}"
+    )
+    return Output(f"Error processing task: {e}\n{traceback.format_exc()}")
+
+def _process_task(
+    task_handler: TaskHandler,
+    logger,
+    construct_environment: bool = True,
+    phase_times: Optional[Dict[str, float]] = None,
+) -> Output:
+    """
+    Run a PymoniK task: load its function and arguments, call it and send its results.
+
+    Args:
+        task_handler: Handler of the task, an ArmoniK TaskHandler or the local one of a LocalBackend.
+        logger: Logger used for the task.
+        construct_environment: Whether to install the environment requested by the task.
+        phase_times: If given, filled with the time in seconds spent in each phase of the task
+            (payload, environment, dependencies, function, materialize, execute, send).
+    """
+    try:
+        logger.info("Starting PymoniK worker... Loading the payload")
+        # Not traced: the span of the task is created from the trace context of the payload
+        with _phase("payload", phase_times, trace=False):
             # Deserialize the payload
             payload = pickle.loads(task_handler.payload)
+    except Exception as e:
+        return _task_error(task_handler, logger, e)
+
+    tracer = get_default_tracer()
+    # The spans of the task are children of the client (or parent task) span that submitted it
+    with tracer.span(
+        "pymonik.worker.task",
+        attributes={"pymonik.task_id": task_handler.task_id, "pymonik.function": payload.get("func_name", "")},
+        parent=payload.get("trace_context"),
+    ) as span:
+        output = _run_task(payload, task_handler, logger, construct_environment, phase_times)
+        if not output.success:
+            span.set_error(output.error)
+    tracer.flush()
+    return output
+
+def _run_task(
+    payload: dict,
+    task_handler: TaskHandler,
+    logger,
+    construct_environment: bool,
+    phase_times: Optional[Dict[str, float]],
+) -> Output:
+    try:
+        with _phase("payload", phase_times):
             func_name = payload["func_name"]
             func_id = payload["func_id"]
             require_context = payload["require_context"]
+            num_returns = payload.get("num_returns", 1)
+            shared_memory = payload.get("shared_memory", False)
             args = payload["args"]
             requested_environment = payload["environment"]
-            logger.info(
-                f"Processing task {task_handler.task_id} : {func_name} -> {func_id} with arguments {args} in session {task_handler.session_id} "
-            )
-            # # Look up the function
-            # if func_name not in self._registered_tasks:
-            #     return Output(f"Function {func_name} not found")
+        logger.info(
+            f"Processing task {task_handler.task_id} : {func_name} -> {func_id} with arguments {args} in session {task_handler.session_id} "
+        )
+        # # Look up the function
+        # if func_name not in self._registered_tasks:
+        #     return Output(f"Function {func_name} not found")
 
-            env = RuntimeEnvironment(logger)
-            env.construct_environment(requested_environment)
+        if construct_environment:
+            with _phase("environment", phase_times):
+                env = RuntimeEnvironment(logger)
+                env.construct_environment(requested_environment)
 
+        with _phase("payload", phase_times):
             retrieved_args = args.get_args()
-            logger.info(
-                f"Retrieved args for task {task_handler.task_id} : {func_name} -> {func_id} :  {args} in session {task_handler.session_id} "
-            )
-            logger.debug(f"Retrieved args count: {len(retrieved_args)}")
-            
+        logger.info(
+            f"Retrieved args for task {task_handler.task_id} : {func_name} -> {func_id} :  {args} in session {task_handler.session_id} "
+        )
+        logger.debug(f"Retrieved args count: {len(retrieved_args)}")
+        
+        with _phase("dependencies", phase_times):
+            # Large dependencies are shared between the tasks of the node if the task allows it
+            shared_store = None
+            if shared_memory:
+                object_cache = get_worker_cache(logger)
+                if object_cache is not None:
+                    shared_store = SharedObjectStore(object_cache)
+                else:
+                    logger.warning("Worker object cache unavailable, dependencies won't be shared")
+
             # Process arguments, retrieving results if needed
+            dependency_ctx = PymonikContext(task_handler, logger)
             processed_args = []
             for arg in retrieved_args:
                 if isinstance(arg, str) and arg == "__no_input__":
@@ -95,31 +265,33 @@ def run_pymonik_worker():
                 elif isinstance(arg, str) and arg.startswith("__result_handle__"):
                     # Retrieve the result data
                     result_id = arg[len("__result_handle__") :]
-                    result_data = task_handler.data_dependencies[result_id]
-                    processed_args.append(pickle.loads(result_data))
+                    processed_args.append(_load_dependency(result_id, task_handler, dependency_ctx, shared_store))
                 elif isinstance(arg, str) and arg.startswith("__multi_result_handle__"):
                     # Retrieve multiple result data
                     result_ids = arg[len("__multi_result_handle__") :].split(",")
                     processed_args.append(
                         [
-                            pickle.loads(task_handler.data_dependencies[result_id])
+                            _load_dependency(result_id, task_handler, dependency_ctx, shared_store)
                             for result_id in result_ids
                         ]
                     )
                 else:
                     processed_args.append(arg)
 
+        with _phase("function", phase_times):
             # Load the function
             func = pickle.loads(task_handler.data_dependencies[func_id])
-            logger.info(
-                f"Processing task {task_handler.task_id} : Retrieved function {func_name} from data dependencies"
-            )
+        logger.info(
+            f"Processing task {task_handler.task_id} : Retrieved function {func_name} from data dependencies"
+        )
 
-            # Process materialization BEFORE creating context for the function
-            logger.info(f"About to process materialize args")
+        # Process materialization BEFORE creating context for the function
+        logger.info(f"About to process materialize args")
+        with _phase("materialize", phase_times):
             _process_materialize_args(func_name, processed_args, task_handler, logger)
-            logger.info(f"Finished processing materialize args")
+        logger.info(f"Finished processing materialize args")
 
+        with _phase("execute", phase_times):
             # Call the function with the arguments
             if require_context:
                 # If the function requires context, pass the task handler
@@ -132,37 +304,37 @@ def run_pymonik_worker():
                 processed_args = processed_args
                 
             pymonik_worker_client = Pymonik(is_worker=True)
-            # TODO: support returning multiple results (I don't have a feel for how this can be done in practice and it's something to look into)
             pymonik_worker_client.create(
                 task_handler=task_handler,
-                expected_output=task_handler.expected_results[0],
+                expected_output=list(task_handler.expected_results),
             )
             with pymonik_worker_client:
                 result = func(*processed_args)
 
-            if isinstance(result, ResultHandle) or isinstance(
-                result, MultiResultHandle
-            ):
-                # If the result is a ResultHandle or MultiResultHandle, then there is a delegation going on and we should not send the result
-                return Output()
-            # Serialize the result
-            result_data = pickle.dumps(result)
+        if isinstance(result, ResultHandle) or isinstance(
+            result, MultiResultHandle
+        ):
+            # If the result is a ResultHandle or MultiResultHandle, then there is a delegation going on and we should not send the result
+            return Output()
+        with _phase("send", phase_times):
+            # Serialize the result, one payload per expected output
+            results_data = _split_shards(result, num_returns, task_handler)
 
-            # Get the expected result ID
-            result_id = task_handler.expected_results[0]
+            # Send the results
+            task_handler.send_results(results_data)
 
-            # Send the result
-            task_handler.send_results({result_id: result_data})
+        return Output()
 
-            return Output()
+    except Exception as e:
+        return _task_error(task_handler, logger, e)
 
-        except Exception as e:
-            import traceback
+def run_pymonik_worker():
+    """Run the worker."""
+    get_default_tracer().service_name = "pymonik-worker"
 
-            logger.error(
-                f"Error processing task {task_handler.task_id} : {e}\n{traceback.format_exc()}"
-            )
-            return Output(f"Error processing task: {e}\n{traceback.format_exc()}")
+    @armonik_worker()
+    def processor(task_handler: TaskHandler) -> Output:
+        return _process_task(task_handler, ClefLogger.getLogger("ArmoniKWorker"))
 
     # Run the worker
     processor.run()
\ No newline at end of file
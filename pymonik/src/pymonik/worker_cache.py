@@ -0,0 +1,216 @@
+import os
+import sqlite3
+import threading
+import time
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+
+# Shared objects are stored next to the per-token directories the agent fetches data into
+_DEFAULT_CACHE_ROOT = "/cache/shared"
+_DEFAULT_MAX_BYTES = 10 * 1024 * 1024 * 1024
+
+_EVICTION_ORDER = {
+    "lru": "last_access ASC",
+    "lfu": "hits ASC, last_access ASC",
+}
+
+
+@dataclass
+class CacheMetrics:
+    """Counters collected by a WorkerObjectCache, for the current process."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+    stored_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class WorkerObjectCache:
+    """
+    Size-capped store for the objects retrieved by workers, shared by all the tasks of a node.
+
+    Objects are keyed by result ID rather than by task token: a completed result never changes,
+    so any later task (of any session) can reuse the local copy instead of fetching it again.
+    Entries are tracked in an SQLite index stored alongside them, so the budget is shared between
+    the worker processes using the same cache directory and survives restarts. When the budget is
+    exceeded, the least recently used (or least frequently used) objects are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_root: Union[str, Path] = _DEFAULT_CACHE_ROOT,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        policy: str = "lru",
+    ):
+        if policy not in _EVICTION_ORDER:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {list(_EVICTION_ORDER)}")
+        self.objects_dir = Path(cache_root) / "pymonik-objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.metrics = CacheMetrics()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.objects_dir / "index.sqlite"), timeout=30, check_same_thread=False
+        )
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                "result_id TEXT PRIMARY KEY, size INTEGER, last_access REAL, hits INTEGER)"
+            )
+
+    def _object_path(self, result_id: str) -> Path:
+        return self.objects_dir / result_id
+
+    def contains(self, result_id: str) -> bool:
+        """Whether an object is in the cache, without counting it as an access."""
+        return self._object_path(result_id).exists()
+
+    def _record_access(self, result_id: str, size: int) -> None:
+        # Called with the lock held, inside a transaction
+        updated = self._connection.execute(
+            "UPDATE objects SET last_access = ?, hits = hits + 1 WHERE result_id = ?",
+            (time.time(), result_id),
+        ).rowcount
+        if not updated:
+            # Stored by a process that died before indexing it
+            self._connection.execute(
+                "INSERT OR REPLACE INTO objects (result_id, size, last_access, hits) VALUES (?, ?, ?, 1)",
+                (result_id, size, time.time()),
+            )
+        self.metrics.hits += 1
+
+    def _record_miss(self, result_id: str) -> None:
+        # Entries whose file disappeared (e.g. evicted by another process) are dropped from the index
+        self._connection.execute("DELETE FROM objects WHERE result_id = ?", (result_id,))
+        self.metrics.misses += 1
+
+    def get(self, result_id: str) -> Optional[Path]:
+        """
+        Path of a cached object, None if it isn't in the cache.
+
+        Another process may evict the object before the path is opened: readers should use open(), or
+        treat a FileNotFoundError as a miss.
+        """
+        object_path = self._object_path(result_id)
+        with self._lock, self._connection:
+            try:
+                size = object_path.stat().st_size
+            except FileNotFoundError:
+                self._record_miss(result_id)
+                return None
+            self._record_access(result_id, size)
+        return object_path
+
+    def open(self, result_id: str) -> Optional[BinaryIO]:
+        """
+        Open a cached object for reading, None if it isn't in the cache.
+
+        The returned file stays readable if the object is evicted afterwards, evictions only unlink it.
+        """
+        object_path = self._object_path(result_id)
+        with self._lock, self._connection:
+            try:
+                f = open(object_path, "rb")
+            except FileNotFoundError:
+                self._record_miss(result_id)
+                return None
+            self._record_access(result_id, os.fstat(f.fileno()).st_size)
+        return f
+
+    def adopt(self, result_id: str, file_path: Union[str, Path]) -> Path:
+        """
+        Move a retrieved object file into the cache, evicting other objects if the budget is exceeded.
+
+        Returns:
+            Path: The path of the object in the cache.
+        """
+        object_path = self._object_path(result_id)
+        size = os.path.getsize(file_path)
+        try:
+            os.replace(file_path, object_path)
+        except OSError:
+            # Not on the same filesystem, go through a temporary file so readers never see a partial object
+            tmp_path = object_path.with_name(f".{result_id}.tmp-{os.getpid()}-{threading.get_ident()}")
+            with open(file_path, "rb") as src, open(tmp_path, "wb") as dst:
+                while chunk := src.read(1024 * 1024):
+                    dst.write(chunk)
+            os.replace(tmp_path, object_path)
+            os.unlink(file_path)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO objects (result_id, size, last_access, hits) VALUES (?, ?, ?, 0)",
+                (result_id, size, time.time()),
+            )
+            self._evict(keep=result_id)
+        return object_path
+
+    def _evict(self, keep: str) -> None:
+        # Called with the lock held, inside a transaction
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total > self.max_bytes:
+            candidates = self._connection.execute(
+                f"SELECT result_id, size FROM objects WHERE result_id != ? ORDER BY {_EVICTION_ORDER[self.policy]}",
+                (keep,),
+            ).fetchall()
+            evicted: List[str] = []
+            for result_id, size in candidates:
+                if total <= self.max_bytes:
+                    break
+                # Readers that already opened the object keep a valid handle after the unlink
+                self._object_path(result_id).unlink(missing_ok=True)
+                evicted.append(result_id)
+                total -= size
+                self.metrics.evictions += 1
+                self.metrics.evicted_bytes += size
+            self._connection.executemany(
+                "DELETE FROM objects WHERE result_id = ?", [(result_id,) for result_id in evicted]
+            )
+        self.metrics.stored_bytes = total
+
+    def clear(self) -> None:
+        """Remove every object from the cache."""
+        with self._lock, self._connection:
+            for (result_id,) in self._connection.execute("SELECT result_id FROM objects").fetchall():
+                self._object_path(result_id).unlink(missing_ok=True)
+            self._connection.execute("DELETE FROM objects")
+            self.metrics.stored_bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_default_cache: Optional[WorkerObjectCache] = None
+_default_cache_failed = False
+_default_cache_lock = threading.Lock()
+
+
+def get_worker_cache(logger=None) -> Optional[WorkerObjectCache]:
+    """
+    The process-wide WorkerObjectCache, None if the cache can't be opened (e.g. read-only /cache).
+
+    Its budget and policy are read from PYMONIK_WORKER_CACHE_MAX_BYTES and PYMONIK_WORKER_CACHE_POLICY
+    (e.g. set through the env_variables of the task environment) when it is first used.
+    """
+    global _default_cache, _default_cache_failed
+    with _default_cache_lock:
+        if _default_cache is None and not _default_cache_failed:
+            try:
+                _default_cache = WorkerObjectCache(
+                    cache_root=os.getenv("PYMONIK_WORKER_CACHE_DIR", _DEFAULT_CACHE_ROOT),
+                    max_bytes=int(os.getenv("PYMONIK_WORKER_CACHE_MAX_BYTES", _DEFAULT_MAX_BYTES)),
+                    policy=os.getenv("PYMONIK_WORKER_CACHE_POLICY", "lru").lower(),
+                )
+            except (OSError, ValueError, sqlite3.Error) as e:
+                if logger is not None:
+                    logger.warning(f"Could not open the worker object cache, objects won't be shared: {e}")
+                _default_cache_failed = True
+        return _default_cache
@@ -0,0 +1,47 @@
+import pytest
+
+from pymonik import Pymonik
+from pymonik.fake_cluster import FakeControlPlane
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _cache_dirs(tmp_path_factory):
+    # Keep the hash index, the result cache and the worker cache out of the home directory
+    mp = pytest.MonkeyPatch()
+    mp.setenv("PYMONIK_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+    mp.setenv("PYMONIK_WORKER_CACHE_DIR", str(tmp_path_factory.mktemp("worker_cache")))
+    yield
+    mp.undo()
+
+
+@pytest.fixture
+def control_plane():
+    with FakeControlPlane() as control_plane:
+        yield control_plane
+
+
+@pytest.fixture
+def client(control_plane):
+    """Pymonik client connected to a FakeControlPlane (tasks aren't executed, their outputs complete)."""
+    with Pymonik(endpoint=control_plane.endpoint) as pymonik:
+        yield pymonik
+
+
+@pytest.fixture
+def polling_client(control_plane):
+    with Pymonik(
+        endpoint=control_plane.endpoint, disable_events_client=True, polling_interval=0.01, max_polling_interval=0.05
+    ) as pymonik:
+        yield pymonik
+
+
+@pytest.fixture(autouse=True, scope="session")
+def local_session(_cache_dirs):
+    """
+    Pymonik client running its tasks on a local process pool.
+
+    Started before any other test: the pool forks its processes, which must happen before the
+    fake control planes start their server threads.
+    """
+    with Pymonik(local_session=True, local_max_workers=2) as pymonik:
+        yield pymonik
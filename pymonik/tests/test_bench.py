@@ -0,0 +1,19 @@
+from pymonik.bench.__main__ import main
+from pymonik.bench.common import BenchmarkResult, compare_results, save_results
+
+
+def test_slowdown_reported_once():
+    baseline = [BenchmarkResult("worker/scalar_args", 100, 1.0, {"payload_ms": 1.0, "function_ms": 2.0})]
+    current = [BenchmarkResult("worker/scalar_args", 100, 2.0, {"payload_ms": 2.0, "function_ms": 4.0})]
+    comparisons = compare_results(baseline, current)
+    assert [c.metric for c in comparisons] == ["throughput"]
+    assert sum(c.is_regression(0.1) for c in comparisons) == 1
+
+
+def test_compare_exit_status(tmp_path):
+    baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+    save_results([BenchmarkResult("a", 100, 1.0), BenchmarkResult("b", 100, 1.0)], baseline)
+    save_results([BenchmarkResult("a", 100, 1.05), BenchmarkResult("b", 100, 0.5)], current)
+    assert main(["compare", str(baseline), str(current)]) == 0
+    save_results([BenchmarkResult("a", 100, 1.5)], current)
+    assert main(["compare", str(baseline), str(current)]) == 1
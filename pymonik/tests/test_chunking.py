@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+
+from pymonik import task
+
+
+@task
+def _checksum(data):
+    return int(np.frombuffer(data, dtype=np.uint8).sum())
+
+
+def _payload(size=8 * 1024 * 1024):
+    return os.urandom(size)
+
+
+def test_chunked_put_round_trip(client):
+    data = _payload()
+    handle = client.put(data, chunked=True)
+    assert handle.get() == data
+
+
+def _chunk_results(control_plane):
+    return {result.name for result in control_plane._results.values() if result.name.startswith("pymonik_chunk__")}
+
+
+def test_chunked_put_uploads_only_changed_chunks(control_plane, client):
+    data = _payload()
+    client.put(data, chunked=True)
+    chunks = _chunk_results(control_plane)
+    received = control_plane.metrics.bytes_received
+    modified = data[:1024] + b"changed" + data[1024:]
+    assert client.put(modified, chunked=True).get() == modified
+    assert control_plane.metrics.bytes_received - received < len(data) // 2
+    # Only the chunk holding the edit (and possibly its neighbour) is new
+    assert len(_chunk_results(control_plane) - chunks) <= 2 < len(chunks)
+
+
+def test_chunked_put_passed_to_task(local_session):
+    data = _payload()
+    handle = local_session.put(data, chunked=True)
+    expected = int(np.frombuffer(data, dtype=np.uint8).sum())
+    assert _checksum.invoke(handle, pymonik=local_session).wait().get() == expected
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+
+from pymonik import task
+
+
+class _CountingPickles:
+    pickles = 0
+
+    def __reduce__(self):
+        type(self).pickles += 1
+        return _CountingPickles, ()
+
+
+@task
+def _size(value):
+    if isinstance(value, np.ndarray):
+        return int(value.sum())
+    return len(value)
+
+
+def test_arguments_are_pickled_once(client):
+    _CountingPickles.pickles = 0
+    _size.invoke(_CountingPickles(), pymonik=client)
+    assert _CountingPickles.pickles == 1
+
+
+def test_shared_argument_is_pickled_once(client):
+    _CountingPickles.pickles = 0
+    shared = _CountingPickles()
+    _size.map_invoke([(shared,) for _ in range(10)], pymonik=client)
+    assert _CountingPickles.pickles == 1
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (bytes(2 * 1024 * 1024), 2 * 1024 * 1024),
+        (list(range(300_000)), 300_000),
+        (np.ones(300_000, dtype=np.int64), 300_000),
+        ({"small": 1}, 1),
+    ],
+    ids=["bytes", "list", "array", "small"],
+)
+def test_spilled_arguments_round_trip(local_session, value, expected):
+    assert _size.invoke(value, pymonik=local_session).wait().get() == expected
+
+
+def test_large_arguments_are_spilled(control_plane, client):
+    _size.invoke(np.ones(300_000, dtype=np.int64), pymonik=client)
+    sizes = {result.name.split("__")[1]: len(control_plane._data.get(result_id, b"")) for result_id, result in control_plane._results.items()}
+    assert sizes["spilled_arg"] >= 300_000 * 8
+    assert sizes["payload"] < 1024
+
+
+def test_streamed_put_progress_totals_payload_size(control_plane, client):
+    progress = []
+    handle = client.put(os.urandom(1024 * 1024), progress=progress.append)
+    assert control_plane.metrics.calls["UploadResultData"] == 1
+    assert len(progress) > 1
+    assert progress == sorted(progress)
+    assert progress[-1] == len(control_plane._data[handle.result_id])
+
+
+def test_put_many_splits_batches_at_byte_limit(control_plane, client):
+    objects = [os.urandom(40_000) for _ in range(10)] + [os.urandom(200_000)]
+    calls = control_plane.metrics.calls.copy()
+    handles = client.put_many(objects, max_batch_bytes=100_000)
+    # Two pickled objects per batch, the object larger than a batch is streamed on its own
+    assert control_plane.metrics.calls["CreateResults"] - calls["CreateResults"] == 5
+    assert control_plane.metrics.calls["UploadResultData"] - calls["UploadResultData"] == 1
+    assert [handle.get() for handle in handles] == objects
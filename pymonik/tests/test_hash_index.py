@@ -0,0 +1,53 @@
+import hashlib
+import os
+import time
+
+from pymonik.hash_index import FileHashIndex
+
+
+def _write_files(directory, count, size=128):
+    paths = []
+    old = time.time() - 60
+    for i in range(count):
+        path = directory / f"dir_{i % 4}" / f"file_{i}.bin"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(size))
+        # Outside of the racy window, so that the hashes are indexed
+        os.utime(path, (old, old))
+        paths.append(path)
+    return paths
+
+
+def _sha256(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_unchanged_files_hit_the_index(tmp_path):
+    # More files than paths looked up per query
+    paths = _write_files(tmp_path / "tree", 2000)
+    index = FileHashIndex(tmp_path / "index.sqlite")
+    try:
+        expected = [_sha256(path) for path in paths]
+        assert index.hash_files(paths, _sha256) == expected
+        assert (index.hits, index.misses) == (0, 2000)
+        assert index.hash_files(paths, _sha256) == expected
+        assert (index.hits, index.misses) == (2000, 2000)
+    finally:
+        index.close()
+
+
+def test_modified_and_linked_files(tmp_path):
+    paths = _write_files(tmp_path / "tree", 3)
+    link = tmp_path / "link.bin"
+    link.symlink_to(paths[0])
+    index = FileHashIndex(tmp_path / "index.sqlite")
+    try:
+        index.hash_files(paths, _sha256)
+        paths[1].write_bytes(b"changed")
+        old = time.time() - 60
+        os.utime(paths[1], (old, old))
+        # The link is looked up as the file it points to
+        assert index.hash_files(paths + [link], _sha256) == [_sha256(path) for path in paths] + [_sha256(paths[0])]
+        assert index.misses == 4
+    finally:
+        index.close()
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from armonik.common import Result, ResultStatus
+
+from pymonik import materialize, task
+
+
+@task
+def _read_materialized(mat):
+    return mat.worker_path, Path(mat.worker_path).read_text()
+
+
+@task
+def _identity(x):
+    return x
+
+
+def test_materialize_redirected_to_session_directory(local_session, tmp_path):
+    source = tmp_path / "input.txt"
+    source.write_text("content")
+    worker_path = tmp_path / "worker" / "input.txt"
+    mat = local_session.upload_materialize(materialize(source, worker_path))
+    materialized_path, content = _read_materialized.invoke(mat, pymonik=local_session).wait().get()
+    assert content == "content"
+    backend = local_session._local_backend
+    assert Path(materialized_path).is_relative_to(backend.directory / "sessions" / local_session._session_id)
+    assert not worker_path.exists()
+
+
+def test_list_results_by_status_and_id(local_session):
+    handles = _identity.map_invoke([(i,) for i in range(5)], pymonik=local_session).wait()
+    results_client = local_session._local_backend.results_client
+    session_filter = Result.session_id == local_session._session_id
+    _, completed = results_client.list_results(session_filter & (Result.status == ResultStatus.COMPLETED))
+    assert set(handles.result_ids) <= {result.result_id for result in completed}
+    assert all(result.status == ResultStatus.COMPLETED for result in completed)
+    by_id = (Result.result_id == handles.result_ids[0]) | (Result.result_id == handles.result_ids[1])
+    _, listed = results_client.list_results(session_filter & by_id)
+    assert {result.result_id for result in listed} == set(handles.result_ids[:2])
+    _, aborted = results_client.list_results(session_filter & (Result.status == ResultStatus.ABORTED))
+    assert aborted == []
@@ -0,0 +1,129 @@
+import io
+import logging
+import os
+import zipfile
+
+import pytest
+
+from pymonik import materialize
+from pymonik.context import PymonikContext
+from pymonik.fake_agent import FakeAgent, FakeTaskHandler
+from pymonik.materialize import (
+    _calculate_directory_hash,
+    _calculate_directory_manifest,
+    _calculate_manifest_hash,
+    _check_materialize_marker,
+    _get_marker_path,
+    _replace_path,
+)
+
+
+def _write_tree(root, files):
+    for relative_path, content in files.items():
+        file_path = root / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+
+
+def _read_tree(root):
+    return {
+        file_path.relative_to(root).as_posix(): file_path.read_text()
+        for file_path in root.rglob("*")
+        if file_path.is_file()
+    }
+
+
+def _context(agent):
+    task_handler = FakeTaskHandler(agent, payload=b"", data_dependencies=[], expected_results=[])
+    return PymonikContext(task_handler, logging.getLogger("test"))
+
+
+def test_manifest_hash_stable_under_reordering_and_mtime(tmp_path):
+    _write_tree(tmp_path, {"b.txt": "b", "a.txt": "a", "sub/c.txt": "c"})
+    manifest = _calculate_directory_manifest(tmp_path)
+    reordered = dict(reversed(list(manifest.items())))
+    assert _calculate_manifest_hash(reordered) == _calculate_manifest_hash(manifest)
+    directory_hash = _calculate_directory_hash(tmp_path)
+    os.utime(tmp_path / "a.txt", ns=(0, 0))
+    assert _calculate_directory_hash(tmp_path) == directory_hash
+    (tmp_path / "a.txt").write_text("changed")
+    assert _calculate_directory_hash(tmp_path) != directory_hash
+
+
+@pytest.mark.parametrize("marker", ["missing", "corrupted"])
+def test_invalid_marker_forces_extraction(tmp_path, marker):
+    source = tmp_path / "source"
+    _write_tree(source, {"a.txt": "a", "sub/b.txt": "b"})
+    worker_path = tmp_path / "worker" / "data"
+    agent = FakeAgent()
+    mat = agent.materialize(materialize(source, worker_path, use_hash_cache=False))
+    ctx = _context(agent)
+    assert ctx.materialize_file(mat)
+    assert _check_materialize_marker(worker_path, mat.content_hash, is_directory=True)
+
+    (worker_path / "a.txt").write_text("edited by a task")
+    if marker == "missing":
+        _get_marker_path(worker_path).unlink()
+    else:
+        _get_marker_path(worker_path).write_text("{not json")
+    assert ctx.materialize_file(mat)
+    assert _read_tree(worker_path) == {"a.txt": "a", "sub/b.txt": "b"}
+    assert _check_materialize_marker(worker_path, mat.content_hash, is_directory=True)
+
+
+def test_per_file_sync_only_fetches_changed_files(tmp_path):
+    source = tmp_path / "source"
+    _write_tree(source, {"same.txt": "same", "changed.txt": "v1", "removed.txt": "removed"})
+    worker_path = tmp_path / "worker" / "data"
+    agent = FakeAgent()
+    ctx = _context(agent)
+    assert ctx.materialize_file(agent.materialize(materialize(source, worker_path, per_file_sync=True)))
+    kept_inode = (worker_path / "same.txt").stat().st_ino
+
+    (source / "changed.txt").write_text("v2")
+    (source / "removed.txt").unlink()
+    (source / "added.txt").write_text("added")
+    requests = agent.resource_requests
+    assert ctx.materialize_file(agent.materialize(materialize(source, worker_path, per_file_sync=True)))
+    assert _read_tree(worker_path) == {"same.txt": "same", "changed.txt": "v2", "added.txt": "added"}
+    # The manifest and the two new files are fetched, the unchanged file is linked into place
+    assert agent.resource_requests - requests == 3
+    assert (worker_path / "same.txt").stat().st_ino == kept_inode
+
+
+def test_replace_path_swaps_directories(tmp_path):
+    worker_path = tmp_path / "data"
+    _write_tree(worker_path, {"old.txt": "old"})
+    staging_path = tmp_path / ".data.staging"
+    _write_tree(staging_path, {"new.txt": "new"})
+    _replace_path(staging_path, worker_path)
+    assert _read_tree(worker_path) == {"new.txt": "new"}
+    assert not staging_path.exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data"]
+
+
+def test_streamed_zip_extracts_the_same_tree(control_plane, client, tmp_path):
+    source = tmp_path / "source"
+    files = {"a.txt": "a", "sub/b.txt": "b", "large.txt": os.urandom(256 * 1024).hex()}
+    _write_tree(source, files)
+    mat = client.upload_materialize(materialize(source, tmp_path / "worker", use_hash_cache=False))
+    assert control_plane.metrics.calls["UploadResultData"] == 1
+    extracted = tmp_path / "extracted"
+    with zipfile.ZipFile(io.BytesIO(control_plane._data[mat.result_id])) as zipf:
+        zipf.extractall(extracted)
+    assert _read_tree(extracted) == files
+
+
+def test_upload_materialize_many_in_one_batch(control_plane, client, tmp_path):
+    mats = []
+    for i in range(20):
+        source = tmp_path / f"source_{i}"
+        _write_tree(source, {"index.txt": str(i)})
+        mats.append(materialize(source, tmp_path / "worker" / str(i), use_hash_cache=False))
+    calls = control_plane.metrics.calls.copy()
+    mats = client.upload_materialize_many(mats)
+    assert control_plane.metrics.calls["ListResults"] - calls["ListResults"] == 1
+    assert control_plane.metrics.calls["CreateResults"] - calls["CreateResults"] == 1
+    assert len({mat.result_id for mat in mats}) == 20
+    with zipfile.ZipFile(io.BytesIO(control_plane._data[mats[7].result_id])) as zipf:
+        assert zipf.read("index.txt") == b"7"
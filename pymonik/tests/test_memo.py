@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+
+import pytest
+
+import pymonik
+
+from pymonik import Pymonik, task
+from pymonik.core import _INVOCATION_MEMO
+from pymonik.memo import LocalMemoStore, MemoStore
+
+
+@task(memoize=True)
+def _square(x):
+    return x * x
+
+
+def test_memo_store_requires_all_methods():
+    class _PartialStore(MemoStore):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        _PartialStore()
+
+
+def test_memoized_invocations_are_reused(client):
+    first = _square.invoke(3, pymonik=client)
+    assert _square.invoke(3, pymonik=client).result_id == first.result_id
+    assert _square.invoke(4, pymonik=client).result_id != first.result_id
+
+
+def test_memoized_invocations_are_forgotten_on_close(control_plane):
+    with Pymonik(endpoint=control_plane.endpoint) as pymonik:
+        _square.map_invoke([(i,) for i in range(10)], pymonik=pymonik)
+        session_id = pymonik._session_id
+        assert sum(1 for memo_key in _INVOCATION_MEMO if memo_key[0] == session_id) == 10
+    assert not any(memo_key[0] == session_id for memo_key in _INVOCATION_MEMO)
+
+
+_KEY_SCRIPT = """
+from pymonik import Pymonik, task
+
+@task
+def _tagged(value):
+    return value, {"red", "green", "blue"}
+
+print(_tagged._invocation_key(({"b": 1, "a": {"x", "y"}}, frozenset(["p", "q", "r"])), Pymonik(), persistent=True))
+"""
+
+
+def _invocation_key_with_seed(seed):
+    env = {**os.environ, "PYTHONHASHSEED": str(seed), "PYTHONPATH": str(Path(pymonik.__file__).parents[1])}
+    return subprocess.run(
+        [sys.executable, "-c", _KEY_SCRIPT], env=env, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def test_invocation_key_independent_of_hash_seed():
+    keys = {_invocation_key_with_seed(seed) for seed in (1, 2, 3)}
+    assert len(keys) == 1
+
+
+def test_local_memo_store_evicts_least_recently_used(tmp_path):
+    store = LocalMemoStore(tmp_path, max_bytes=2500)
+    try:
+        store.put("a", b"a" * 1000)
+        store.put("b", b"b" * 1000)
+        time.sleep(0.01)
+        assert store.get("a") == b"a" * 1000
+        store.put("c", b"c" * 1000)
+        assert store.get("b") is None
+        assert store.get("a") == b"a" * 1000
+        assert store.get("c") == b"c" * 1000
+        assert store.evictions == 1
+    finally:
+        store.close()
@@ -0,0 +1,73 @@
+import concurrent.futures
+import threading
+
+from armonik.common import ResultStatus
+
+from pymonik import task
+from pymonik.polling import PollingMetrics
+
+
+@task
+def _identity(x):
+    return x
+
+
+def test_poll_many_results_independently_of_session_history(polling_client):
+    # Finished results of the session which aren't polled
+    _identity.map_invoke([(i,) for i in range(300)], pymonik=polling_client).wait()
+    handles = _identity.map_invoke([(i,) for i in range(200)], pymonik=polling_client)
+    handles.wait()
+    poller = polling_client._get_poller()
+    poller._state.statuses.clear()
+    calls_before = poller.metrics.list_calls
+    changes = poller.poll(handles.result_ids)
+    assert changes == {r_id: ResultStatus.COMPLETED for r_id in handles.result_ids}
+    assert poller.metrics.list_calls - calls_before == 200 // poller.batch_size
+
+
+def test_polling_metrics_concurrent_updates():
+    metrics = PollingMetrics()
+
+    def _record():
+        for _ in range(10_000):
+            metrics.record_list_calls(1)
+            metrics.record_rpc_error()
+            metrics.record_poll(0.001, 1, 0.1)
+
+    threads = [threading.Thread(target=_record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.list_calls == metrics.rpc_errors == metrics.polls == metrics.status_changes == 40_000
+
+
+def test_concurrent_waiters_on_a_shared_poller(polling_client):
+    handles = _identity.map_invoke([(i,) for i in range(10)], pymonik=polling_client)
+    errors = []
+
+    def _wait_all():
+        try:
+            for handle in handles:
+                handle.wait()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=_wait_all, daemon=True) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads)
+    assert errors == []
+
+
+def test_futures_and_waits_on_a_polling_client(polling_client):
+    handles = _identity.map_invoke([(i,) for i in range(10)], pymonik=polling_client).result_handles
+    waiter = threading.Thread(target=lambda: [handle.wait() for handle in handles], daemon=True)
+    waiter.start()
+    done, not_done = concurrent.futures.wait(handles, timeout=10)
+    waiter.join(timeout=10)
+    assert not not_done
+    assert not waiter.is_alive()
+    assert all(handle.done() for handle in handles)
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import cloudpickle as pickle
+import numpy as np
+import pytest
+
+from pymonik import MultiResultHandle, task
+from pymonik.utils import loads_buffer_views
+
+
+@task
+def _identity(x):
+    return x
+
+
+@pytest.mark.parametrize("client_fixture", ["client", "polling_client"])
+def test_handle_done_after_wait(request, client_fixture):
+    pymonik = request.getfixturevalue(client_fixture)
+    handle = _identity.invoke(1, pymonik=pymonik)
+    handle.wait()
+    assert handle.done()
+    assert handle.exception(timeout=0) is None
+
+
+def test_handle_done_after_get(client):
+    handle = client.put(1)
+    assert handle.get() == 1
+    assert handle.done()
+
+
+def test_done_callback_runs_on_wait(client):
+    handle = _identity.invoke(1, pymonik=client)
+    called = threading.Event()
+    handle.add_done_callback(lambda _: called.set())
+    handle.wait()
+    assert called.is_set()
+
+
+@pytest.mark.parametrize("client_fixture", ["client", "polling_client", "local_session"])
+def test_multi_handle_done_after_wait(request, client_fixture):
+    pymonik = request.getfixturevalue(client_fixture)
+    handles = _identity.map_invoke([(i,) for i in range(20)], pymonik=pymonik)
+    handles.wait()
+    assert handles.done()
+    assert handles[0].done()
+    assert all(handle.done() for handle in handles)
+
+
+def test_multi_handle_done_without_wait(polling_client):
+    handles = _identity.map_invoke([(i,) for i in range(5)], pymonik=polling_client)
+    deadline = time.monotonic() + 5
+    while not handles.done():
+        assert time.monotonic() < deadline, "done() never became True"
+        time.sleep(0.01)
+    assert handles[4].done()
+
+
+def test_gather_into_default_index(client):
+    arrays = [np.full(1000, i, dtype=np.float64) for i in range(6)]
+    handles = MultiResultHandle([client.put(array) for array in arrays])
+    out = np.zeros((6, 1000))
+    assert handles.gather_into(out) is out
+    assert np.array_equal(out, np.stack(arrays))
+
+
+def test_gather_into_custom_index(client):
+    arrays = [np.arange(i * 10, (i + 1) * 10) for i in range(4)]
+    handles = MultiResultHandle([client.put(array) for array in arrays])
+    out = np.zeros(40, dtype=np.int64)
+    handles.gather_into(out, index_fn=lambda position: slice(position * 10, (position + 1) * 10), max_workers=2)
+    assert np.array_equal(out, np.arange(40))
+
+
+def test_buffer_views_decode_without_copy():
+    array = np.arange(1_000_000, dtype=np.float64)
+    value = loads_buffer_views(pickle.dumps(array))
+    assert np.array_equal(value, array)
+    assert not value.flags.owndata
+    assert not value.flags.writeable
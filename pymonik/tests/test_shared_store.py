@@ -0,0 +1,61 @@
+import cloudpickle as pickle
+import numpy as np
+
+from pymonik.shared_store import SharedObjectStore
+from pymonik.worker_cache import WorkerObjectCache
+
+
+def _store(tmp_path, max_bytes):
+    return SharedObjectStore(WorkerObjectCache(cache_root=tmp_path, max_bytes=max_bytes), min_shared_bytes=1024)
+
+
+def _reader(obj, reads):
+    def _read():
+        reads.append(1)
+        return pickle.dumps(obj)
+
+    return _read
+
+
+def test_attached_object_survives_eviction(tmp_path):
+    store = _store(tmp_path, max_bytes=12 * 1024 * 1024)
+    first, second = np.arange(1024 * 1024), np.ones(1024 * 1024)
+    reads = []
+    shared = store.load("first", _reader(first, reads))
+    # Evicts the shared file of the first array
+    store.load("second", _reader(second, reads))
+    assert store.attach("first") is None
+    assert np.array_equal(shared, first)
+    assert not shared.flags.writeable
+
+
+def test_load_republishes_evicted_object(tmp_path):
+    store = _store(tmp_path, max_bytes=12 * 1024 * 1024)
+    first, second = np.arange(1024 * 1024), np.ones(1024 * 1024)
+    reads = []
+    store.load("first", _reader(first, reads))
+    assert np.array_equal(store.load("first", _reader(first, reads)), first)
+    assert len(reads) == 1
+    store.load("second", _reader(second, reads))
+    # Evicted by the second array: read again and published again
+    assert np.array_equal(store.load("first", _reader(first, reads)), first)
+    assert len(reads) == 3
+    assert store.attach("first") is not None
+
+
+def test_attach_evicted_between_lookup_and_mapping(tmp_path, monkeypatch):
+    store = _store(tmp_path, max_bytes=64 * 1024 * 1024)
+    store.load("first", _reader(np.arange(1024), []))
+    cache = store._object_cache
+    cached_open = cache.open
+
+    def _evicting_open(key):
+        # Another task evicts the object as soon as it's opened
+        f = cached_open(key)
+        if f is not None:
+            cache.clear()
+        return f
+
+    monkeypatch.setattr(cache, "open", _evicting_open)
+    assert np.array_equal(store.attach("first"), np.arange(1024))
+    assert store.attach("first") is None
@@ -0,0 +1,58 @@
+import json
+
+from pymonik import task
+from pymonik.tracing import Tracer, disable_tracing, enable_tracing, get_default_tracer
+
+
+@task
+def _identity(x):
+    return x
+
+
+def _exported_spans(path):
+    if not path.exists():
+        return []
+    return [
+        span
+        for line in path.read_text().splitlines()
+        for resource_spans in json.loads(line)["resourceSpans"]
+        for scope_spans in resource_spans["scopeSpans"]
+        for span in scope_spans["spans"]
+    ]
+
+
+def test_spans_flushed_when_buffer_is_full(tmp_path):
+    export_path = tmp_path / "spans.jsonl"
+    tracer = Tracer(export_path, max_buffered_spans=3, flush_interval=3600)
+    for i in range(2):
+        with tracer.span(f"span_{i}"):
+            pass
+    assert _exported_spans(export_path) == []
+    with tracer.span("span_2"):
+        pass
+    assert [span["name"] for span in _exported_spans(export_path)] == ["span_0", "span_1", "span_2"]
+    tracer.disable()
+
+
+def test_spans_flushed_after_interval(tmp_path):
+    export_path = tmp_path / "spans.jsonl"
+    tracer = Tracer(export_path, flush_interval=0)
+    with tracer.span("parent"):
+        with tracer.span("child"):
+            pass
+        assert len(_exported_spans(export_path)) == 1
+    assert len(export_path.read_text().splitlines()) == 2
+    tracer.disable()
+
+
+def test_invocation_spans(tmp_path, client):
+    export_path = tmp_path / "spans.jsonl"
+    enable_tracing(export_path)
+    try:
+        _identity.invoke(1, pymonik=client).wait()
+    finally:
+        get_default_tracer().flush()
+        disable_tracing()
+    spans = {span["name"]: span for span in _exported_spans(export_path)}
+    assert spans["pymonik.serialize"]["parentSpanId"] == spans["pymonik.invoke"]["spanId"]
+    assert spans["pymonik.submit"]["parentSpanId"] == spans["pymonik.invoke"]["spanId"]
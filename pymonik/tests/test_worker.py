@@ -0,0 +1,76 @@
+from pymonik import MultiResultHandle, ResultHandle, Shards, task
+from pymonik.fake_agent import FakeAgent
+
+
+@task
+def _split(values):
+    return Shards([values[i::3] for i in range(3)])
+
+
+@task
+def _split_keyed(values):
+    return Shards({"even": values[0::2], "odd": values[1::2]})
+
+
+@task(num_returns=2)
+def _halves(values):
+    return Shards([values[: len(values) // 2], values[len(values) // 2 :]])
+
+
+@task(num_returns=2)
+def _thirds(values):
+    return Shards([values[i::3] for i in range(3)])
+
+
+@task
+def _sum(values):
+    return sum(values)
+
+
+@task
+def _total(pieces):
+    if isinstance(pieces, dict):
+        return {key: sum(piece) for key, piece in pieces.items()}
+    return sum(sum(piece) for piece in pieces)
+
+
+def test_shards_passed_downstream(local_session):
+    values = list(range(10))
+    assert _total.invoke(_split.invoke(values), pymonik=local_session).wait().get() == sum(values)
+
+
+def test_keyed_shards_passed_downstream(local_session):
+    values = list(range(10))
+    result = _total.invoke(_split_keyed.invoke(values), pymonik=local_session).wait().get()
+    assert result == {"even": 20, "odd": 25}
+
+
+def test_shards_passed_downstream_on_fake_agent():
+    agent = FakeAgent()
+    split = agent.prepare(_split, list(range(6)))
+    output, _ = agent.run(split)
+    assert output.success, output.error
+    total = agent.prepare(_total, ResultHandle(split.expected_output_ids[0], agent.session_id, agent.pymonik))
+    output, _ = agent.run(total)
+    assert output.success, output.error
+    assert agent.get(total.expected_output_ids[0]) == 15
+
+
+def test_num_returns_gives_one_handle_per_output(local_session):
+    handles = _halves.invoke(list(range(10)), pymonik=local_session)
+    assert isinstance(handles, MultiResultHandle)
+    assert len(handles) == 2
+    assert [handle.get() for handle in handles.wait()] == [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9]]
+
+
+def test_downstream_task_gets_a_single_shard(local_session):
+    handles = _halves.invoke(list(range(10)), pymonik=local_session)
+    assert _sum.invoke(handles[1], pymonik=local_session).wait().get() == 35
+
+
+def test_shards_of_the_wrong_length_fail_the_task():
+    agent = FakeAgent()
+    output, task_handler = agent.run(agent.prepare(_thirds, list(range(6))))
+    assert not output.success
+    assert "num_returns=2 returned 3 pieces" in output.error
+    assert task_handler.sent_results == {}
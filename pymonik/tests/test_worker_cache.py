@@ -0,0 +1,51 @@
+import logging
+
+import cloudpickle as pickle
+
+from pymonik.context import PymonikContext
+from pymonik.fake_agent import FakeAgent, FakeTaskHandler
+from pymonik.worker_cache import WorkerObjectCache, get_worker_cache
+
+
+def _adopt(cache, tmp_path, result_id, data):
+    file_path = tmp_path / f"{result_id}.download"
+    file_path.write_bytes(data)
+    return cache.adopt(result_id, file_path)
+
+
+def test_open_object_survives_eviction(tmp_path):
+    cache = WorkerObjectCache(cache_root=tmp_path / "cache", max_bytes=1500)
+    try:
+        _adopt(cache, tmp_path, "first", b"a" * 1000)
+        with cache.open("first") as f:
+            _adopt(cache, tmp_path, "second", b"b" * 1000)
+            assert not cache.contains("first")
+            assert f.read() == b"a" * 1000
+        assert cache.open("first") is None
+        assert cache.get("first") is None
+        assert cache.metrics.evictions == 1
+        assert cache.metrics.misses == 2
+    finally:
+        cache.close()
+
+
+def test_object_evicted_before_opening_is_retrieved_again(monkeypatch):
+    agent = FakeAgent()
+    result_id = agent.store(pickle.dumps([1, 2, 3]))
+    task_handler = FakeTaskHandler(agent, payload=b"", data_dependencies=[], expected_results=[])
+    ctx = PymonikContext(task_handler, logging.getLogger("test"))
+    assert ctx.retrieve_object(result_id) == [1, 2, 3]
+    cache = get_worker_cache()
+    cached_get = cache.get
+
+    def _evicting_get(r_id):
+        # Another task evicts the object right after it is found in the cache
+        object_path = cached_get(r_id)
+        if object_path is not None:
+            object_path.unlink()
+        return object_path
+
+    monkeypatch.setattr(cache, "get", _evicting_get)
+    requests_before = agent.resource_requests
+    assert ctx.retrieve_object(result_id) == [1, 2, 3]
+    assert agent.resource_requests == requests_before + 1